@@ -0,0 +1,110 @@
+import pandas as pd
+
+from date_utils import file_timestamp, normalize_review_dates
+from review_view import BASE_PATH, load_view
+
+# Read from the per-stage column files, not the wide table, so the text columns are never loaded
+INPUT_COLUMNS = ["review_date", "fetched_at", "rating", "source", "topic", "sentiment_score", "sentiment_label"]
+CUBE_PATH = "data/review_cube.csv"
+
+CUBE_KEYS = ["source", "topic", "sentiment_label", "month"]
+
+# -----------------------------
+# Build the aggregate cube
+# -----------------------------
+def build_cube(df):
+    """
+    Aggregate reviews into source x topic x sentiment_label x month cells.
+
+    Every measure is a sum/count/min/max, so cells can be filtered and
+    re-aggregated freely without going back to the raw reviews.
+    """
+    cells = df.assign(
+        month=df["review_date"].dt.to_period("M").dt.to_timestamp(),
+        rating_count=df["rating"].notna().astype("int32"),
+    )
+    cube = cells.groupby(CUBE_KEYS, observed=True, dropna=False).agg(
+        count=("sentiment_score", "size"),
+        score_sum=("sentiment_score", "sum"),
+        rating_sum=("rating", "sum"),
+        rating_count=("rating_count", "sum"),
+        first_review=("review_date", "min"),
+        last_review=("review_date", "max"),
+    )
+    return cube.reset_index()
+
+
+def load_cube(path=CUBE_PATH):
+    return pd.read_csv(path, parse_dates=["month", "first_review", "last_review"],
+                       dtype={"source": "category", "sentiment_label": "category"})
+
+# -----------------------------
+# Metrics read from the cube
+# -----------------------------
+def overall_metrics(cube):
+    total = int(cube["count"].sum())
+    by_label = cube.groupby("sentiment_label", observed=True)["count"].sum()
+    rating_count = cube["rating_count"].sum()
+    return {
+        "total": total,
+        "avg_sentiment": cube["score_sum"].sum() / total if total else float("nan"),
+        "avg_rating": cube["rating_sum"].sum() / rating_count if rating_count else float("nan"),
+        "positive": int(by_label.get("Positive", 0)),
+        "negative": int(by_label.get("Negative", 0)),
+        "neutral": int(by_label.get("Neutral", 0)),
+        "first_review": cube["first_review"].min(),
+        "last_review": cube["last_review"].max(),
+    }
+
+
+def topic_counts(cube, sentiment_label=None):
+    """Review count per topic, largest first."""
+    if sentiment_label is not None:
+        cube = cube[cube["sentiment_label"] == sentiment_label]
+    return cube.groupby("topic")["count"].sum().sort_values(ascending=False, kind="stable")
+
+
+def topic_sentiment_counts(cube):
+    """Topic x sentiment_label review counts."""
+    return cube.pivot_table(index="topic", columns="sentiment_label", values="count",
+                            aggfunc="sum", fill_value=0, observed=True)
+
+
+# -----------------------------
+# Competitor benchmarking
+# -----------------------------
+def source_metrics(cube):
+    """Rating, sentiment, positive share and volume per source in one grouped pass."""
+    cells = cube.assign(positive=cube["count"].where(cube["sentiment_label"] == "Positive", 0))
+    sums = cells.groupby("source", observed=True)[["count", "score_sum", "rating_sum", "rating_count", "positive"]].sum()
+    return pd.DataFrame({
+        "reviews": sums["count"],
+        "avg_rating": sums["rating_sum"] / sums["rating_count"],
+        "avg_sentiment": sums["score_sum"] / sums["count"],
+        "positive_pct": sums["positive"] / sums["count"] * 100,
+    })
+
+
+def topic_mix(cube):
+    """Share of each source's reviews per topic (source x topic, rows sum to 1)."""
+    counts = cube.pivot_table(index="source", columns="topic", values="count",
+                              aggfunc="sum", fill_value=0, observed=True)
+    return counts.div(counts.sum(axis=1), axis=0)
+
+
+def peer_gaps(table, business, peers):
+    """Difference between `business` and the (unweighted) mean of `peers`, per column."""
+    peers = [p for p in peers if p != business and p in table.index]
+    return table.loc[business] - table.loc[peers].mean()
+
+
+if __name__ == "__main__":
+    df = load_view(columns=INPUT_COLUMNS)
+    df = normalize_review_dates(df, default_anchor=file_timestamp(BASE_PATH))
+
+    cube = build_cube(df)
+    cube.to_csv(CUBE_PATH, index=False)
+
+    print("\n🎉 Aggregate cube created!")
+    print(f"📁 Saved to: {CUBE_PATH}")
+    print(f"🧊 {len(df)} reviews -> {len(cube)} cells")
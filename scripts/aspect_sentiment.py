@@ -0,0 +1,189 @@
+"""
+Aspect-level sentiment from sentence-level VADER scores.
+
+One compound score per review hides mixed reviews ("great doctors, terrible
+billing"). This stage splits every review into sentences, and further at
+semicolons, commas and contrasts such as "but", so each part carries one
+opinion. It then finds the parts that mention one of the aspects the
+recommendation prompt asks about (service, staff, facilities, wait time,
+value) and scores them with VADER. A review's aspect score is the mean
+compound score of its parts mentioning that aspect.
+
+Splits are cached by review_id (data/sentence_cache.csv), together with each
+part's score once it has been computed, so a re-run only splits and scores
+new reviews. The cache records a hash of SPLIT_PATTERN and is discarded when
+the pattern changes. Each distinct part is scored once, in batches across worker
+processes.
+
+    python scripts/aspect_sentiment.py [--workers 4]
+
+Output, one row per review and aspect it mentions:
+    data/aspect_sentiment.csv   review_id, aspect, mentions, score, sentiment_label
+"""
+import argparse
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from review_view import BASE_PATH, READ_OPTIONS, require_ids
+from sentiment_analysis import get_sentiment, label_sentiment
+
+INPUT_PATH = BASE_PATH
+OUTPUT_PATH = "data/aspect_sentiment.csv"
+CACHE_PATH = "data/sentence_cache.csv"
+
+# The categories of the recommendation prompt (generate_llm_summary.py), as
+# regex word stems; a trailing "s" is always allowed
+ASPECT_TERMS = {
+    "service": ["service", "served", "serving", "reception", "front desk", "check-?in", "checkout", "counter",
+                "support", "waiter", "waitress", "hospitality"],
+    "staff": ["staff", "doctor", "nurse", "manager", "employee", "team", "receptionist", "crew", "barista", "chef",
+              "personnel", "attendant", "physician", "surgeon"],
+    "facilities": ["room", "washroom", "bathroom", "toilet", "restroom", "parking", "lobby", "seating",
+                   "facility", "facilities", "ambien[cs]e", "building", "infrastructure", "bed", "pool",
+                   "hygiene", "cleanliness", "premises"],
+    "wait_time": ["wait", "waiting", "waited", "queue", "delay", "delayed", "appointment", "line"],
+    "value": ["price", "priced", "pricing", "cost", "costly", "expensive", "cheap", "bill", "billing", "charge",
+              "charged", "value", "money", "worth", "affordable", "overpriced", "menu", "fee"],
+}
+ASPECTS = list(ASPECT_TERMS)
+ASPECT_PATTERNS = {aspect: r"\b(?:" + "|".join(terms) + r")s?\b" for aspect, terms in ASPECT_TERMS.items()}
+ANY_ASPECT_PATTERN = r"\b(?:" + "|".join(term for terms in ASPECT_TERMS.values() for term in terms) + r")s?\b"
+
+# Sentence ends (punctuation kept for VADER), semicolons/newlines, commas
+# followed by a space (not "1,000") and contrasts
+SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+|\s*[;\n]+\s*|,\s+|\s+(?:but|however|although|though|whereas)\s+",
+                           re.IGNORECASE)
+# Stored with every cached split; a cache written with another pattern is discarded
+SPLIT_HASH = hashlib.sha1(f"{SPLIT_PATTERN.pattern}/{SPLIT_PATTERN.flags}".encode()).hexdigest()[:12]
+
+# Distinct sentences per worker task
+BATCH_SIZE = 5000
+
+
+# -----------------------------
+# Sentence splits (cached)
+# -----------------------------
+def split_sentences(df):
+    """review_id, sentence (in text order) for every review in `df`."""
+    parts = df["review_text"].fillna("").str.split(SPLIT_PATTERN)
+    sentences = pd.DataFrame({"review_id": df["review_id"].to_numpy(), "sentence": parts.to_numpy()})
+    sentences = sentences.explode("sentence", ignore_index=True)
+    sentences["sentence"] = sentences["sentence"].fillna("").str.strip()
+    return sentences[sentences["sentence"] != ""].reset_index(drop=True)
+
+
+def load_cache(path=CACHE_PATH):
+    empty = pd.DataFrame({"review_id": pd.Series(dtype=str), "sentence": pd.Series(dtype=str),
+                          "score": pd.Series(dtype=float)})
+    if not os.path.exists(path):
+        return empty
+    cache = pd.read_csv(path, dtype={"review_id": str, "sentence": str, "score": float, "split": str},
+                        keep_default_na=False, na_values={"score": [""]})
+    if "split" not in cache or (cache["split"] != SPLIT_HASH).any():
+        print(f"♻️ {path} was split with another pattern, re-splitting all reviews")
+        return empty
+    return cache.drop(columns="split")
+
+
+def save_cache(sentences, path=CACHE_PATH):
+    sentences.assign(split=SPLIT_HASH).to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def cached_sentences(df, cache):
+    """
+    Sentences of every review in `df`: reused from `cache` where present,
+    split now otherwise (with no score yet). Returns (sentences, new review count).
+    """
+    known = df["review_id"].isin(pd.unique(cache["review_id"]))
+    sentences = pd.concat([cache[cache["review_id"].isin(df["review_id"])],
+                           split_sentences(df[~known]).assign(score=np.nan)], ignore_index=True)
+    return sentences, int((~known).sum())
+
+
+# -----------------------------
+# Aspects and scores
+# -----------------------------
+def aspect_mentions(sentences):
+    """One (row, aspect) pair per aspect each sentence mentions; row indexes `sentences`."""
+    lower = sentences["sentence"].str.lower()
+    # Most sentences mention no aspect: one combined pass, then per aspect only on the hits
+    candidates = np.flatnonzero(lower.str.contains(ANY_ASPECT_PATTERN, regex=True).to_numpy())
+    lower = lower.iloc[candidates]
+    return pd.concat(
+        [pd.DataFrame({"row": candidates[lower.str.contains(pattern, regex=True).to_numpy()], "aspect": aspect})
+         for aspect, pattern in ASPECT_PATTERNS.items()],
+        ignore_index=True,
+    )
+
+
+def score_batch(texts):
+    return [get_sentiment(text) for text in texts]
+
+
+def score_sentences(texts, workers=None):
+    """Compound VADER score per distinct text (a Series indexed by text)."""
+    unique = pd.unique(pd.Series(texts, dtype=object))
+    batches = [unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE)]
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(batches) <= 1:
+        scores = score_batch(unique)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scores = list(chain.from_iterable(pool.map(score_batch, batches)))
+    return pd.Series(scores, index=unique, dtype=float)
+
+
+def aspect_table(sentences, mentions, review_order):
+    """Mean score and mention count per review and aspect, in review then ASPECTS order."""
+    rows = mentions["row"].to_numpy()
+    hits = pd.DataFrame({
+        "review_id": pd.Categorical(sentences["review_id"].to_numpy()[rows], categories=pd.unique(review_order)),
+        "aspect": pd.Categorical(mentions["aspect"], categories=ASPECTS),
+        "score": sentences["score"].to_numpy()[rows],
+    })
+    table = hits.groupby(["review_id", "aspect"], observed=True).agg(
+        mentions=("score", "size"), score=("score", "mean")).reset_index()
+    table["score"] = table["score"].round(4)
+    table["sentiment_label"] = table["score"].map(label_sentiment)
+    return table.astype({"review_id": str, "aspect": str})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score sentiment per review aspect from its sentences")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    args = parser.parse_args()
+
+    require_ids(INPUT_PATH)
+    df = pd.read_csv(INPUT_PATH, usecols=["review_id", "review_text"], **READ_OPTIONS)
+
+    with profiling.timed("split"):
+        cache = load_cache()
+        sentences, new_reviews = cached_sentences(df, cache)
+        mentions = aspect_mentions(sentences)
+
+    # Only sentences that mention an aspect are scored, each distinct one once
+    rows = np.unique(mentions["row"].to_numpy())
+    todo = rows[np.isnan(sentences["score"].to_numpy()[rows])]
+    with profiling.timed("score"):
+        texts = sentences["sentence"].to_numpy()[todo]
+        sentences.loc[todo, "score"] = pd.Series(texts).map(score_sentences(texts, args.workers)).to_numpy()
+    if new_reviews or len(todo) or len(sentences) != len(cache) or not os.path.exists(CACHE_PATH):
+        save_cache(sentences)
+
+    table = aspect_table(sentences, mentions, df["review_id"])
+    table.to_csv(OUTPUT_PATH + ".tmp", index=False)
+    os.replace(OUTPUT_PATH + ".tmp", OUTPUT_PATH)
+
+    print("\n🎉 Aspect Sentiment Completed!")
+    print(f"📁 Saved: {OUTPUT_PATH} (sentence cache: {CACHE_PATH})")
+    print(f"✂️ {len(sentences)} sentences from {len(df)} reviews ({new_reviews} newly split), "
+          f"{len(todo)} scored this run")
+    print(table.groupby("aspect")["score"].agg(["size", "mean"]).round(3))
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+from groq import Groq
+
+from generate_llm_summary import (
+    PRIMARY_MODEL, FALLBACK_MODEL, chunk_reviews_safe, generate_executive_summaries,
+    generate_topic_insights, generate_recommendations, merge_reports
+)
+from llm_client import ResilientLLMClient
+from mock_llm_server import MockConfig, start_server
+
+# -----------------------------
+# Benchmark the LLM summary stage against the local mock server
+# -----------------------------
+def run_benchmark(df, config, chunk_size=25, base_delay=1.0, cooldown=60.0):
+    server, base_url = start_server(config)
+    try:
+        client = Groq(api_key="mock", base_url=base_url, max_retries=0)
+        llm = ResilientLLMClient(client, [PRIMARY_MODEL, FALLBACK_MODEL],
+                                 base_delay=base_delay, cooldown=cooldown)
+
+        with tempfile.TemporaryDirectory() as reports_dir:
+            review_chunks = chunk_reviews_safe(df["cleaned_text"].tolist(), chunk_size=chunk_size)
+            start = time.perf_counter()
+            generate_executive_summaries(llm, review_chunks, reports_dir)
+            generate_topic_insights(llm, df, reports_dir)
+            generate_recommendations(llm, review_chunks, reports_dir)
+            merge_reports(reports_dir)
+            wall_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    counters = server.RequestHandlerClass.server_counters
+    completed = llm.stats["calls"] - llm.stats["retries"] - llm.stats["failed"]
+    return {
+        "reviews": len(df),
+        "chunks": completed,
+        "wall_time_sec": round(wall_time, 3),
+        "chunks_per_sec": round(completed / wall_time, 3) if wall_time else None,
+        "client": llm.stats,
+        "dead_letters": len(llm.dead_letters),
+        "server": counters,
+        "config": vars(config),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark for generate_llm_summary.py")
+    parser.add_argument("--data", default="data/final_topic_labeled_dataset.csv")
+    parser.add_argument("--rows", type=int, default=None, help="only use the first N reviews")
+    parser.add_argument("--chunk-size", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-delay", type=float, default=1.0, help="client backoff base delay")
+    parser.add_argument("--cooldown", type=float, default=60.0, help="circuit breaker cool-down")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).dropna(subset=["cleaned_text"])
+    if args.rows:
+        df = df.head(args.rows)
+
+    config = MockConfig(args.latency, args.jitter, args.rate_limit, args.error_rate, args.seed)
+    results = run_benchmark(df, config, args.chunk_size, args.base_delay, args.cooldown)
+
+    print("\n⏱️ LLM summary benchmark")
+    print(f"  Reviews:        {results['reviews']}")
+    print(f"  Chunks:         {results['chunks']}")
+    print(f"  Wall time:      {results['wall_time_sec']}s")
+    print(f"  Chunks/sec:     {results['chunks_per_sec']}")
+    print(f"  Retries:        {results['client']['retries']}")
+    print(f"  Rate limited:   {results['client']['rate_limited']}")
+    print(f"  Failovers:      {results['client']['failovers']}")
+    print(f"  Dead letters:   {results['dead_letters']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"📁 Results saved to {args.output}")
@@ -0,0 +1,196 @@
+"""
+Scale benchmark for every pipeline stage on synthetic corpora.
+
+For each corpus size a fresh workspace is generated (SerpAPI-shaped raw
+JSON, see synthetic_reviews.py) and the stages run against it in order:
+clean, merge, sentiment, aspect sentiment, tokenization, topics, the column join (view), aggregation,
+dashboard load and the LLM summary (against the mock server). Each stage runs in its own child process
+so its peak RSS is measured on its own (wall times include interpreter
+start-up and imports, which dominate the smallest sizes).
+
+    python scripts/bench_pipeline.py --sizes 10000 100000 1000000 --output bench/pipeline.json
+
+When BERTopic is not installed the topics stage is reported as skipped and
+the later stages run on keyword-assigned topics instead; if the tokens stage
+failed as well, topics and everything after it are reported as failed.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic_reviews import ASPECTS, write_corpus
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "streamlit_app")
+
+STAGES = ["clean", "merge", "sentiment", "aspects", "tokens", "topics", "view", "aggregate", "dashboard_load",
+          "llm_summary"]
+
+# Child-process code per stage; runs with the workspace as cwd
+STAGE_CODE = {
+    "clean": "from clean_reviews import clean_reviews\n"
+             "import glob, os\n"
+             "for p in sorted(glob.glob('data/raw/*.json')):\n"
+             "    clean_reviews(os.path.basename(p)[:-5])",
+    "merge": "import runpy; runpy.run_path({scripts!r} + '/merge_cleaned.py', run_name='__main__')",
+    "sentiment": "import runpy; runpy.run_path({scripts!r} + '/sentiment_analysis.py', run_name='__main__')",
+    "aspects": "import runpy; runpy.run_path({scripts!r} + '/aspect_sentiment.py', run_name='__main__')",
+    "tokens": "import runpy; runpy.run_path({scripts!r} + '/tokenize_reviews.py', run_name='__main__')",
+    "topics": "import runpy; runpy.run_path({scripts!r} + '/topic_drift.py', run_name='__main__')",
+    "view": "import runpy; runpy.run_path({scripts!r} + '/review_view.py', run_name='__main__')",
+    "aggregate": "import runpy\n"
+                 "runpy.run_path({scripts!r} + '/aggregates.py', run_name='__main__')\n"
+                 "runpy.run_path({scripts!r} + '/keyword_index.py', run_name='__main__')\n"
+                 "runpy.run_path({scripts!r} + '/keyword_sketch.py', run_name='__main__')",
+    # data_access resolves ../data relative to the app folder
+    "dashboard_load": "import os, logging; logging.disable(logging.WARNING); os.chdir('app')\n"
+                      "import sys; sys.path.insert(0, {app!r})\n"
+                      "import data_access\n"
+                      "data_access.load_reviews(); data_access.load_cube(); data_access.load_keyword_index()\n"
+                      "data_access.load_keyword_sketch()",
+    "llm_summary": "import runpy, sys\n"
+                   "sys.argv = ['bench_llm_summary.py', '--rows', '{llm_rows}', '--latency', '0.001',\n"
+                   "            '--output', 'bench_llm.json']\n"
+                   "runpy.run_path({scripts!r} + '/bench_llm_summary.py', run_name='__main__')",
+}
+
+
+def run_child(code, cwd, log):
+    """Run `code` in a fresh interpreter; returns (exit code, wall seconds, peak RSS in MB)."""
+    env = {**os.environ, "MPLBACKEND": "Agg", "PYTHONPATH": SCRIPTS_DIR}
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=cwd, env=env,
+                            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    # wait4 reports this child's own peak RSS (KiB on Linux, bytes on macOS)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    rss = usage.ru_maxrss / 1e6 if sys.platform == "darwin" else usage.ru_maxrss / 1024
+    return proc.returncode, wall, rss
+
+
+def assign_keyword_topics(workspace):
+    """Stand-in for BERTopic: topic = first aspect word found in the review."""
+    import pandas as pd
+
+    # cleaned_text from the tokens stage
+    df = pd.read_csv(os.path.join(workspace, "data/columns/tokens.csv"), keep_default_na=False)
+    df = df[df["cleaned_text"].str.strip() != ""]
+    pattern = r"\b(" + "|".join(word for words in ASPECTS.values() for word in words) + r")\b"
+    words = df["cleaned_text"].str.extract(pattern)[0]
+    word_topic = {word: i for i, words_ in enumerate(ASPECTS.values()) for word in words_}
+    df["topic"] = words.map(word_topic).fillna(-1).astype(int)
+    os.makedirs(os.path.join(workspace, "data/columns"), exist_ok=True)
+    df[["review_id", "topic"]].to_csv(os.path.join(workspace, "data/columns/topics.csv"), index=False)
+
+
+def bench_size(size, sources, stages, workspace, llm_rows, mean_words, seed):
+    """Generate one corpus and time each stage on it."""
+    for folder in ["data/raw", "app", "logs"]:
+        os.makedirs(os.path.join(workspace, folder), exist_ok=True)
+
+    start = time.perf_counter()
+    write_corpus(os.path.join(workspace, "data/raw"), size, sources, mean_words, seed=seed)
+    results = {"generate": {"status": "ok", "wall_sec": round(time.perf_counter() - start, 3)}}
+
+    for stage in stages:
+        code = STAGE_CODE[stage].format(scripts=SCRIPTS_DIR, app=APP_DIR, llm_rows=min(llm_rows, size))
+        with open(os.path.join(workspace, "logs", f"{stage}.log"), "w", encoding="utf-8") as log:
+            exit_code, wall, rss = run_child(code, workspace, log)
+
+        if exit_code != 0:
+            if stage == "topics" and not os.path.exists(os.path.join(workspace, "data/columns/tokens.csv")):
+                # No cleaned_text for keyword topics either, so nothing from here on can run
+                results[stage] = {"status": "failed", "wall_sec": round(wall, 3)}
+                for later in stages[stages.index(stage) + 1:]:
+                    results[later] = {"status": "failed", "reason": "no topics (tokens stage failed)"}
+                print(f"  ❌ {stage}: exit code {exit_code} and no tokens for keyword topics; "
+                      f"skipping the remaining stages (log: {workspace}/logs/{stage}.log)")
+                break
+            if stage == "topics":
+                # Let the later stages run without BERTopic
+                assign_keyword_topics(workspace)
+                results[stage] = {"status": "skipped", "reason": "topic_drift.py failed (see log)",
+                                  "fallback": "keyword topics"}
+                print(f"  ⏭️  {stage}: skipped, using keyword topics (log: {workspace}/logs/{stage}.log)")
+            else:
+                results[stage] = {"status": "failed", "wall_sec": round(wall, 3)}
+                print(f"  ❌ {stage}: exit code {exit_code} (log: {workspace}/logs/{stage}.log)")
+            continue
+
+        rows = llm_rows if stage == "llm_summary" else size
+        results[stage] = {
+            "status": "ok",
+            "wall_sec": round(wall, 3),
+            "reviews_per_sec": round(min(rows, size) / wall, 1),
+            "peak_rss_mb": round(rss, 1),
+        }
+        print(f"  ✅ {stage}: {wall:.2f}s, {results[stage]['reviews_per_sec']:,.0f} reviews/s, "
+              f"{rss:.0f} MB peak")
+    return results
+
+
+def scaling_exponents(sizes, runs):
+    """
+    Per stage, the slope of log(wall time) vs log(corpus size): ~1 is
+    linear, >1 is super-linear (the thing to watch for).
+    """
+    exponents = {}
+    for stage in STAGES:
+        points = [(size, run[stage]["wall_sec"]) for size, run in zip(sizes, runs)
+                  if run.get(stage, {}).get("status") == "ok"]
+        if len(points) >= 2:
+            x, y = np.log([p[0] for p in points]), np.log([p[1] for p in points])
+            exponents[stage] = round(float(np.polyfit(x, y, 1)[0]), 3)
+    return exponents
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage at several corpus sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--sources", type=int, default=30, help="businesses per corpus")
+    parser.add_argument("--mean-words", type=float, default=40, help="mean review length in words")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--llm-rows", type=int, default=2000,
+                        help="reviews summarized by the (mocked) LLM stage per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=None, help="keep workspaces here instead of a temp dir")
+    parser.add_argument("--output", default="bench/pipeline_scale.json", help="results JSON path")
+    args = parser.parse_args()
+
+    root = args.workdir or tempfile.mkdtemp(prefix="review_bench_")
+    stages = [s for s in STAGES if s in args.stages]
+    runs = []
+    for size in args.sizes:
+        print(f"\n⏱️ {size:,} reviews across {args.sources} sources")
+        workspace = os.path.join(root, f"n{size}")
+        runs.append(bench_size(size, args.sources, stages, workspace, args.llm_rows, args.mean_words, args.seed))
+        if not args.workdir:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "config": {"sources": args.sources, "mean_words": args.mean_words, "llm_rows": args.llm_rows,
+                   "seed": args.seed},
+        "runs": [{"reviews": size, "stages": run} for size, run in zip(args.sizes, runs)],
+        "scaling_exponent": scaling_exponents(args.sizes, runs),
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+
+    print("\n📈 Scaling exponents (1.0 = linear):")
+    for stage, exponent in results["scaling_exponent"].items():
+        print(f"  {stage:<16} {exponent}")
+    print(f"📁 Results saved to {args.output}")
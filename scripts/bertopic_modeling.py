@@ -1,45 +1,50 @@
-import pandas as pd
 from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
-import nltk
-import re
-from nltk.corpus import stopwords
+from sklearn.feature_extraction.text import CountVectorizer
+
+import profiling
+from review_view import load_view, require_ids, sidecar_path, write_sidecar
+from tokenize_reviews import TOKEN_PATTERN, align_rows, load_tokens
+from topic_drift import (ID_MAP_PATH, STATE_PATH, TOPIC_KEYWORDS_PATH, embed, fit_snapshot, load_state,
+                         match_topics, save_state, topic_keywords)
+from topic_map import TOPIC_MAP_PATH, build_topic_map
 
 # ---------- Step 1: Load Dataset ----------
-file_path = "data/final_sentiment_dataset.csv"
-df = pd.read_csv(file_path)
+# Text was cleaned and tokenized once by tokenize_reviews.py; topics are
+# written back keyed by review_id
+require_ids()
+df = load_view(stages=("tokens",), columns=["review_id", "cleaned_text"])
 
 print("📌 Loaded dataset with", len(df), "reviews")
 
-# ---------- Step 2: Text Cleaning ----------
-nltk.download('stopwords')
-stop_words = set(stopwords.words("english"))
-
-def clean_text(text):
-    if pd.isna(text):
-        return ""
-    text = text.lower()
-    text = re.sub(r"[^a-zA-Z\s]", "", text)  # remove special characters
-    text = " ".join([word for word in text.split() if word not in stop_words])
-    return text
-
-df["cleaned_text"] = df["review_text"].apply(clean_text)
+# ---------- Step 2: Drop reviews with no words left after cleaning ----------
+df = df[df["cleaned_text"].fillna("").str.strip() != ""]
 
-# Remove empty rows after cleaning
-df = df[df["cleaned_text"].str.strip() != ""]
+# The shared document-term matrix, in the same row order
+row_ids, vocab, X = load_tokens()
+X = X[align_rows(row_ids, df["review_id"])]
 
 print("🧹 Cleaning done. Remaining rows:", len(df))
 
 # ---------- Step 3: Topic Modeling ----------
 print("⚙️ Running BERTopic... (This may take 1-5 minutes)")
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
-embeddings = model.encode(df["cleaned_text"].tolist(), show_progress_bar=True)
+# Embeddings are cached per review_id (topic_drift.py), so a refit only encodes new reviews
+with profiling.timed("encode"):
+    embeddings = embed(df["review_id"], df["cleaned_text"])
 
-topic_model = BERTopic(verbose=True)
-topics, probabilities = topic_model.fit_transform(df["cleaned_text"], embeddings)
+# Same vocabulary and token rules as the shared matrix
+topic_model = BERTopic(verbose=True,
+                       vectorizer_model=CountVectorizer(vocabulary=vocab, token_pattern=TOKEN_PATTERN, lowercase=False))
+with profiling.timed("fit_transform"):
+    topics, probabilities = topic_model.fit_transform(df["cleaned_text"], embeddings)
 
-df["topic"] = topics
+# Keep topic ids stable across refits: each topic takes the id of the
+# previous fit's topic whose centroid it matches (see topic_drift.py)
+previous = load_state()
+current = fit_snapshot(embeddings, topics)
+id_map = match_topics(previous, current)
+stable_ids = {**dict(zip(id_map["model_topic"], id_map["topic"])), -1: -1}
+df["topic"] = [stable_ids[t] for t in topics]
 
 # ---------- Step 4: Save Output ----------
 print("\n🎉 BERTopic Modeling Completed!")
@@ -48,14 +53,30 @@ print("\n🎉 BERTopic Modeling Completed!")
 import os
 os.makedirs("models", exist_ok=True)
 
-df.to_csv("data/final_topic_labeled_dataset.csv", index=False)
+write_sidecar("topics", df)
 topic_model.save("models/bertopic_model")
+id_map.to_csv(ID_MAP_PATH, index=False)
+# The snapshot the drift monitor compares later runs against
+save_state(fit_snapshot(embeddings, df["topic"].to_numpy(),
+                        next_topic=previous["next_topic"] if previous is not None else None))
+
+# Save the c-TF-IDF terms per topic so the dashboard never needs the model
+topic_keywords(X, vocab, df["topic"]).to_csv(TOPIC_KEYWORDS_PATH, index=False)
+
+# Cache the intertopic distance map so charts can be drawn without the model
+with profiling.timed("topic_map"):
+    topic_map = build_topic_map(topic_model)
+    topic_map["topic"] = topic_map["topic"].map(stable_ids)
+    topic_map.to_csv(TOPIC_MAP_PATH, index=False)
 
 print("\n🎉 BERTopic Modeling Completed!")
 print("📁 Saved:")
-print("  - data/final_topic_labeled_dataset.csv")
-print("  - models/bertopic_model")
+print(f"  - {sidecar_path('topics')} (assemble the full dataset with review_view.py)")
+print(f"  - {TOPIC_KEYWORDS_PATH}")
+print(f"  - {TOPIC_MAP_PATH}")
+print(f"  - {ID_MAP_PATH} (model topic -> stable topic id)")
+print(f"  - models/bertopic_model, {STATE_PATH}")
 
 # ---------- Step 5: Topic Overview ----------
-print("\n🔍 Top 10 Topics:")
+print("\n🔍 Top 10 Topics (model ids, see topic_id_map.csv):")
 print(topic_model.get_topic_info().head(10))
@@ -1,21 +1,18 @@
+import argparse
 import pandas as pd
 import json
 import re
 import emoji
 import os
 
-filename = input("Enter raw filename (without extension): ")
+import profiling
+from date_utils import file_timestamp
 
-with open(f"data/raw/{filename}.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+RAW_FOLDER = "data/raw"
+CLEANED_FOLDER = "data/cleaned"
 
-df = pd.DataFrame(data)
-
-df["reviewer_name"] = df["user"].apply(lambda x: x.get("name") if isinstance(x, dict) else None)
-df["review_text"] = df["snippet"]
-df["review_date"] = df["date"]
-df["rating"] = df["rating"]
 
+@profiling.hot
 def clean(text):
     if not text: return ""
     text = emoji.replace_emoji(text, '')
@@ -23,14 +20,41 @@ def clean(text):
     text = re.sub(r"\s+", " ", text)
     return text.strip()
 
-df["review_text"] = df["review_text"].astype(str).apply(clean)
 
-df = df[["reviewer_name", "review_date", "rating", "review_text"]]
-df = df[df["review_text"] != ""]
+def clean_reviews(filename):
+    """Clean data/raw/<filename>.json into data/cleaned/<filename>_cleaned.csv."""
+    raw_path = f"{RAW_FOLDER}/{filename}.json"
+    with open(raw_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    df = pd.DataFrame(data)
+
+    df["reviewer_name"] = df["user"].apply(lambda x: x.get("name") if isinstance(x, dict) else None)
+    df["review_text"] = df["snippet"]
+    df["review_date"] = df["date"]
+    df["rating"] = df["rating"]
+
+    # Older raw files have no fetch time; the file's modification time is the best guess
+    if "fetched_at" not in df.columns:
+        df["fetched_at"] = file_timestamp(raw_path).isoformat()
+
+    df["review_text"] = df["review_text"].astype(str).apply(clean)
+
+    df = df[["reviewer_name", "review_date", "rating", "review_text", "fetched_at"]]
+    df = df[df["review_text"] != ""]
+
+    os.makedirs(CLEANED_FOLDER, exist_ok=True)
+
+    output_path = f"{CLEANED_FOLDER}/{filename}_cleaned.csv"
+    df.to_csv(output_path, index=False, encoding="utf-8")
+    return output_path, len(df)
+
 
-os.makedirs("data/cleaned", exist_ok=True)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean one raw review file")
+    parser.add_argument("filename", nargs="?", help="raw filename without extension (prompted for if omitted)")
+    filename = parser.parse_args().filename or input("Enter raw filename (without extension): ")
 
-output_path = f"data/cleaned/{filename}_cleaned.csv"
-df.to_csv(output_path, index=False, encoding="utf-8")
+    output_path, count = clean_reviews(filename)
 
-print(f"✨ Cleaning complete! Saved {len(df)} cleaned reviews to {output_path}")
+    print(f"✨ Cleaning complete! Saved {count} cleaned reviews to {output_path}")
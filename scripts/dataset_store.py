@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+from date_utils import file_timestamp, normalize_review_dates
+from review_view import BASE_PATH, load_view
+
+STORE_PATH = "data/dashboard_store.parquet"
+
+
+def compact_dtypes(df):
+    """Shrink dtypes: categorical labels, small-int topics, float32 scores."""
+    for col in ["source", "sentiment_label"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "topic" in df.columns:
+        df["topic"] = pd.to_numeric(df["topic"], downcast="integer")
+    for col in ["rating", "sentiment_score"]:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    return df
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_store(path, columns=None):
+    """Read selected columns from the parquet store (dates and dtypes already final)."""
+    if columns is not None:
+        import pyarrow.parquet as pq
+        available = set(pq.read_schema(path).names)
+        columns = [c for c in columns if c in available]
+    return pd.read_parquet(path, columns=columns)
+
+
+if __name__ == "__main__":
+    if not parquet_available():
+        raise SystemExit("❌ pyarrow is not installed; run: pip install pyarrow")
+
+    # Every column, text included, joined from the per-stage files rather than the wide table
+    df = load_view()
+    df = normalize_review_dates(df, default_anchor=file_timestamp(BASE_PATH))
+    df = compact_dtypes(df)
+
+    # Columnar, so the dashboard reads only the columns each page needs
+    df.to_parquet(STORE_PATH, index=False)
+
+    print("\n🎉 Dashboard store created!")
+    print(f"📁 Saved to: {STORE_PATH}")
+    print(f"📦 {len(df)} reviews, {os.path.getsize(STORE_PATH) / 1e6:.2f} MB")
@@ -0,0 +1,93 @@
+import os
+import re
+
+import pandas as pd
+
+# Same conventions the dashboard has always used (month = 30 days, year = 365)
+UNIT_OFFSETS = {
+    "second": pd.Timedelta(seconds=1),
+    "minute": pd.Timedelta(minutes=1),
+    "hour": pd.Timedelta(hours=1),
+    "day": pd.Timedelta(days=1),
+    "week": pd.Timedelta(weeks=1),
+    "month": pd.Timedelta(days=30),
+    "year": pd.Timedelta(days=365),
+}
+
+# How resolved review dates are written to CSV, whole seconds (the source
+# dates are only day-accurate); the same in every mode and chunk
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Matches "4 weeks ago", "a month ago", "an hour ago", "Edited 2 days ago", ...
+RELATIVE_DATE_PATTERN = re.compile(r"\b(a|an|\d+)\s+(second|minute|hour|day|week|month|year)s?\b")
+
+
+def relative_offsets(dates):
+    """
+    Convert relative date strings to Timedelta offsets.
+
+    Only the unique strings are parsed (there are a few dozen at most), then
+    mapped back onto every row. Unrecognised strings get an offset of zero.
+    """
+    dates = pd.Series(dates)
+    codes, uniques = pd.factorize(dates.fillna("").astype(str).str.lower().str.strip())
+
+    parts = pd.Series(uniques).str.extract(RELATIVE_DATE_PATTERN)
+    counts = pd.to_numeric(parts[0].replace({"a": "1", "an": "1"}), errors="coerce").fillna(0)
+    units = parts[1].map(UNIT_OFFSETS).fillna(pd.Timedelta(0))
+    lookup = pd.to_timedelta(units.to_numpy() * counts.to_numpy())
+
+    return pd.Series(lookup.take(codes), index=dates.index)
+
+
+def _utc(timestamp):
+    timestamp = pd.Timestamp(timestamp)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+def parse_relative_dates(dates, anchor):
+    """
+    Resolve relative date strings against an anchor timestamp.
+
+    `anchor` is the fetch time of the reviews, either a single timestamp or a
+    Series aligned with `dates` (one fetch time per row).
+    """
+    if isinstance(anchor, pd.Series):
+        anchor = pd.to_datetime(anchor, format="ISO8601", utc=True).dt.tz_localize(None)
+    else:
+        anchor = _utc(anchor).tz_localize(None)
+    return anchor - relative_offsets(dates)
+
+
+def file_timestamp(path):
+    """Fallback anchor for data fetched before fetch times were recorded."""
+    return pd.Timestamp(os.path.getmtime(path), unit="s", tz="UTC").floor("s")
+
+
+def normalize_review_dates(df, default_anchor):
+    """
+    Turn the `review_date` column into real datetimes, anchored to the
+    `fetched_at` column when present and to `default_anchor` otherwise.
+
+    Absolute dates are only type-converted. Every row is resolved on its
+    own, so the result does not depend on how the data is chunked.
+    """
+    if "review_date" not in df.columns:
+        return df
+    if pd.api.types.is_datetime64_any_dtype(df["review_date"]):
+        return df
+
+    absolute = pd.to_datetime(df["review_date"], format="ISO8601", errors="coerce")
+    if absolute.dt.tz is not None:
+        absolute = absolute.dt.tz_convert("UTC").dt.tz_localize(None)
+    if absolute.notna().all():
+        df["review_date"] = absolute
+        return df
+
+    if "fetched_at" in df.columns:
+        anchor = pd.to_datetime(df["fetched_at"], format="ISO8601", utc=True).fillna(_utc(default_anchor))
+    else:
+        anchor = default_anchor
+    # Rows that did hold an absolute date keep it
+    df["review_date"] = absolute.where(absolute.notna(), parse_relative_dates(df["review_date"], anchor))
+    return df
@@ -1,7 +1,9 @@
+import argparse
 import requests
 import json
 import time
 import os
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -34,6 +36,12 @@ def fetch_reviews(place_id):
             print("\n🚫 No more reviews found.")
             break
 
+        # Record when each page was fetched so relative dates ("2 weeks ago")
+        # can be resolved against the fetch time later in the pipeline
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        for review in data["reviews"]:
+            review["fetched_at"] = fetched_at
+
         reviews.extend(data["reviews"])
         page += 1
         print(f"📄 Fetched page {page}... Total reviews so far: {len(reviews)}")
@@ -44,8 +52,13 @@ def fetch_reviews(place_id):
 
 
 if __name__ == "__main__":
-    place_id = input("Enter Place ID: ")
-    filename = input("Enter filename (without extension): ")
+    parser = argparse.ArgumentParser(description="Fetch Google Maps reviews for one place")
+    parser.add_argument("--place-id", help="SerpAPI place id (prompted for if omitted)")
+    parser.add_argument("--name", help="output filename without extension (prompted for if omitted)")
+    args = parser.parse_args()
+
+    place_id = args.place_id or input("Enter Place ID: ")
+    filename = args.name or input("Enter filename (without extension): ")
 
     reviews = fetch_reviews(place_id)
 
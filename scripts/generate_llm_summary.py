@@ -1,26 +1,30 @@
 import pandas as pd
 from groq import Groq
 from dotenv import load_dotenv
+import argparse
 import os
-import time
 import glob
 
-# -----------------------------
-# Load environment variables
-# -----------------------------
-load_dotenv()
-api_key = os.getenv("GROQ_API_KEY")
+import profiling
+from llm_client import ResilientLLMClient, LLMCallFailed, load_dead_letters
 
-if not api_key:
-    raise ValueError("❌ GROQ_API_KEY not found! Add it to your .env file.")
-
-client = Groq(api_key=api_key)
+PRIMARY_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
+FALLBACK_MODEL = "moonshotai/kimi-k2-instruct"
+DEAD_LETTER_FILE = "reports/dead_letters.json"
 
 # -----------------------------
-# Load dataset
+# Helper: build the resilient Groq client
 # -----------------------------
-df = pd.read_csv("data/final_topic_labeled_dataset.csv")
-df = df.dropna(subset=["cleaned_text"])  # remove empty reviews
+def build_client():
+    load_dotenv()
+    api_key = os.getenv("GROQ_API_KEY")
+
+    if not api_key:
+        raise ValueError("❌ GROQ_API_KEY not found! Add it to your .env file.")
+
+    # Retries are handled by ResilientLLMClient, so disable the SDK's own
+    client = Groq(api_key=api_key, base_url=os.getenv("GROQ_BASE_URL"), max_retries=0)
+    return ResilientLLMClient(client, [PRIMARY_MODEL, FALLBACK_MODEL])
 
 # -----------------------------
 # Helper: chunk reviews safely
@@ -29,49 +33,40 @@ def chunk_reviews_safe(reviews, chunk_size=25):
     return [reviews[i:i+chunk_size] for i in range(0, len(reviews), chunk_size)]
 
 # -----------------------------
-# Helper: function to call Groq model with fallback
+# Helper: call model, dead-lettering failures instead of crashing
 # -----------------------------
-def call_model(prompt, timeout=120):
-    primary_model = "meta-llama/llama-4-maverick-17b-128e-instruct"
-    fallback_model = "moonshotai/kimi-k2-instruct"
-
+@profiling.hot
+def call_model(llm, prompt, output, append=False, timeout=120):
     try:
-        response = client.chat.completions.create(
-            model=primary_model,
-            messages=[{"role": "user", "content": prompt}],
-            timeout=timeout
-        )
-        return response.choices[0].message.content, primary_model
-    except Exception as e:
-        # If primary fails (rate limit or size), use fallback
-        print(f"⚠️ Primary model hit an issue: {str(e)}\nSwitching to fallback model {fallback_model}...")
-        response = client.chat.completions.create(
-            model=fallback_model,
-            messages=[{"role": "user", "content": prompt}],
-            timeout=timeout
-        )
-        return response.choices[0].message.content, fallback_model
-
-# -----------------------------
-# Create reports folder
-# -----------------------------
-os.makedirs("reports", exist_ok=True)
+        text, used_model = llm.complete(prompt, timeout=timeout)
+    except LLMCallFailed as e:
+        print(f"❌ Giving up on {output}: {e}")
+        llm.dead_letter(prompt, e, output=output, append=append)
+        return None, None
+    llm.delivered_letter(prompt, output=output)
+    return text, used_model
+
+def write_report(path, text, append=False):
+    mode = "a" if append and os.path.exists(path) and os.path.getsize(path) > 0 else "w"
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "a":
+            f.write("\n\n")
+        f.write(text)
 
 # -----------------------------
 # EXECUTIVE SUMMARY (per chunk)
 # -----------------------------
-review_chunks = chunk_reviews_safe(df["cleaned_text"].tolist(), chunk_size=25)
-
-print(f"🔹 Generating executive summary in {len(review_chunks)} chunks...")
-for idx, chunk in enumerate(review_chunks):
-    chunk_file = f"reports/executive_chunk_{idx+1}.txt"
-    if os.path.exists(chunk_file):
-        print(f"✅ Skipping executive summary chunk {idx+1} (already done)")
-        continue
+def generate_executive_summaries(llm, review_chunks, reports_dir="reports"):
+    print(f"🔹 Generating executive summary in {len(review_chunks)} chunks...")
+    for idx, chunk in enumerate(review_chunks):
+        chunk_file = f"{reports_dir}/executive_chunk_{idx+1}.txt"
+        if os.path.exists(chunk_file):
+            print(f"✅ Skipping executive summary chunk {idx+1} (already done)")
+            continue
 
-    print(f"Processing executive summary chunk {idx+1}/{len(review_chunks)}...")
-    chunk_text = " ".join(chunk)
-    exec_prompt = f"""
+        print(f"Processing executive summary chunk {idx+1}/{len(review_chunks)}...")
+        chunk_text = " ".join(chunk)
+        exec_prompt = f"""
 You are an expert business analyst. Summarize the following customer feedback reviews into a clear executive summary. Focus on:
 
 - Main customer feelings (positive/negative)
@@ -81,67 +76,66 @@ You are an expert business analyst. Summarize the following customer feedback re
 Reviews:
 {chunk_text}
 """
-    summary, used_model = call_model(exec_prompt)
-    print(f"✔️ Chunk {idx+1} generated using {used_model}")
-    with open(chunk_file, "w", encoding="utf-8") as f:
-        f.write(summary)
-    time.sleep(1)
+        summary, used_model = call_model(llm, exec_prompt, chunk_file)
+        if summary is None:
+            continue
+        print(f"✔️ Chunk {idx+1} generated using {used_model}")
+        write_report(chunk_file, summary)
 
 # -----------------------------
 # TOPIC INSIGHTS (per topic, chunked)
 # -----------------------------
-grouped_reviews = df.groupby("topic")["cleaned_text"].apply(list)
+def generate_topic_insights(llm, df, reports_dir="reports"):
+    grouped_reviews = df.groupby("topic")["cleaned_text"].apply(list)
 
-print(f"\n🔹 Generating topic insights for {len(grouped_reviews)} topics...")
-for idx, (topic, reviews_list) in enumerate(grouped_reviews.items()):
-    if pd.isna(topic):
-        continue
-    safe_topic = str(topic).replace(" ", "_").replace("/", "_")
-    topic_file = f"reports/topic_{idx+1}_{safe_topic}.txt"
-    if os.path.exists(topic_file):
-        print(f"✅ Skipping topic {idx+1} ({topic}) (already done)")
-        continue
+    print(f"\n🔹 Generating topic insights for {len(grouped_reviews)} topics...")
+    for idx, (topic, reviews_list) in enumerate(grouped_reviews.items()):
+        if pd.isna(topic):
+            continue
+        safe_topic = str(topic).replace(" ", "_").replace("/", "_")
+        topic_file = f"{reports_dir}/topic_{idx+1}_{safe_topic}.txt"
+        if os.path.exists(topic_file):
+            print(f"✅ Skipping topic {idx+1} ({topic}) (already done)")
+            continue
 
-    print(f"Processing topic {idx+1}/{len(grouped_reviews)}: {topic}")
+        print(f"Processing topic {idx+1}/{len(grouped_reviews)}: {topic}")
 
-    # Chunk the reviews per topic to avoid token limit
-    review_chunks_topic = chunk_reviews_safe(reviews_list, chunk_size=20)
-    insights = []
+        # Chunk the reviews per topic to avoid token limit
+        review_chunks_topic = chunk_reviews_safe(reviews_list, chunk_size=20)
+        insights = []
 
-    for cidx, chunk in enumerate(review_chunks_topic):
-        reviews_text = " ".join(chunk)
-        topic_prompt = f"""
+        for cidx, chunk in enumerate(review_chunks_topic):
+            reviews_text = " ".join(chunk)
+            topic_prompt = f"""
 Based on the customer reviews below, explain clearly what this topic represents in bullet points:
 
 Topic: {topic}
 Reviews: {reviews_text}
 """
-        try:
-            insight, used_model = call_model(topic_prompt)
+            # Failed chunks are appended to the topic file when replayed
+            insight, used_model = call_model(llm, topic_prompt, topic_file, append=True)
+            if insight is None:
+                continue
             insights.append(insight)
             print(f"✔️ Topic {idx+1} chunk {cidx+1} generated using {used_model}")
-            time.sleep(1)
-        except Exception as e:
-            print(f"⚠️ Topic {idx+1} chunk {cidx+1} failed: {e}")
-            continue
 
-    # Merge insights from chunks into a single topic file
-    with open(topic_file, "w", encoding="utf-8") as f:
-        f.write("\n\n".join(insights))
+        # Merge insights from chunks into a single topic file
+        write_report(topic_file, "\n\n".join(insights))
 
 # -----------------------------
 # RECOMMENDATIONS (per chunk)
 # -----------------------------
-print(f"\n🔹 Generating recommendations in {len(review_chunks)} chunks...")
-for idx, chunk in enumerate(review_chunks):
-    chunk_file = f"reports/reco_chunk_{idx+1}.txt"
-    if os.path.exists(chunk_file):
-        print(f"✅ Skipping recommendation chunk {idx+1} (already done)")
-        continue
+def generate_recommendations(llm, review_chunks, reports_dir="reports"):
+    print(f"\n🔹 Generating recommendations in {len(review_chunks)} chunks...")
+    for idx, chunk in enumerate(review_chunks):
+        chunk_file = f"{reports_dir}/reco_chunk_{idx+1}.txt"
+        if os.path.exists(chunk_file):
+            print(f"✅ Skipping recommendation chunk {idx+1} (already done)")
+            continue
 
-    print(f"Processing recommendation chunk {idx+1}/{len(review_chunks)}...")
-    chunk_text = " ".join(chunk)
-    recommend_prompt = f"""
+        print(f"Processing recommendation chunk {idx+1}/{len(review_chunks)}...")
+        chunk_text = " ".join(chunk)
+        recommend_prompt = f"""
 Based on the customer feedback trends, generate practical business improvement recommendations.
 
 Focus on:
@@ -155,11 +149,24 @@ Focus on:
 Reviews:
 {chunk_text}
 """
-    reco, used_model = call_model(recommend_prompt)
-    print(f"✔️ Recommendation chunk {idx+1} generated using {used_model}")
-    with open(chunk_file, "w", encoding="utf-8") as f:
-        f.write(reco)
-    time.sleep(1)
+        reco, used_model = call_model(llm, recommend_prompt, chunk_file)
+        if reco is None:
+            continue
+        print(f"✔️ Recommendation chunk {idx+1} generated using {used_model}")
+        write_report(chunk_file, reco)
+
+# -----------------------------
+# REPLAY previously failed chunks
+# -----------------------------
+def replay_dead_letters(llm, path=DEAD_LETTER_FILE):
+    entries = load_dead_letters(path)
+    print(f"🔁 Replaying {len(entries)} dead-lettered chunks...")
+    for entry in entries:
+        text, used_model = call_model(llm, entry["prompt"], entry["output"], append=entry.get("append", False))
+        if text is None:
+            continue
+        print(f"✔️ {entry['output']} regenerated using {used_model}")
+        write_report(entry["output"], text, append=entry.get("append", False))
 
 # -----------------------------
 # MERGE CHUNKS INTO FINAL FILES
@@ -171,13 +178,53 @@ def merge_files(pattern, output_file):
             with open(fname, "r", encoding="utf-8") as infile:
                 outfile.write(infile.read() + "\n\n")
 
-print("\n🔹 Merging executive summary chunks...")
-merge_files("reports/executive_chunk_*.txt", "reports/executive_summary.txt")
+def merge_reports(reports_dir="reports"):
+    print("\n🔹 Merging executive summary chunks...")
+    merge_files(f"{reports_dir}/executive_chunk_*.txt", f"{reports_dir}/executive_summary.txt")
+
+    print("🔹 Merging topic insights...")
+    merge_files(f"{reports_dir}/topic_*.txt", f"{reports_dir}/topic_insights.txt")
+
+    print("🔹 Merging recommendation chunks...")
+    merge_files(f"{reports_dir}/reco_chunk_*.txt", f"{reports_dir}/recommendations.txt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate LLM summary reports")
+    parser.add_argument("--replay", action="store_true",
+                        help=f"only retry the chunks recorded in {DEAD_LETTER_FILE}")
+    args = parser.parse_args()
+
+    llm = build_client()
+
+    # -----------------------------
+    # Create reports folder
+    # -----------------------------
+    os.makedirs("reports", exist_ok=True)
+
+    if args.replay:
+        replay_dead_letters(llm)
+    else:
+        # -----------------------------
+        # Load dataset
+        # -----------------------------
+        df = pd.read_csv("data/final_topic_labeled_dataset.csv")
+        df = df.dropna(subset=["cleaned_text"])  # remove empty reviews
+
+        review_chunks = chunk_reviews_safe(df["cleaned_text"].tolist(), chunk_size=25)
+        generate_executive_summaries(llm, review_chunks)
+        generate_topic_insights(llm, df)
+        generate_recommendations(llm, review_chunks)
+
+    # Merged with earlier failures; entries only go away once their chunk succeeds
+    pending = llm.save_dead_letters(DEAD_LETTER_FILE)
+    merge_reports()
 
-print("🔹 Merging topic insights...")
-merge_files("reports/topic_*.txt", "reports/topic_insights.txt")
+    if pending:
+        print(f"\n⚠️ {len(pending)} chunks have failed and are saved in {DEAD_LETTER_FILE}")
+        print("   Re-run with --replay to retry them.")
+    print("\n🎉 All AI Analysis Reports are Ready in the `reports/` folder!")
 
-print("🔹 Merging recommendation chunks...")
-merge_files("reports/reco_chunk_*.txt", "reports/recommendations.txt")
 
-print("\n🎉 All AI Analysis Reports are Ready in the `reports/` folder!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+
+OUTPUT_PATH = "data/keyword_index.csv"
+TOP_N = 15
+
+# cleaned_text is already lowercased with stopwords removed; like the old
+# dashboard keyword list, ignore words of 3 letters or fewer
+TOKEN_PATTERN = r"(?u)\b[a-z]{4,}\b"
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def group_term_counts(X, keys):
+    """Sum document-term rows per group. Returns (group keys frame, counts matrix)."""
+    codes, groups = pd.MultiIndex.from_frame(keys).factorize()
+    G = csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(len(groups), len(codes)))
+    return groups.to_frame(index=False, name=list(keys.columns)), (G @ X).tocsr()
+
+
+def top_terms(group_keys, counts, vocab, top_n=TOP_N):
+    """Long-format top-N terms per group row."""
+    rows = []
+    for i in range(counts.shape[0]):
+        row = counts.getrow(i)
+        if row.nnz == 0:
+            continue
+        order = np.argsort(-row.data, kind="stable")[:top_n]
+        rows.append(pd.DataFrame({
+            **{col: group_keys.iloc[i][col] for col in group_keys.columns},
+            "term": vocab[row.indices[order]],
+            "count": row.data[order].astype(int),
+            "rank": np.arange(1, len(order) + 1),
+        }))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+# Every filter combination the dashboard offers gets its own exact top-N list
+# ([] is the whole corpus, for the overview page)
+LEVELS = [
+    [],
+    ["topic"],
+    ["topic", "source"],
+    ["topic", "sentiment_label"],
+    ["topic", "source", "sentiment_label"],
+]
+
+
+def level_name(keys):
+    return "_".join(keys) or "all"
+
+
+def keyword_terms(X, vocab):
+    """Restrict a document-term matrix to the keyword vocabulary (TOKEN_PATTERN)."""
+    # The shared vocabulary holds [a-z]{2,} tokens; keywords are the 4+ letter ones
+    keep = np.array([len(term) >= 4 for term in vocab], dtype=bool)
+    return X[:, keep], vocab[keep]
+
+
+def build_keyword_index(df, top_n=TOP_N, X=None, vocab=None):
+    """
+    Top terms for every grouping in LEVELS (e.g. per topic, per topic x
+    source x sentiment), all from one document-term matrix: `X` (rows
+    aligned with `df`, e.g. from tokenize_reviews.py) or, without it, one
+    built from df["cleaned_text"].
+    """
+    if X is None:
+        df = df.dropna(subset=["cleaned_text"])
+        vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN)
+        X = vectorizer.fit_transform(df["cleaned_text"])
+        vocab = vectorizer.get_feature_names_out()
+    else:
+        X, vocab = keyword_terms(X, vocab)
+
+    levels = []
+    for keys in LEVELS:
+        if keys:
+            group_keys, counts = group_term_counts(X, df[keys].reset_index(drop=True))
+        else:
+            group_keys, counts = pd.DataFrame(index=[0]), csr_matrix(X.sum(axis=0))
+        levels.append(top_terms(group_keys, counts, vocab, top_n).assign(level=level_name(keys)))
+
+    index = pd.concat(levels, ignore_index=True)
+    # Corpus-wide rows have no topic; keep the column integer
+    index["topic"] = index["topic"].astype("Int64")
+    return index.reindex(columns=["level", "topic", "source", "sentiment_label", "term", "count", "rank"])
+
+
+if __name__ == "__main__":
+    import tokenize_reviews
+    from review_view import load_view
+
+    if tokenize_reviews.tokens_available():
+        # Reuse the shared document-term matrix instead of re-tokenizing
+        df = load_view(columns=["review_id", "topic", "source", "sentiment_label"])
+        row_ids, vocab, X = tokenize_reviews.load_tokens()
+        index = build_keyword_index(df, X=X[tokenize_reviews.align_rows(row_ids, df["review_id"])], vocab=vocab)
+    else:
+        df = load_view(columns=["topic", "source", "sentiment_label", "cleaned_text"])
+        index = build_keyword_index(df)
+    index.to_csv(OUTPUT_PATH, index=False)
+
+    print("\n🎉 Keyword index created!")
+    print(f"📁 Saved to: {OUTPUT_PATH}")
+    print(f"🔑 {index['term'].nunique()} distinct terms across {df['topic'].nunique()} topics")
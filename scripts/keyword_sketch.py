@@ -0,0 +1,297 @@
+"""
+Mergeable top-keyword sketches per source x month.
+
+For every (kind, source, month) cell, where kind is "keyword" (single terms,
+as in keyword_index.py) or "bigram" (adjacent cleaned tokens), this stage keeps
+two small summaries:
+
+  * Space-Saving counters: the `capacity` heaviest terms of the cell, each
+    with an upper-bound count and the most that count may be over.
+  * A count-min table (`depth` x `width` integers) over all of the cell's terms.
+
+Both merge by addition, so "top N for these sources in this period" is
+answered by merging the selected cells (see KeywordSketch.top) without going
+back to the reviews. Memory is fixed per cell, whatever the corpus size, and
+reviews are fed through in chunks.
+
+Error bounds, for a selection holding N term occurrences in total:
+
+  * Every term occurring more than N / capacity times is among the candidates.
+  * Each candidate's `lower_bound` <= true count <= `estimate`.
+  * `estimate` - true count <= N / capacity (Space-Saving, always), and
+    <= e * N / width with probability at least 1 - e^-depth (count-min).
+    KeywordSketch.error_bounds() reports both for a selection.
+
+    python scripts/keyword_sketch.py [--capacity 200] [--width 1024] [--depth 4] [--chunksize 50000]
+
+Outputs:
+    data/keyword_sketch.csv   Space-Saving counters (kind, source, month, term, count, error)
+    data/keyword_sketch.npz   count-min tables and cell totals
+"""
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from date_utils import file_timestamp, normalize_review_dates
+from keyword_index import group_term_counts, keyword_terms
+from review_view import BASE_PATH, load_view, require_ids
+from tokenize_reviews import TOKEN_PATTERN, align_rows, load_tokens, tokens_available
+
+COUNTERS_PATH = "data/keyword_sketch.csv"
+TABLES_PATH = "data/keyword_sketch.npz"
+
+KINDS = ["keyword", "bigram"]
+CELL_KEYS = ["kind", "source", "month"]
+
+CAPACITY = 200
+WIDTH = 1024
+DEPTH = 4
+CHUNKSIZE = 50_000
+
+
+# -----------------------------
+# Hashing (stable across processes)
+# -----------------------------
+def buckets(terms, width, depth):
+    """Count-min column of each term in each of the `depth` rows (depth x len(terms))."""
+    digests = b"".join(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest() for term in terms)
+    h = np.frombuffer(digests, dtype="<u4").reshape(-1, 2).astype(np.int64)
+    # Double hashing: row d uses h1 + d * h2
+    return (h[:, 0] + np.arange(depth)[:, None] * (h[:, 1] | 1)) % width
+
+
+# -----------------------------
+# Space-Saving summaries
+# -----------------------------
+def summary_floor(summary, capacity):
+    """
+    Most a term missing from `summary` can have occurred: the smallest kept
+    count once the summary is full (it may have been evicted), else 0.
+    """
+    return summary["count"].min() if len(summary) >= capacity else 0
+
+
+def merge_summaries(parts, capacity):
+    """
+    Merge (summary, floor) pairs into one Space-Saving summary of `capacity`
+    terms. A term missing from a part is credited that part's floor, both as
+    count and as error, which keeps count an upper bound and count - error a
+    lower bound.
+    """
+    parts = [(summary, floor) for summary, floor in parts if len(summary)]
+    if not parts:
+        return pd.DataFrame({"count": [], "error": []}, dtype=np.int64)
+    merged = pd.concat([summary - floor for summary, floor in parts]).groupby(level=0).sum()
+    merged += sum(floor for _, floor in parts)
+    return merged.nlargest(capacity, "count", keep="first")
+
+
+class SketchBuilder:
+    """Space-Saving counters and a count-min table per cell, updated chunk by chunk."""
+
+    def __init__(self, capacity=CAPACITY, width=WIDTH, depth=DEPTH):
+        self.capacity, self.width, self.depth = capacity, width, depth
+        self.summaries = {}
+        self.tables = {}
+        self.totals = {}
+
+    def add(self, cell, terms, counts, term_buckets):
+        """Add exact term counts from one chunk to `cell` (a CELL_KEYS tuple)."""
+        counts = np.asarray(counts, dtype=np.int64)
+        chunk = pd.DataFrame({"count": counts, "error": np.zeros_like(counts)}, index=pd.Index(terms, name="term"))
+        if cell in self.summaries:
+            current = self.summaries[cell]
+            chunk = merge_summaries([(current, summary_floor(current, self.capacity)), (chunk, 0)], self.capacity)
+        else:
+            chunk = chunk.nlargest(self.capacity, "count", keep="first")
+        self.summaries[cell] = chunk
+
+        table = self.tables.setdefault(cell, np.zeros((self.depth, self.width), dtype=np.int64))
+        np.add.at(table, (np.arange(self.depth)[:, None], term_buckets), counts)
+        self.totals[cell] = self.totals.get(cell, 0) + int(counts.sum())
+
+    def add_groups(self, kind, group_keys, counts, vocab, vocab_buckets):
+        """Add one chunk's per-(source, month) term counts (see group_term_counts)."""
+        for i in range(counts.shape[0]):
+            row = counts.getrow(i)
+            if row.nnz:
+                cell = (kind, group_keys.at[i, "source"], group_keys.at[i, "month"])
+                self.add(cell, vocab[row.indices], row.data, vocab_buckets[:, row.indices])
+
+    def save(self, counters_path=COUNTERS_PATH, tables_path=TABLES_PATH):
+        cells = sorted(self.summaries)
+        counters = pd.concat(
+            [self.summaries[cell].reset_index().assign(**dict(zip(CELL_KEYS, cell))) for cell in cells],
+            ignore_index=True,
+        ) if cells else pd.DataFrame(columns=["term", "count", "error", *CELL_KEYS])
+        counters[[*CELL_KEYS, "term", "count", "error"]].to_csv(counters_path + ".tmp", index=False)
+        os.replace(counters_path + ".tmp", counters_path)
+
+        keys = np.array(cells, dtype=str).reshape(-1, len(CELL_KEYS))
+        tables = (np.stack([self.tables[cell] for cell in cells]) if cells
+                  else np.zeros((0, self.depth, self.width), dtype=np.int64))
+        with open(tables_path + ".tmp", "wb") as f:
+            np.savez_compressed(f, kind=keys[:, 0], source=keys[:, 1], month=keys[:, 2],
+                                total=np.array([self.totals[cell] for cell in cells], dtype=np.int64),
+                                tables=tables, capacity=self.capacity)
+        os.replace(tables_path + ".tmp", tables_path)
+
+
+# -----------------------------
+# Building from the tokens stage
+# -----------------------------
+def review_months(df):
+    """"YYYY-MM" of each review ("" when the date is unknown)."""
+    dates = normalize_review_dates(df[["review_date", *(["fetched_at"] if "fetched_at" in df else [])]].copy(),
+                                   default_anchor=file_timestamp(BASE_PATH))["review_date"]
+    return dates.dt.strftime("%Y-%m").fillna("")
+
+
+def bigram_counts(cleaned):
+    """(CSR bigram counts, bigram vocabulary) for a chunk of cleaned texts."""
+    vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False, ngram_range=(2, 2), dtype=np.int64)
+    try:
+        X = vectorizer.fit_transform(cleaned)
+    except ValueError:  # no review in the chunk has two tokens
+        return None, None
+    return X.tocsr(), vectorizer.get_feature_names_out()
+
+
+def build_sketch(df, X, vocab, capacity=CAPACITY, width=WIDTH, depth=DEPTH, chunksize=CHUNKSIZE):
+    """
+    Sketch every review in `df` (source, month, cleaned_text) in chunks of
+    `chunksize` rows; `X` is the keyword document-term matrix aligned with `df`.
+    """
+    builder = SketchBuilder(capacity, width, depth)
+    vocab_buckets = buckets(vocab, width, depth)
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start:start + chunksize].reset_index(drop=True)
+        keys = chunk[["source", "month"]]
+
+        group_keys, counts = group_term_counts(X[start:start + chunksize], keys)
+        builder.add_groups("keyword", group_keys, counts, vocab, vocab_buckets)
+
+        B, bigrams = bigram_counts(chunk["cleaned_text"])
+        if B is not None:
+            group_keys, counts = group_term_counts(B, keys)
+            builder.add_groups("bigram", group_keys, counts, bigrams, buckets(bigrams, width, depth))
+    return builder
+
+
+# -----------------------------
+# Querying
+# -----------------------------
+class KeywordSketch:
+    """The saved sketches; `top()` merges any selection of cells."""
+
+    def __init__(self, counters, cells, tables, capacity):
+        self.cells = cells
+        self.tables = tables
+        self.capacity = capacity
+        self.depth, self.width = tables.shape[1:]
+        # Each counter carries its cell's row, and count/error relative to the cell floor
+        cell_index = pd.MultiIndex.from_frame(cells[CELL_KEYS])
+        counters = counters.assign(cell=cell_index.get_indexer(pd.MultiIndex.from_frame(counters[CELL_KEYS])))
+        floors = counters.groupby("cell")["count"].agg(["min", "size"])
+        cells["floor"] = 0
+        full = floors.index[floors["size"] >= capacity]
+        cells.loc[full, "floor"] = floors.loc[full, "min"]
+        floor = cells["floor"].to_numpy()[counters["cell"].to_numpy()]
+        self.counters = counters.assign(count=counters["count"] - floor, error=counters["error"] - floor)
+
+    @classmethod
+    def load(cls, counters_path=COUNTERS_PATH, tables_path=TABLES_PATH):
+        counters = pd.read_csv(counters_path, dtype={"source": str, "month": str, "term": str},
+                               keep_default_na=False)
+        with np.load(tables_path) as saved:
+            cells = pd.DataFrame({key: saved[key] for key in [*CELL_KEYS, "total"]})
+            return cls(counters, cells, saved["tables"], int(saved["capacity"]))
+
+    @property
+    def sources(self):
+        return sorted(self.cells["source"].unique())
+
+    @property
+    def months(self):
+        return sorted(m for m in self.cells["month"].unique() if m)
+
+    def select(self, kind="keyword", sources=None, start=None, end=None):
+        """Boolean mask over cells; `start`/`end` are inclusive "YYYY-MM" months."""
+        mask = self.cells["kind"] == kind
+        if sources is not None:
+            mask &= self.cells["source"].isin(sources)
+        if start is not None:
+            mask &= self.cells["month"] >= start
+        if end is not None:
+            mask &= (self.cells["month"] <= end) & (self.cells["month"] != "")
+        return mask.to_numpy()
+
+    def error_bounds(self, mask):
+        """Occurrences N, the Space-Saving bound and the count-min bound for a selection."""
+        total = int(self.cells.loc[mask, "total"].sum())
+        return {
+            "occurrences": total,
+            "space_saving": int(self.cells.loc[mask, "floor"].sum()),
+            "count_min": float(np.e * total / self.width),
+            "count_min_confidence": float(1 - np.exp(-self.depth)),
+        }
+
+    def top(self, kind="keyword", sources=None, start=None, end=None, top_n=15):
+        """
+        Approximate top-N terms for the selected sources and months: term,
+        estimate (upper bound) and lower_bound, heaviest first.
+        """
+        mask = self.select(kind, sources, start, end)
+        counters = self.counters[mask[self.counters["cell"].to_numpy()]]
+        if counters.empty:
+            return pd.DataFrame({"term": [], "estimate": [], "lower_bound": []})
+
+        merged = counters.groupby("term", sort=False)[["count", "error"]].sum()
+        floor = self.cells.loc[mask, "floor"].sum()
+        upper = merged["count"].to_numpy() + floor
+        lower = merged["count"].to_numpy() - merged["error"].to_numpy()
+
+        table = self.tables[mask].sum(axis=0)
+        cms = table[np.arange(self.depth)[:, None], buckets(merged.index, self.width, self.depth)].min(axis=0)
+        result = pd.DataFrame({"term": merged.index, "estimate": np.minimum(upper, cms), "lower_bound": lower})
+        return result.sort_values(["estimate", "lower_bound", "term"], ascending=[False, False, True],
+                                  ignore_index=True).head(top_n)
+
+
+def sketch_available(counters_path=COUNTERS_PATH, tables_path=TABLES_PATH):
+    return os.path.exists(counters_path) and os.path.exists(tables_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per source x month keyword/bigram sketches")
+    parser.add_argument("--capacity", type=int, default=CAPACITY, help="Space-Saving counters per cell")
+    parser.add_argument("--width", type=int, default=WIDTH, help="count-min columns")
+    parser.add_argument("--depth", type=int, default=DEPTH, help="count-min rows (hash functions)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="reviews per update batch")
+    args = parser.parse_args()
+
+    require_ids()
+    if not tokens_available():
+        raise SystemExit("❌ Document-term matrix not found; run tokenize_reviews.py first")
+
+    header = pd.read_csv(BASE_PATH, nrows=0).columns
+    columns = ["review_id", "source", "review_date", *(["fetched_at"] if "fetched_at" in header else []),
+               "cleaned_text"]
+    df = load_view(stages=("tokens",), columns=columns)
+    df["cleaned_text"] = df["cleaned_text"].fillna("")
+    df["month"] = review_months(df)
+
+    row_ids, vocab, X = load_tokens()
+    X, vocab = keyword_terms(X[align_rows(row_ids, df["review_id"])], vocab)
+
+    builder = build_sketch(df[["source", "month", "cleaned_text"]], X, vocab,
+                           args.capacity, args.width, args.depth, args.chunksize)
+    builder.save()
+
+    print("\n🎉 Keyword sketches built!")
+    print(f"📁 Saved: {COUNTERS_PATH}, {TABLES_PATH}")
+    print(f"🧮 {len(builder.summaries)} cells x ({args.capacity} counters + {args.depth}x{args.width} count-min)")
@@ -0,0 +1,210 @@
+import json
+import os
+import random
+import time
+
+# -----------------------------
+# Error classification
+# -----------------------------
+# Status codes worth retrying on the same model (server hiccups, timeouts)
+TRANSIENT_STATUS = {408, 409, 500, 502, 503, 504}
+
+
+class LLMCallFailed(Exception):
+    """Raised when every model failed or the retry budget ran out."""
+
+
+def _status_code(error):
+    return getattr(error, "status_code", None)
+
+
+def _retry_after(error):
+    """Read the retry-after header (seconds) from an API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+def _is_network_error(error):
+    """Timeouts and connection failures, from the Groq/OpenAI SDKs or the standard library."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # The SDKs' APITimeoutError subclasses APIConnectionError
+    return any(cls.__name__ == "APIConnectionError" for cls in type(error).__mro__)
+
+
+def classify_error(error):
+    """Return 'rate_limited', 'transient' or 'fatal' for an API exception."""
+    status = _status_code(error)
+    if status == 429:
+        return "rate_limited"
+    if status in TRANSIENT_STATUS or (status is None and _is_network_error(error)):
+        return "transient"
+    # Anything else (bad request, or a bug such as a TypeError) is not worth retrying
+    return "fatal"
+
+
+# -----------------------------
+# Per-model circuit breaker
+# -----------------------------
+class CircuitBreaker:
+    """Skip a model for a cool-down period after rate limits or repeated failures."""
+
+    def __init__(self, failure_threshold=3, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+
+    def is_open(self, now=None):
+        now = time.monotonic() if now is None else now
+        return now < self.open_until
+
+    def trip(self, seconds=None):
+        self.open_until = time.monotonic() + (self.cooldown if seconds is None else seconds)
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.trip()
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0.0
+
+
+# -----------------------------
+# Resilient client
+# -----------------------------
+class ResilientLLMClient:
+    """
+    Wraps a Groq/OpenAI-style client with jittered exponential backoff,
+    retry-after handling, per-model circuit breakers and a dead-letter list.
+    """
+
+    def __init__(self, client, models, max_attempts=8, base_delay=1.0, max_delay=60.0,
+                 failure_threshold=3, cooldown=60.0):
+        self.client = client
+        self.models = list(models)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breakers = {m: CircuitBreaker(failure_threshold, cooldown) for m in self.models}
+        self.dead_letters = []
+        self.delivered = set()      # (output, prompt) of requests that succeeded this run
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "failovers": 0, "failed": 0}
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _pick_model(self, skipped):
+        candidates = [m for m in self.models if m not in skipped]
+        if not candidates:
+            return None, 0.0
+        now = time.monotonic()
+        for model in candidates:
+            if not self.breakers[model].is_open(now):
+                return model, 0.0
+        # Every model is cooling down: wait for the first one to reopen
+        model = min(candidates, key=lambda m: self.breakers[m].open_until)
+        return model, self.breakers[model].open_until - now
+
+    def complete(self, prompt, timeout=120):
+        """Return (text, model) for a prompt, or raise LLMCallFailed."""
+        skipped = set()
+        last_error = None
+        previous_model = None
+
+        for attempt in range(self.max_attempts):
+            model, wait = self._pick_model(skipped)
+            if model is None:
+                break
+            if wait > 0:
+                time.sleep(min(wait, self.max_delay))
+            if previous_model is not None and model != previous_model:
+                self.stats["failovers"] += 1
+                print(f"⚠️ Switching to model {model}...")
+            if attempt > 0:
+                self.stats["retries"] += 1
+            previous_model = model
+
+            self.stats["calls"] += 1
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    timeout=timeout
+                )
+            except Exception as e:
+                last_error = e
+                kind = classify_error(e)
+                breaker = self.breakers[model]
+                if kind == "rate_limited":
+                    self.stats["rate_limited"] += 1
+                    breaker.trip(_retry_after(e))
+                    print(f"⏳ {model} rate limited, cooling down {breaker.open_until - time.monotonic():.0f}s")
+                elif kind == "transient":
+                    breaker.record_failure()
+                    delay = self._backoff(attempt)
+                    print(f"⚠️ {model} transient error: {e} (retrying in {delay:.1f}s)")
+                    time.sleep(delay)
+                else:
+                    # Request itself is bad for this model (e.g. context too large)
+                    print(f"⚠️ {model} rejected the request: {e}")
+                    skipped.add(model)
+                continue
+
+            self.breakers[model].record_success()
+            return response.choices[0].message.content, model
+
+        self.stats["failed"] += 1
+        raise LLMCallFailed(f"All models failed after {self.max_attempts} attempts: {last_error}")
+
+    # -----------------------------
+    # Dead letters
+    # -----------------------------
+    def dead_letter(self, prompt, error, **meta):
+        """Record a failed request so it can be replayed later."""
+        self.dead_letters.append({"prompt": prompt, "error": str(error), **meta})
+
+    def delivered_letter(self, prompt, **meta):
+        """Record a successful request, so an older dead letter for it is dropped."""
+        self.delivered.add((meta.get("output"), prompt))
+
+    def save_dead_letters(self, path):
+        """
+        Merge this run's dead letters into the file at `path`: earlier entries
+        stay until their request succeeds, so a chunk that failed is never
+        forgotten. The file is removed once nothing is left.
+        """
+        def key(entry):
+            return entry.get("output"), entry["prompt"]
+
+        failed_now = {key(entry) for entry in self.dead_letters}
+        kept = [entry for entry in load_dead_letters(path)
+                if key(entry) not in self.delivered and key(entry) not in failed_now]
+        entries = kept + self.dead_letters
+        if not entries:
+            if os.path.exists(path):
+                os.remove(path)
+            return entries
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=4, ensure_ascii=False)
+        return entries
+
+
+def load_dead_letters(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,36 +1,128 @@
+import argparse
 import os
+from collections import Counter
+
 import pandas as pd
 
+from date_utils import CSV_DATE_FORMAT, file_timestamp, normalize_review_dates
+from review_view import with_review_ids
+
 cleaned_folder = "data/cleaned"
+OUTPUT_CSV = "data/final_cleaned_dataset.csv"
+OUTPUT_JSON = "data/final_cleaned_dataset.json"
+
+# Fixed dtypes, so every chunk of a file is read exactly like the whole file
+CLEANED_DTYPES = {"reviewer_name": str, "review_date": str, "rating": "float64", "review_text": str, "fetched_at": str}
 
-# Get only cleaned CSV files
-files = [f for f in os.listdir(cleaned_folder) if f.endswith("_cleaned.csv")]
 
-if not files:
-    print("❌ No cleaned CSV files found in data/cleaned folder. Please check filenames.")
-    exit()
+def _tag(df, file_path):
+    # Add business source column
+    df["source"] = os.path.basename(file_path).replace("_cleaned.csv", "")
 
-merged_data = []
+    # Files cleaned before fetch times were recorded fall back to the file's mtime
+    if "fetched_at" not in df.columns:
+        df["fetched_at"] = file_timestamp(file_path).isoformat()
+    return df
 
-for file in files:
-    file_path = os.path.join(cleaned_folder, file)
-    print(f"📌 Adding: {file}")
 
-    df = pd.read_csv(file_path)
+def load_cleaned(file_path):
+    """Read one cleaned CSV, tagged with its business source."""
+    return _tag(pd.read_csv(file_path, dtype=CLEANED_DTYPES), file_path)
 
-    # Add business source column
-    df["source"] = file.replace("_cleaned.csv", "")
-    
-    merged_data.append(df)
 
-# Merge all
-final_df = pd.concat(merged_data, ignore_index=True)
+def iter_cleaned(file_path, chunksize):
+    """Like load_cleaned, in chunks of `chunksize` rows."""
+    for chunk in pd.read_csv(file_path, dtype=CLEANED_DTYPES, chunksize=chunksize):
+        yield _tag(chunk, file_path)
+
+
+def merge_cleaned(frames, anchor=None):
+    # Merge all
+    final_df = pd.concat(frames, ignore_index=True)
+
+    # Resolve relative dates ("2 weeks ago") once, so every later stage and the
+    # dashboard get a real datetime column
+    final_df = normalize_review_dates(final_df, default_anchor=anchor or pd.Timestamp.now(tz="UTC"))
+
+    # Later stages write their columns keyed by this id (see review_view.py)
+    return with_review_ids(final_df)
+
+
+def save_merged(final_df, csv_path=OUTPUT_CSV, json_path=OUTPUT_JSON):
+    # Save as CSV + JSON for flexibility
+    final_df.to_csv(csv_path, index=False, date_format=CSV_DATE_FORMAT)
+    final_df.to_json(json_path, orient="records", indent=4, force_ascii=False, date_format="iso")
+
+
+def _merged_columns(file_paths):
+    """Column order of the in-memory merge, worked out from the headers alone."""
+    headers = [_tag(pd.read_csv(path, nrows=0), path) for path in file_paths]
+    return pd.concat(headers, ignore_index=True).columns
+
+
+def merge_streaming(file_paths, chunksize, csv_path=OUTPUT_CSV, json_path=OUTPUT_JSON, anchor=None):
+    """
+    Out-of-core merge: read, date and append one chunk at a time, so memory
+    is bounded by `chunksize` rows. Writes the same files as save_merged.
+    Returns the number of rows written.
+    """
+    anchor = anchor or pd.Timestamp.now(tz="UTC")
+    columns = _merged_columns(file_paths)
+    # Duplicate numbering of review ids carries across chunks
+    seen = Counter()
+    rows = 0
+
+    # Written under temporary names, so a failed run never leaves half a dataset
+    with open(csv_path + ".tmp", "w", encoding="utf-8", newline="") as csv_file, \
+         open(json_path + ".tmp", "w", encoding="utf-8") as json_file:
+        json_file.write("[\n")
+        for file_path in file_paths:
+            for chunk in iter_cleaned(file_path, chunksize):
+                chunk = normalize_review_dates(chunk.reindex(columns=columns), default_anchor=anchor)
+                chunk = with_review_ids(chunk, seen)
+                chunk.to_csv(csv_file, index=False, header=rows == 0, date_format=CSV_DATE_FORMAT)
+
+                # Records of one chunk, without the surrounding "[\n" and "\n]"
+                records = chunk.to_json(orient="records", indent=4, force_ascii=False, date_format="iso")
+                json_file.write((",\n" if rows else "") + records[2:-2])
+                rows += len(chunk)
+        json_file.write("\n]")
+
+    if rows == 0:
+        # Match pandas' output for an empty frame
+        pd.DataFrame(columns=["review_id", *columns]).to_csv(csv_path + ".tmp", index=False)
+        with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write("[]")
+    os.replace(csv_path + ".tmp", csv_path)
+    os.replace(json_path + ".tmp", json_path)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the cleaned per-business CSVs into one dataset")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the files in chunks of this many rows (bounded memory)")
+    args = parser.parse_args()
+
+    # Get only cleaned CSV files
+    files = sorted(f for f in os.listdir(cleaned_folder) if f.endswith("_cleaned.csv"))
+
+    if not files:
+        print("❌ No cleaned CSV files found in data/cleaned folder. Please check filenames.")
+        exit()
+
+    for file in files:
+        print(f"📌 Adding: {file}")
+    file_paths = [os.path.join(cleaned_folder, file) for file in files]
 
-# Save as CSV + JSON for flexibility
-final_df.to_csv("data/final_cleaned_dataset.csv", index=False)
-final_df.to_json("data/final_cleaned_dataset.json", orient="records", indent=4, force_ascii=False)
+    if args.chunksize:
+        total = merge_streaming(file_paths, args.chunksize)
+    else:
+        final_df = merge_cleaned([load_cleaned(path) for path in file_paths])
+        save_merged(final_df)
+        total = len(final_df)
 
-print("\n🎉 SUCCESS! Final merged dataset created:")
-print(f"📄 CSV: data/final_cleaned_dataset.csv")
-print(f"📄 JSON: data/final_cleaned_dataset.json")
-print(f"📊 Total Reviews: {len(final_df)}")
+    print("\n🎉 SUCCESS! Final merged dataset created:")
+    print(f"📄 CSV: {OUTPUT_CSV}")
+    print(f"📄 JSON: {OUTPUT_JSON}")
+    print(f"📊 Total Reviews: {total}")
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned completions: picked deterministically from a hash of the prompt
+CANNED_RESPONSES = [
+    "- Customers praise the friendly and attentive staff\n- Several reviews mention long wait times\n- Overall satisfaction is high",
+    "- Cleanliness and ambience are recurring positives\n- Pricing is seen as slightly high for the value\n- Service speed varies at peak hours",
+    "- Improve queue management during busy periods\n- Train staff on consistent communication\n- Review billing transparency",
+]
+
+
+class MockConfig:
+    """Behaviour knobs for the mock server."""
+
+    def __init__(self, latency=0.2, jitter=0.0, rate_limit=0.0, error_rate=0.0, seed=42):
+        self.latency = latency          # seconds per completion
+        self.jitter = jitter            # +/- seconds added to latency
+        self.rate_limit = rate_limit    # requests/sec before 429s (0 = unlimited)
+        self.error_rate = error_rate    # share of requests answered with a 500
+        self.seed = seed
+
+
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Return 0 if a token was taken, else seconds until the next one."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+def canned_completion(prompt):
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+    return CANNED_RESPONSES[int(digest, 16) % len(CANNED_RESPONSES)], digest
+
+
+def make_handler(config):
+    bucket = TokenBucket(config.rate_limit) if config.rate_limit > 0 else None
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+    counters = {"requests": 0, "rate_limited": 0, "errors": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        server_counters = counters
+
+        def log_message(self, format, *args):
+            pass  # keep benchmark output clean
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            counters["requests"] += 1
+
+            if bucket is not None:
+                wait = bucket.take()
+                if wait > 0:
+                    counters["rate_limited"] += 1
+                    self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                               {"retry-after": f"{wait:.2f}"})
+                    return
+
+            with rng_lock:
+                fail = rng.random() < config.error_rate
+                delay = config.latency + rng.uniform(-config.jitter, config.jitter)
+            time.sleep(max(delay, 0.0))
+
+            if fail:
+                counters["errors"] += 1
+                self._send(500, {"error": {"message": "Injected server error"}})
+                return
+
+            prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+            content, digest = canned_completion(prompt)
+            self._send(200, {
+                "id": f"chatcmpl-{digest[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                          "total_tokens": len(prompt.split()) + len(content.split())},
+            })
+
+    return Handler
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """Start the mock server in a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Groq/OpenAI-compatible mock LLM server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of latency jitter")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/sec before 429s (0 = off)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that return 500")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.jitter, args.rate_limit, args.error_rate, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(config))
+    print(f"🧪 Mock LLM server on http://127.0.0.1:{args.port}")
+    print(f"   Point the pipeline at it with GROQ_BASE_URL=http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Mock server stopped.")
@@ -0,0 +1,402 @@
+"""
+Incremental pipeline runner.
+
+Every script in scripts/ is a stage with declared inputs and outputs; a
+stage depends on the stages whose outputs match its inputs. A stage is
+skipped when the content hashes of its inputs and of its code are the same
+as on its last successful run (and its outputs are still there), so a
+nightly run only redoes what new data requires. Stages whose dependencies
+are done run in parallel.
+
+    python scripts/pipeline.py                      # run whatever is stale
+    python scripts/pipeline.py --fetch              # fetch data/businesses.json first
+    python scripts/pipeline.py --from sentiment --to keywords
+    python scripts/pipeline.py --dry-run            # show the plan only
+    python scripts/pipeline.py --sharded --workers 8  # per-business process pool
+    python scripts/pipeline.py --force --profile memory  # profile report in reports/profile/
+
+Run from the repository root, like the individual scripts.
+"""
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import profiling
+
+SCRIPTS_DIR = "scripts"
+STATE_PATH = "data/.pipeline_state.json"
+LOG_DIR = "logs/pipeline"
+
+# name -> SerpAPI place id, for --fetch
+BUSINESSES_PATH = "data/businesses.json"
+
+
+class Stage:
+    """One script run: its arguments, declared inputs/outputs and code files."""
+
+    def __init__(self, name, script, inputs=(), outputs=(), args=(), code=(), always=False):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)      # paths or glob patterns
+        self.outputs = list(outputs)
+        self.args = list(args)
+        # The script itself plus the local modules it imports
+        self.code = [os.path.join(SCRIPTS_DIR, f) for f in [script, *code]]
+        self.always = always            # no local inputs (e.g. API fetches): always stale
+
+    @property
+    def group(self):
+        """'clean' for 'clean:taj_mumbai'; used by --from/--to."""
+        return self.name.split(":")[0]
+
+    def command(self):
+        return [sys.executable, os.path.join(SCRIPTS_DIR, self.script), *self.args]
+
+
+def build_stages(fetch=False, sharded=False, workers=None, chunksize=None):
+    stages = []
+
+    if fetch:
+        with open(BUSINESSES_PATH, "r", encoding="utf-8") as f:
+            businesses = json.load(f)
+        for name, place_id in businesses.items():
+            stages.append(Stage(f"fetch:{name}", "fetch_reviews.py",
+                                outputs=[f"data/raw/{name}.json"],
+                                args=["--place-id", place_id, "--name", name], always=True))
+
+    # Out-of-core merge / sentiment for corpora larger than RAM
+    streaming = ["--chunksize", str(chunksize)] if chunksize else []
+    base = "data/final_cleaned_dataset.csv"
+    per_source = [base, "data/final_cleaned_dataset.json", "data/columns/sentiment.csv"]
+    if sharded:
+        # Clean + merge + sentiment per business in a process pool (shard_runner.py)
+        stages.append(Stage("shards", "shard_runner.py",
+                            inputs=["data/raw/*.json", "data/cleaned/*_cleaned.csv"], outputs=per_source,
+                            args=["--workers", str(workers or os.cpu_count())],
+                            code=["clean_reviews.py", "merge_cleaned.py", "sentiment_analysis.py", "date_utils.py",
+                                  "review_view.py"]))
+    else:
+        # One cleaning stage per raw file, so only changed businesses are re-cleaned
+        raw_names = {os.path.splitext(os.path.basename(p))[0] for p in glob.glob("data/raw/*.json")}
+        raw_names |= {s.name.split(":", 1)[1] for s in stages}
+        for name in sorted(raw_names):
+            stages.append(Stage(f"clean:{name}", "clean_reviews.py",
+                                inputs=[f"data/raw/{name}.json"],
+                                outputs=[f"data/cleaned/{name}_cleaned.csv"],
+                                args=[name], code=["date_utils.py"]))
+        stages += [
+            Stage("merge", "merge_cleaned.py",
+                  inputs=["data/cleaned/*_cleaned.csv"], outputs=per_source[:2],
+                  args=streaming, code=["date_utils.py", "review_view.py"]),
+            Stage("sentiment", "sentiment_analysis.py",
+                  inputs=[base], outputs=per_source[2:], args=streaming, code=["review_view.py"]),
+        ]
+
+    topic_dataset = "data/final_topic_labeled_dataset.csv"
+    tokens = ["data/tokens/dtm.npz", "data/tokens/review_ids.txt", "data/tokens/vocab.txt"]
+    stages += [
+        # Sentiment, tokens and topics each write only their own columns, keyed by review_id;
+        # the document-term matrix is built once and shared by topics and keywords
+        Stage("tokens", "tokenize_reviews.py", inputs=[base],
+              outputs=["data/columns/tokens.csv", *tokens], code=["review_view.py"]),
+        # New reviews go to the fitted topics; BERTopic refits only when topics drift
+        Stage("topics", "topic_drift.py", inputs=["data/columns/tokens.csv", *tokens],
+              outputs=["data/columns/topics.csv", "data/topic_keywords.csv", "data/topic_map.csv",
+                       "data/topic_drift.json"],
+              code=["bertopic_modeling.py", "topic_map.py", "review_view.py", "tokenize_reviews.py",
+                    "keyword_index.py"]),
+        # ...and this stage joins them into the wide table everything downstream reads
+        Stage("view", "review_view.py", inputs=[base, "data/columns/*.csv"], outputs=[topic_dataset],
+              args=streaming),
+        # Cube, keywords and store read the column files through load_view(columns=...), so they
+        # neither wait for nor re-read the text in the wide table
+        Stage("cube", "aggregates.py", inputs=[base, "data/columns/*.csv"], outputs=["data/review_cube.csv"],
+              code=["date_utils.py", "review_view.py"]),
+        Stage("keywords", "keyword_index.py", inputs=[base, "data/columns/*.csv", *tokens],
+              outputs=["data/keyword_index.csv"], code=["tokenize_reviews.py", "review_view.py"]),
+        # Sentence-level sentiment per aspect (service, staff, ...), long format
+        Stage("aspects", "aspect_sentiment.py", inputs=[base],
+              outputs=["data/aspect_sentiment.csv", "data/sentence_cache.csv"],
+              code=["sentiment_analysis.py", "review_view.py"]),
+        # Mergeable top-keyword/bigram sketches per source x month for the overview page
+        Stage("sketches", "keyword_sketch.py", inputs=[base, "data/columns/tokens.csv", *tokens],
+              outputs=["data/keyword_sketch.csv", "data/keyword_sketch.npz"],
+              code=["tokenize_reviews.py", "keyword_index.py", "review_view.py", "date_utils.py"]),
+        Stage("store", "dataset_store.py", inputs=[base, "data/columns/*.csv"],
+              outputs=["data/dashboard_store.parquet"], code=["date_utils.py", "review_view.py"]),
+        Stage("llm_summary", "generate_llm_summary.py", inputs=[topic_dataset],
+              outputs=["reports/executive_summary.txt", "reports/topic_insights.txt",
+                       "reports/recommendations.txt"],
+              code=["llm_client.py"]),
+        # All static charts in one headless pass; the topic map comes from data/topic_map.csv
+        Stage("charts", "render_charts.py", inputs=[topic_dataset, "data/topic_map.csv"],
+              outputs=["visualizations/topic_distribution_barchart.png",
+                       "visualizations/sentiment_by_topic.png",
+                       "visualizations/bertopic_visualization.html"],
+              code=["visualize_barchart.py", "visualize_sentiment_by_topic.py", "topic_map.py"]),
+    ]
+    return stages
+
+
+# -----------------------------
+# DAG helpers
+# -----------------------------
+def dependencies(stages):
+    """stage name -> names of the stages producing any of its inputs."""
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = {
+            other.name for other in stages if other is not stage
+            if any(fnmatch.fnmatch(out, pattern) for pattern in stage.inputs for out in other.outputs)
+        }
+    return deps
+
+
+def _reachable(start, edges):
+    seen, todo = set(start), list(start)
+    while todo:
+        for nxt in edges.get(todo.pop(), ()):
+            if nxt not in seen:
+                seen.add(nxt)
+                todo.append(nxt)
+    return seen
+
+
+def select(stages, deps, start=None, stop=None):
+    """Stage names between --from (and everything downstream) and --to (and everything upstream)."""
+    names = {s.name for s in stages}
+    dependents = {name: {n for n, d in deps.items() if name in d} for name in names}
+
+    def matching(group):
+        found = {s.name for s in stages if group in (s.name, s.group)}
+        if not found:
+            raise SystemExit(f"❌ Unknown stage '{group}'. Stages: {', '.join(sorted(names))}")
+        return found
+
+    if start:
+        names &= _reachable(matching(start), dependents)
+    if stop:
+        names &= _reachable(matching(stop), deps)
+    return names
+
+
+# -----------------------------
+# Content hashes
+# -----------------------------
+class HashCache:
+    """sha256 of files, re-read only when a file's size or mtime changed."""
+
+    def __init__(self, entries):
+        self.entries = entries      # path -> [size, mtime, digest]
+
+    def file(self, path):
+        stat = os.stat(path)
+        cached = self.entries.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.entries[path] = [stat.st_size, stat.st_mtime, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Hash over the stage's arguments, code and every input file's content."""
+        digest = hashlib.sha256(json.dumps(stage.command()[1:]).encode())
+        for pattern in stage.code + stage.inputs:
+            for path in sorted(glob.glob(pattern)):
+                digest.update(f"{path}:{self.file(path)}".encode())
+        return digest.hexdigest()
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {"stages": {}, "hashes": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def is_stale(stage, fingerprint, state, hashes):
+    if stage.always:
+        return True
+    previous = state["stages"].get(stage.name)
+    if previous is None or previous["fingerprint"] != fingerprint:
+        return True
+    # Outputs deleted or edited by hand since the last run
+    for path, digest in previous["outputs"].items():
+        if not os.path.exists(path) or hashes.file(path) != digest:
+            return True
+    return False
+
+
+# -----------------------------
+# Execution
+# -----------------------------
+def run_stage(stage):
+    """Run one stage, logging its output to logs/pipeline/<stage>.log."""
+    for path in stage.outputs:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    # Unattended: charts render off-screen
+    env = {**os.environ, "MPLBACKEND": "Agg", "PYTHONIOENCODING": "utf-8"}
+    log_path = os.path.join(LOG_DIR, stage.name.replace(":", "_") + ".log")
+    command = stage.command()
+    if profiling.PROFILE_ENV in env:
+        command = [command[0], os.path.join(SCRIPTS_DIR, "profiling.py"), "run", stage.name, *command[1:]]
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        result = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT,
+                                stdin=subprocess.DEVNULL, env=env)
+    return result.returncode, time.perf_counter() - start, log_path
+
+
+def adopt(stages, selected):
+    """Record the selected stages' current outputs as up to date without running them."""
+    state = load_state()
+    hashes = HashCache(state.setdefault("hashes", {}))
+    for stage in stages:
+        if stage.name not in selected:
+            continue
+        if not all(os.path.exists(p) for p in stage.outputs):
+            print(f"⏭️  {stage.name}: outputs missing, not adopted")
+            continue
+        state["stages"][stage.name] = {"fingerprint": hashes.fingerprint(stage),
+                                       "outputs": {p: hashes.file(p) for p in stage.outputs},
+                                       "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        print(f"📌 {stage.name}: adopted")
+    save_state(state)
+
+
+def run_pipeline(stages, selected, jobs=4, force=False, dry_run=False):
+    """Run the selected stages in dependency order. Returns the names of failed stages."""
+    deps = dependencies(stages)
+    by_name = {s.name: s for s in stages}
+    state = load_state()
+    hashes = HashCache(state.setdefault("hashes", {}))
+
+    pending = {name: deps[name] & selected for name in selected}
+    done, failed, blocked = set(), set(), set()
+    will_run = set()     # dry run: stages that would run
+    running = {}
+
+    def schedule(pool):
+        for name in sorted(pending):
+            if pending[name] - done:
+                if pending[name] & (failed | blocked):
+                    blocked.add(name)
+                    del pending[name]
+                    print(f"⏭️  {name}: blocked by a failed dependency")
+                continue
+            del pending[name]
+            stage = by_name[name]
+            fingerprint = hashes.fingerprint(stage)
+            upstream_changed = bool(deps[name] & will_run)
+            if not force and not upstream_changed and not is_stale(stage, fingerprint, state, hashes):
+                print(f"✅ {name}: up to date")
+                done.add(name)
+                return True
+            if dry_run:
+                print(f"🔸 {name}: would run  ({' '.join(stage.command()[1:])})")
+                will_run.add(name)
+                done.add(name)
+                return True
+            print(f"▶️  {name}: running")
+            running[pool.submit(run_stage, stage)] = (stage, fingerprint)
+        return False
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Skipped stages may unblock others right away
+            while schedule(pool):
+                pass
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, fingerprint = running.pop(future)
+                code, elapsed, log_path = future.result()
+                if code != 0:
+                    failed.add(stage.name)
+                    print(f"❌ {stage.name}: failed after {elapsed:.1f}s (see {log_path})")
+                    continue
+                done.add(stage.name)
+                outputs = {p: hashes.file(p) for p in stage.outputs if os.path.exists(p)}
+                state["stages"][stage.name] = {"fingerprint": fingerprint, "outputs": outputs,
+                                               "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                # Saved after every stage, so an interrupted run resumes where it stopped
+                save_state(state)
+                print(f"🎉 {stage.name}: done in {elapsed:.1f}s")
+
+    if not dry_run:
+        save_state(state)
+    return failed | blocked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the review pipeline incrementally")
+    parser.add_argument("--from", dest="start", help="first stage (or stage group, e.g. 'clean')")
+    parser.add_argument("--to", dest="stop", help="last stage (or stage group)")
+    parser.add_argument("--fetch", action="store_true",
+                        help=f"fetch fresh reviews for every business in {BUSINESSES_PATH}")
+    parser.add_argument("--jobs", type=int, default=4, help="stages run in parallel")
+    parser.add_argument("--sharded", action="store_true",
+                        help="clean and score each business in its own worker (see shard_runner.py)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --sharded")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="run merge and sentiment out-of-core in chunks of this many rows")
+    parser.add_argument("--force", action="store_true", help="re-run selected stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="print what would run")
+    parser.add_argument("--list", action="store_true", help="list stages and their dependencies")
+    parser.add_argument("--profile", nargs="?", const="1", default=None, metavar="MODES",
+                        help="profile each stage that runs (modes: time, memory, cprofile; see profiling.py)")
+    parser.add_argument("--adopt", action="store_true",
+                        help="mark existing outputs as up to date (first run on an existing checkout)")
+    args = parser.parse_args()
+
+    stages = build_stages(fetch=args.fetch, sharded=args.sharded, workers=args.workers,
+                          chunksize=args.chunksize)
+
+    if args.list:
+        deps = dependencies(stages)
+        for stage in stages:
+            after = ", ".join(sorted(deps[stage.name])) or "-"
+            print(f"{stage.name:<24} after: {after}")
+        sys.exit(0)
+
+    selected = select(stages, dependencies(stages), args.start, args.stop)
+    if not selected:
+        raise SystemExit("❌ No stages between --from and --to (see --list for the DAG)")
+    if args.adopt:
+        adopt(stages, selected)
+        sys.exit(0)
+
+    if args.profile:
+        os.environ[profiling.PROFILE_ENV] = args.profile
+    profile = bool(os.environ.get(profiling.PROFILE_ENV)) and not args.dry_run
+    if profile:
+        profiling.clear_records()
+
+    failed = run_pipeline(stages, selected, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+
+    if profile and profiling.write_report():
+        print(f"📊 Profile report: {profiling.REPORT_HTML}")
+
+    if failed:
+        print(f"\n⚠️ {len(failed)} stage(s) did not complete: {', '.join(sorted(failed))}")
+        sys.exit(1)
+    print("\n🎉 Pipeline complete!")
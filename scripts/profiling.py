@@ -0,0 +1,337 @@
+"""
+Stage profiler for the pipeline scripts.
+
+Switched on with the PIPELINE_PROFILE environment variable (or
+`pipeline.py --profile`). Its value is a comma-separated list of modes:
+
+    1 / time    wall and CPU time, peak RSS and hot-function timings (cheap)
+    memory      also trace Python allocations with tracemalloc (slower)
+    cprofile    also run cProfile and dump .prof files for pstats/snakeviz
+
+Hot functions are wrapped with `@profiling.hot` or `with profiling.timed()`;
+when profiling is off `hot` returns the function unchanged, so there is no
+cost at all. Each stage writes one JSON record to logs/profile/current/, and
+`report` combines them into one JSON + HTML report compared with the previous
+report.
+
+    PIPELINE_PROFILE=1 python scripts/profiling.py run sentiment scripts/sentiment_analysis.py
+    python scripts/profiling.py report
+"""
+import argparse
+import atexit
+import functools
+import glob
+import html
+import io
+import json
+import os
+import runpy
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "PIPELINE_PROFILE"
+RECORD_DIR = "logs/profile/current"
+REPORT_DIR = "reports/profile"
+REPORT_JSON = os.path.join(REPORT_DIR, "profile_report.json")
+PREVIOUS_JSON = os.path.join(REPORT_DIR, "profile_report.prev.json")
+REPORT_HTML = os.path.join(REPORT_DIR, "profile_report.html")
+
+# Functions listed per stage in the cProfile summary
+CPROFILE_TOP = 25
+
+
+def modes():
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return set()
+    return {"time"} | {m.strip() for m in value.split(",")} - {"1", "true", "on"}
+
+
+ENABLED = bool(modes())
+
+# name -> [calls, seconds] for hot functions in this process
+_functions = {}
+
+
+def _record(name, seconds):
+    stats = _functions.setdefault(name, [0, 0.0])
+    stats[0] += 1
+    stats[1] += seconds
+
+
+def hot(func):
+    """Count calls and time spent in `func` (only when profiling is on)."""
+    if not ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(func.__name__, time.perf_counter() - start)
+    return wrapper
+
+
+@contextmanager
+def timed(name):
+    """Time a block (e.g. a library call such as `encode`) like a hot function."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / 1e6 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class StageProfile:
+    """Collects one stage's numbers and writes them to RECORD_DIR/<stage>.json."""
+
+    def __init__(self, stage, script=None, args=()):
+        self.stage = stage
+        self.script = script
+        self.args = list(args)
+        self.modes = modes()
+        self.profiler = None
+
+    def start(self):
+        if "memory" in self.modes:
+            import tracemalloc
+            tracemalloc.start()
+        if "cprofile" in self.modes:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def finish(self, status="ok"):
+        record = {
+            "stage": self.stage,
+            "script": self.script,
+            "args": self.args,
+            "status": status,
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_sec": round(time.perf_counter() - self.wall, 3),
+            "cpu_sec": round(time.process_time() - self.cpu, 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "functions": {name: {"calls": calls, "total_sec": round(sec, 4)}
+                          for name, (calls, sec) in sorted(_functions.items())},
+        }
+        if "memory" in self.modes:
+            import tracemalloc
+            record["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+            tracemalloc.stop()
+
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        base = os.path.join(RECORD_DIR, self.stage.replace(":", "_"))
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(base + ".prof")
+            record["cprofile_dump"] = base + ".prof"
+            record["cprofile_top"] = _top_functions(self.profiler)
+
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        return record
+
+
+def _top_functions(profiler, limit=CPROFILE_TOP):
+    import pstats
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "ncalls": ncalls,
+                     "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)})
+    return sorted(rows, key=lambda r: r["cumtime"], reverse=True)[:limit]
+
+
+def run_script(stage, script, args):
+    """Run a pipeline script as __main__ inside a stage profile. Returns its exit code."""
+    profile = StageProfile(stage, script, args)
+    sys.argv = [script, *args]
+    # Scripts import their siblings (date_utils, llm_client, ...)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    profile.start()
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if not isinstance(e.code, (int, type(None))):
+            # What the interpreter would have printed for SystemExit("❌ ...")
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        profile.finish(status="failed")
+        raise
+    profile.finish(status="ok" if code == 0 else "failed")
+    return code
+
+
+# Scripts started directly with PIPELINE_PROFILE set are profiled as a whole
+_implicit = None
+_script = os.path.basename(sys.argv[0]) if sys.argv else ""
+if ENABLED and _script.endswith(".py") and _script not in ("profiling.py", "pipeline.py"):
+    _implicit = StageProfile(os.path.splitext(os.path.basename(sys.argv[0]))[0], sys.argv[0], sys.argv[1:])
+    _implicit.start()
+    atexit.register(_implicit.finish)
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def _delta(new, old):
+    if new is None or not old:
+        return None
+    return round((new - old) / old * 100, 1)
+
+
+def build_report(records, previous=None):
+    """Combine stage records; add % change vs `previous` (an earlier report)."""
+    old_stages = {s["stage"]: s for s in (previous or {}).get("stages", [])}
+    for record in records:
+        old = old_stages.get(record["stage"])
+        if old is None:
+            continue
+        record["change_pct"] = {key: _delta(record.get(key), old.get(key))
+                                for key in ["wall_sec", "cpu_sec", "peak_rss_mb", "tracemalloc_peak_mb"]
+                                if key in record}
+        for name, stats in record["functions"].items():
+            old_stats = old.get("functions", {}).get(name)
+            if old_stats:
+                stats["change_pct"] = _delta(stats["total_sec"], old_stats["total_sec"])
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "baseline": (previous or {}).get("created"),
+        "total_wall_sec": round(sum(r["wall_sec"] for r in records), 3),
+        "stages": records,
+    }
+
+
+def _change_cell(pct):
+    if pct is None:
+        return "<td></td>"
+    # Slower / bigger by more than 10% is flagged
+    color = "#c0392b" if pct > 10 else "#27ae60" if pct < -10 else "#555"
+    return f'<td style="color:{color}">{pct:+.1f}%</td>'
+
+
+def render_html(report):
+    rows = []
+    for s in report["stages"]:
+        change = s.get("change_pct", {})
+        rows.append(
+            f"<tr><td>{html.escape(s['stage'])}</td><td>{s['status']}</td>"
+            f"<td>{s['wall_sec']:.2f}</td>{_change_cell(change.get('wall_sec'))}"
+            f"<td>{s['cpu_sec']:.2f}</td>{_change_cell(change.get('cpu_sec'))}"
+            f"<td>{s['peak_rss_mb'] or ''}</td>{_change_cell(change.get('peak_rss_mb'))}"
+            f"<td>{s.get('tracemalloc_peak_mb', '')}</td></tr>"
+        )
+    functions = []
+    for s in report["stages"]:
+        for name, stats in s["functions"].items():
+            functions.append(
+                f"<tr><td>{html.escape(s['stage'])}</td><td>{html.escape(name)}</td><td>{stats['calls']}</td>"
+                f"<td>{stats['total_sec']:.3f}</td>{_change_cell(stats.get('change_pct'))}</tr>"
+            )
+    hotspots = []
+    for s in report["stages"]:
+        for row in s.get("cprofile_top", [])[:10]:
+            hotspots.append(
+                f"<tr><td>{html.escape(s['stage'])}</td><td>{html.escape(row['function'])}</td>"
+                f"<td>{row['ncalls']}</td><td>{row['tottime']:.3f}</td><td>{row['cumtime']:.3f}</td></tr>"
+            )
+
+    baseline = f"compared with {report['baseline']}" if report["baseline"] else "no previous report"
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Pipeline profile {report['created']}</title>
+<style>body{{font-family:sans-serif;margin:2em}}table{{border-collapse:collapse;margin-bottom:2em}}
+td,th{{border:1px solid #ddd;padding:4px 8px;text-align:right}}td:first-child,th:first-child{{text-align:left}}</style>
+</head><body>
+<h1>Pipeline profile</h1>
+<p>{report['created']} &middot; total {report['total_wall_sec']:.1f}s &middot; {baseline}</p>
+<h2>Stages</h2>
+<table><tr><th>Stage</th><th>Status</th><th>Wall (s)</th><th>&Delta;</th><th>CPU (s)</th><th>&Delta;</th>
+<th>Peak RSS (MB)</th><th>&Delta;</th><th>tracemalloc peak (MB)</th></tr>
+{''.join(rows)}</table>
+<h2>Hot functions</h2>
+<table><tr><th>Stage</th><th>Function</th><th>Calls</th><th>Total (s)</th><th>&Delta;</th></tr>
+{''.join(functions)}</table>
+{'<h2>cProfile hotspots</h2><table><tr><th>Stage</th><th>Function</th><th>Calls</th><th>Own (s)</th><th>Cumulative (s)</th></tr>' + ''.join(hotspots) + '</table>' if hotspots else ''}
+</body></html>
+"""
+
+
+def write_report(record_dir=RECORD_DIR, baseline=None):
+    """Build the JSON + HTML report from this run's records. The last report becomes the baseline."""
+    records = []
+    for path in sorted(glob.glob(os.path.join(record_dir, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            records.append(json.load(f))
+    if not records:
+        return None
+
+    previous = None
+    baseline = baseline or (REPORT_JSON if os.path.exists(REPORT_JSON) else None)
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    report = build_report(records, previous)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    if os.path.exists(REPORT_JSON):
+        os.replace(REPORT_JSON, PREVIOUS_JSON)
+    with open(REPORT_JSON, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(REPORT_HTML, "w", encoding="utf-8") as f:
+        f.write(render_html(report))
+    return report
+
+
+def clear_records(record_dir=RECORD_DIR):
+    for path in glob.glob(os.path.join(record_dir, "*")):
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile pipeline stages")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run one script under the profiler")
+    run.add_argument("stage", help="stage name used in the report")
+    run.add_argument("script")
+    run.add_argument("args", nargs=argparse.REMAINDER)
+
+    report = commands.add_parser("report", help="combine this run's stage records into one report")
+    report.add_argument("--baseline", default=None, help="report JSON to compare with (default: the last one)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        os.environ.setdefault(PROFILE_ENV, "1")
+        # The scripts import `profiling`, a separate module from this __main__;
+        # run through it so the hot-function timings land in the same registry
+        import profiling
+        sys.exit(profiling.run_script(args.stage, args.script, args.args))
+
+    result = write_report(baseline=args.baseline)
+    if result is None:
+        raise SystemExit(f"❌ No stage records in {RECORD_DIR}; run stages with {PROFILE_ENV}=1 first")
+    print(f"📁 Profile report: {REPORT_JSON} and {REPORT_HTML}")
+    for s in result["stages"]:
+        change = s.get("change_pct", {}).get("wall_sec")
+        change = f" ({change:+.1f}%)" if change is not None else ""
+        print(f"  {s['stage']:<20} {s['wall_sec']:>8.2f}s{change}")
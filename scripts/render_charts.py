@@ -0,0 +1,115 @@
+"""
+Render every static chart in one headless pass.
+
+The topic dataset is read once (only the columns the charts need) and reduced
+to small per-source count tables; worker processes then only draw and save
+PNGs with the non-interactive Agg backend. The intertopic map is drawn from
+the table cached at fit time (topic_map.py), so the BERTopic model is never
+loaded.
+
+    python scripts/render_charts.py [--workers 8] [--dpi 100] [--no-sources]
+
+Outputs:
+    visualizations/topic_distribution_barchart.png
+    visualizations/sentiment_by_topic.png
+    visualizations/bertopic_visualization.html   (when data/topic_map.csv exists)
+    visualizations/sources/<source>/topic_distribution_barchart.png
+    visualizations/sources/<source>/sentiment_by_topic.png
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from topic_map import TOPIC_MAP_PATH, load_topic_map, topic_map_figure
+from visualize_barchart import plot_topic_distribution
+from visualize_sentiment_by_topic import plot_sentiment_by_topic, sentiment_table
+
+INPUT_PATH = "data/final_topic_labeled_dataset.csv"
+OUTPUT_DIR = "visualizations"
+SOURCES_DIR = os.path.join(OUTPUT_DIR, "sources")
+
+
+def load_chart_data(path=INPUT_PATH):
+    return pd.read_csv(path, usecols=["source", "topic", "sentiment_label"],
+                       dtype={"source": "category", "sentiment_label": "category"})
+
+
+def chart_tasks(df, out_dir=SOURCES_DIR, dpi=100):
+    """One (source, topic counts, sentiment table, folder, dpi) task per source."""
+    for source, group in df.groupby("source", observed=True, sort=True):
+        group = group.assign(sentiment_label=group["sentiment_label"].astype(str))
+        yield (str(source), group["topic"].value_counts().sort_index(), sentiment_table(group),
+               os.path.join(out_dir, str(source)), dpi)
+
+
+def render_source(task):
+    """Draw both charts for one source (runs in a worker process)."""
+    source, topic_counts, sentiment_counts, folder, dpi = task
+    os.makedirs(folder, exist_ok=True)
+    fig = plot_topic_distribution(topic_counts, os.path.join(folder, "topic_distribution_barchart.png"),
+                                  title=f"Topic Distribution: {source}", dpi=dpi)
+    plt.close(fig)
+    fig = plot_sentiment_by_topic(sentiment_counts, os.path.join(folder, "sentiment_by_topic.png"),
+                                  title=f"Sentiment per Topic: {source}", dpi=dpi)
+    plt.close(fig)
+    return source
+
+
+def render_corpus(df, out_dir=OUTPUT_DIR):
+    """The corpus-wide charts the visualize_* scripts used to produce."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    path = os.path.join(out_dir, "topic_distribution_barchart.png")
+    plt.close(plot_topic_distribution(df["topic"].value_counts().sort_index(), path))
+    written.append(path)
+
+    path = os.path.join(out_dir, "sentiment_by_topic.png")
+    plt.close(plot_sentiment_by_topic(sentiment_table(df.astype({"sentiment_label": str})), path))
+    written.append(path)
+
+    if os.path.exists(TOPIC_MAP_PATH):
+        path = os.path.join(out_dir, "bertopic_visualization.html")
+        topic_map_figure(load_topic_map()).write_html(path)
+        written.append(path)
+    else:
+        print(f"⚠️ {TOPIC_MAP_PATH} not found; re-run bertopic_modeling.py to cache the topic map")
+    return written
+
+
+def render_sources(df, workers=None, dpi=100, out_dir=SOURCES_DIR):
+    """Per-source charts across a process pool; returns the rendered source names."""
+    tasks = list(chart_tasks(df, out_dir, dpi))
+    if workers == 1:
+        return [render_source(task) for task in tasks]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Several sources per task keeps the pickling overhead small
+        return list(pool.map(render_source, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render all static charts headlessly")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=100, help="resolution of the per-source charts")
+    parser.add_argument("--no-sources", action="store_true", help="only render the corpus-wide charts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_chart_data()
+    print(f"📌 Loaded {len(df)} reviews across {df['source'].nunique()} sources")
+
+    for path in render_corpus(df):
+        print(f"📊 {path}")
+
+    if not args.no_sources:
+        sources = render_sources(df, args.workers, args.dpi)
+        print(f"📊 {len(sources) * 2} per-source charts in {SOURCES_DIR}/")
+
+    print(f"\n🎉 Charts rendered in {time.perf_counter() - start:.1f}s")
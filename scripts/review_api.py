@@ -0,0 +1,407 @@
+"""
+Read-only HTTP API over the pipeline outputs (the numbers the dashboard shows).
+
+    python scripts/review_api.py [--host 127.0.0.1] [--port 8000] [--cache-size 1024]
+
+A Starlette ASGI app served with uvicorn. The dataset (the parquet store when
+it is fresh, else the CSV), the aggregate cube and the review index are
+loaded once per process and reloaded only when a file changes. Every JSON
+response is kept in an in-process LRU cache keyed by the request and the
+data version, and carries an ETag: clients sending If-None-Match get an
+empty 304, and repeated requests never touch pandas, let alone the CSVs.
+
+    GET /health
+    GET /sources
+    GET /metrics?source=               overall totals
+    GET /metrics/sources[/{source}]    rating, sentiment, positive share, volume
+    GET /topics?source=&sentiment=     review count per topic
+    GET /topics/sentiment?source=      topic x sentiment label counts
+    GET /trends?freq=W&window=4&source=
+    GET /reviews?source=&topic=&sentiment=&rating=&start=&end=&q=&page=1&page_size=50
+    GET /reports                       report kinds and section counts
+    GET /reports/{kind}?page=1&page_size=10
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+
+import pandas as pd
+
+import aggregates
+import dataset_store
+import review_view
+from date_utils import file_timestamp, normalize_review_dates
+
+# The trend engine and review index are shared with the dashboard
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app"))
+import trends
+from review_index import ReviewIndex, search_page
+
+DATA_PATH = "data/final_topic_labeled_dataset.csv"
+STORE_PATH = "data/dashboard_store.parquet"
+CUBE_PATH = "data/review_cube.csv"
+REPORTS_DIR = "reports"
+
+CORE_COLUMNS = ["review_date", "rating", "source", "sentiment_score", "sentiment_label", "topic"]
+REVIEW_FIELDS = ["review_date", "source", "rating", "sentiment_score", "sentiment_label", "topic",
+                 "reviewer_name", "review_text"]
+
+# kind -> (merged file, chunk file pattern), as in streamlit_app/reports.py
+REPORTS = {
+    "executive": ("executive_summary.txt", "executive_chunk_*.txt"),
+    "topics": ("topic_insights.txt", "topic_*_*.txt"),
+    "recommendations": ("recommendations.txt", "reco_chunk_*.txt"),
+}
+
+MAX_PAGE_SIZE = 500
+CACHE_SIZE = 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -----------------------------
+# Data, loaded once per version
+# -----------------------------
+def _mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def _is_fresh(path):
+    # Built from the base table and column files alongside the wide table (see pipeline.py)
+    sources = review_view.source_paths() or [DATA_PATH]
+    return os.path.exists(path) and os.path.getmtime(path) >= max(os.path.getmtime(p) for p in sources)
+
+
+class ApiData:
+    """The review frame, cube, review index and text columns for one dataset version."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded_version = None
+        self.reviews = self.cube = self.index = None
+        self.text = {}
+
+    def version(self):
+        """Changes whenever the dataset, store, cube or a merged report is rewritten."""
+        data = (_mtime(DATA_PATH), _mtime(STORE_PATH), _mtime(CUBE_PATH))
+        return data + tuple(_mtime(os.path.join(REPORTS_DIR, merged)) for merged, _ in REPORTS.values())
+
+    def _dataset_path(self):
+        if _is_fresh(STORE_PATH) and dataset_store.parquet_available():
+            return STORE_PATH
+        return DATA_PATH
+
+    def refresh(self):
+        """Reload the frames if a data file changed; returns the current version."""
+        version = self.version()
+        if self.loaded_version is None or version[:3] != self.loaded_version[:3]:
+            with self.lock:
+                if self.loaded_version is None or version[:3] != self.loaded_version[:3]:
+                    self._load()
+        # Report changes only need new cache keys
+        self.loaded_version = version
+        return version
+
+    def _load(self):
+        if not os.path.exists(DATA_PATH):
+            raise ApiError(503, f"{DATA_PATH} not found; run the pipeline first")
+        path = self._dataset_path()
+        if path == STORE_PATH:
+            df = dataset_store.read_store(path, CORE_COLUMNS)
+        else:
+            header = pd.read_csv(path, nrows=0).columns
+            df = pd.read_csv(path, usecols=[c for c in CORE_COLUMNS if c in header])
+            df = dataset_store.compact_dtypes(normalize_review_dates(df, default_anchor=file_timestamp(path)))
+        self.text = {}
+        self.cube = aggregates.load_cube(CUBE_PATH) if _is_fresh(CUBE_PATH) else aggregates.build_cube(df)
+        self.index = ReviewIndex(df)
+        self.reviews = df
+
+    def text_column(self, column):
+        """A heavy text column, read on first use (aligned with `reviews`)."""
+        if column not in self.text:
+            path = self._dataset_path()
+            if path == STORE_PATH:
+                values = dataset_store.read_store(path, [column])
+            else:
+                values = pd.read_csv(path, usecols=lambda c: c == column)
+            self.text[column] = values[column].to_numpy() if column in values.columns else None
+        return self.text[column]
+
+
+DATA = ApiData()
+
+
+# -----------------------------
+# Response cache
+# -----------------------------
+class ResponseCache:
+    """LRU of (request key, data version) -> (JSON bytes, ETag)."""
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body):
+        entry = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+
+CACHE = ResponseCache()
+
+
+def _records(df):
+    """JSON-safe records (NaN -> null, dates as ISO strings)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def _scalar(value):
+    """One JSON-safe value: numpy scalars as Python numbers, NaN/NaT -> null, dates as ISO strings."""
+    if pd.isna(value):
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _filter_cube(cube, source=None, sentiment=None):
+    if source:
+        if source not in set(cube["source"].astype(str)):
+            raise ApiError(404, f"unknown source: {source}")
+        cube = cube[cube["source"] == source]
+    if sentiment:
+        cube = cube[cube["sentiment_label"] == sentiment]
+    return cube
+
+
+def _int_param(params, name, default, low=1, high=None):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if value < low or (high is not None and value > high):
+        raise ApiError(400, f"{name} must be between {low} and {high or 'any'}")
+    return value
+
+
+def _date_param(params, name):
+    if not params.get(name):
+        return None
+    try:
+        value = pd.Timestamp(params[name])
+    except (ValueError, OverflowError):
+        raise ApiError(400, f"{name} must be a date")
+    if value is pd.NaT:
+        raise ApiError(400, f"{name} must be a date")
+    # review_date is naive, so compare aware bounds in UTC
+    return (value.tz_convert(None) if value.tzinfo else value).to_datetime64()
+
+
+# -----------------------------
+# Endpoint bodies (params -> JSON-able payload)
+# -----------------------------
+def get_sources(params, path_params):
+    return {"sources": sorted(DATA.cube["source"].astype(str).unique().tolist())}
+
+
+def get_metrics(params, path_params):
+    metrics = aggregates.overall_metrics(_filter_cube(DATA.cube, params.get("source")))
+    return {key: _scalar(value) for key, value in metrics.items()}
+
+
+def get_source_metrics(params, path_params):
+    table = aggregates.source_metrics(DATA.cube).rename_axis("source").reset_index()
+    table["source"] = table["source"].astype(str)
+    source = path_params.get("source")
+    if source is None:
+        return {"sources": _records(table)}
+    rows = table[table["source"] == source]
+    if rows.empty:
+        raise ApiError(404, f"unknown source: {source}")
+    return _records(rows)[0]
+
+
+def get_topics(params, path_params):
+    counts = aggregates.topic_counts(_filter_cube(DATA.cube, params.get("source")), params.get("sentiment"))
+    return {"topics": [{"topic": int(topic), "count": int(count)} for topic, count in counts.items()]}
+
+
+def get_topic_sentiment(params, path_params):
+    table = aggregates.topic_sentiment_counts(_filter_cube(DATA.cube, params.get("source")))
+    table.columns = table.columns.astype(str)
+    return {"topics": _records(table.rename_axis(columns=None).reset_index())}
+
+
+def get_trends(params, path_params):
+    freq = params.get("freq", "W")
+    if freq not in trends.FREQUENCIES.values():
+        raise ApiError(400, f"freq must be one of {sorted(trends.FREQUENCIES.values())}")
+    window = _int_param(params, "window", 4, high=52)
+    df = DATA.reviews[["review_date", "source", "sentiment_score"]].dropna(subset=["review_date"])
+    if params.get("source"):
+        df = df[df["source"] == params["source"]]
+    series = trends.resample_sentiment(df, freq=freq, window=window)
+    series["source"] = series["source"].astype(str)
+    return {"freq": freq, "window": window, "points": _records(series)}
+
+
+def get_reviews(params, path_params):
+    page = _int_param(params, "page", 1)
+    page_size = _int_param(params, "page_size", 50, high=MAX_PAGE_SIZE)
+    filters = {}
+    for column, name, cast in [("source", "source", str), ("topic", "topic", int),
+                               ("sentiment_label", "sentiment", str), ("rating", "rating", float)]:
+        if params.get(name):
+            try:
+                filters[column] = [cast(v) for v in params.getlist(name)]
+            except ValueError:
+                raise ApiError(400, f"invalid {name}")
+
+    ranks = DATA.index.query(filters, _date_param(params, "start"), _date_param(params, "end"))
+    texts = DATA.text_column("review_text")
+    keyword = params.get("q", "")
+    if keyword and texts is None:
+        raise ApiError(400, "the dataset has no review_text column to search")
+    page_ranks, total, exact = search_page(DATA.index, ranks, texts, keyword, page - 1, page_size)
+
+    positions = DATA.index.positions(page_ranks)
+    rows = DATA.reviews.iloc[positions]
+    for column in ["reviewer_name", "review_text"]:
+        values = DATA.text_column(column)
+        if values is not None:
+            rows = rows.assign(**{column: values[positions]})
+    rows = rows[[c for c in REVIEW_FIELDS if c in rows.columns]]
+    return {"page": page, "page_size": page_size, "total": int(total), "total_exact": bool(exact),
+            "reviews": _records(rows)}
+
+
+def _natural_key(path):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+def _report_sections(kind):
+    merged, pattern = REPORTS[kind]
+    paths = sorted(glob.glob(os.path.join(REPORTS_DIR, pattern)), key=_natural_key)
+    if not paths and os.path.exists(os.path.join(REPORTS_DIR, merged)):
+        paths = [os.path.join(REPORTS_DIR, merged)]
+    return paths
+
+
+def get_report_index(params, path_params):
+    return {"reports": [{"kind": kind, "sections": len(_report_sections(kind))} for kind in REPORTS]}
+
+
+def get_report(params, path_params):
+    kind = path_params["kind"]
+    if kind not in REPORTS:
+        raise ApiError(404, f"unknown report: {kind} (expected one of {sorted(REPORTS)})")
+    paths = _report_sections(kind)
+    if not paths:
+        raise ApiError(404, f"report '{kind}' has not been generated")
+    page = _int_param(params, "page", 1)
+    page_size = _int_param(params, "page_size", 10, high=MAX_PAGE_SIZE)
+    sections = []
+    for path in paths[(page - 1) * page_size:page * page_size]:
+        with open(path, "r", encoding="utf-8") as f:
+            sections.append({"name": os.path.basename(path)[:-len(".txt")], "text": f.read()})
+    return {"kind": kind, "page": page, "page_size": page_size, "total": len(paths), "sections": sections}
+
+
+def get_health(params, path_params):
+    return {"status": "ok", "cache": {"entries": len(CACHE.entries), "hits": CACHE.hits, "misses": CACHE.misses}}
+
+
+# -----------------------------
+# ASGI app
+# -----------------------------
+def endpoint(handler, cached=True):
+    """Wrap a payload function with the data refresh, LRU cache and ETag handling."""
+    from starlette.responses import JSONResponse, Response
+
+    def respond(request):
+        try:
+            version = DATA.refresh()
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())), version)
+            entry = CACHE.get(key) if cached else None
+            if entry is None:
+                payload = handler(request.query_params, request.path_params)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                if not cached:
+                    return Response(body, media_type="application/json")
+                entry = CACHE.put(key, body)
+        except ApiError as e:
+            return JSONResponse({"error": str(e)}, status_code=e.status)
+        except Exception as e:
+            traceback.print_exc()
+            return JSONResponse({"error": f"internal error: {type(e).__name__}"}, status_code=500)
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    return respond
+
+
+def create_app():
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+
+    return Starlette(routes=[
+        Route("/health", endpoint(get_health, cached=False)),
+        Route("/sources", endpoint(get_sources)),
+        Route("/metrics", endpoint(get_metrics)),
+        Route("/metrics/sources", endpoint(get_source_metrics)),
+        Route("/metrics/sources/{source}", endpoint(get_source_metrics)),
+        Route("/topics", endpoint(get_topics)),
+        Route("/topics/sentiment", endpoint(get_topic_sentiment)),
+        Route("/trends", endpoint(get_trends)),
+        Route("/reviews", endpoint(get_reviews)),
+        Route("/reports", endpoint(get_report_index)),
+        Route("/reports/{kind}", endpoint(get_report)),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the pipeline outputs as a read-only JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="responses kept in the LRU cache")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    CACHE.max_entries = args.cache_size
+    # Load before the first request instead of during it
+    DATA.refresh()
+    print(f"📌 Loaded {len(DATA.reviews)} reviews; serving on http://{args.host}:{args.port}")
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
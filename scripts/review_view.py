@@ -0,0 +1,156 @@
+"""
+Per-stage column files keyed by review_id, and the view that joins them.
+
+The merge stage writes the base table (data/final_cleaned_dataset.csv) with a
+stable `review_id` per review. Every later stage writes only the columns it
+produces, plus review_id, to its own file in data/columns/:
+
+    data/columns/sentiment.csv   review_id, sentiment_score, sentiment_label
+    data/columns/tokens.csv      review_id, cleaned_text
+    data/columns/topics.csv      review_id, topic
+
+so re-running a stage rewrites only its own columns. `load_view()` joins the
+base table with any of these on demand, reading only the requested columns,
+which is how the cube, keyword and store stages read them. `materialize()`
+writes the full wide table (data/final_topic_labeled_dataset.csv) for the
+dashboard, the reports and the charts.
+
+    python scripts/review_view.py [--chunksize 100000]
+"""
+import argparse
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+BASE_PATH = "data/final_cleaned_dataset.csv"
+COLUMNS_DIR = "data/columns"
+WIDE_PATH = "data/final_topic_labeled_dataset.csv"
+
+# Stage -> the columns it owns, in view order
+SIDECARS = {
+    "sentiment": ["sentiment_score", "sentiment_label"],
+    "tokens": ["cleaned_text"],
+    "topics": ["topic"],
+}
+
+# Text passthrough: values are joined and written back exactly as stored
+READ_OPTIONS = {"dtype": str, "keep_default_na": False}
+
+
+def sidecar_path(stage):
+    return os.path.join(COLUMNS_DIR, f"{stage}.csv")
+
+
+# -----------------------------
+# Review ids
+# -----------------------------
+def review_ids(df, seen=None):
+    """
+    Content-derived id per review: a hash of source, reviewer, text and
+    rating (not the date, which drifts for "3 weeks ago" style exports).
+    The "r" prefix keeps ids from ever being parsed as numbers. Identical
+    reviews get "-2", "-3", ... in file order. Pass the same
+    `seen` Counter to consecutive chunks of one dataset to number
+    duplicates across chunk boundaries.
+    """
+    keys = (df["source"].astype(str) + "\x1f" + df["reviewer_name"].fillna("").astype(str) + "\x1f"
+            + df["review_text"].fillna("").astype(str) + "\x1f" + df["rating"].astype(str))
+    digests = pd.Series(["r" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] for key in keys],
+                        index=df.index, dtype=object)
+    occurrence = digests.groupby(digests).cumcount()
+    if seen is not None:
+        occurrence += digests.map(seen).fillna(0).astype(int)
+        seen.update(digests.value_counts().to_dict())
+    return digests.where(occurrence == 0, digests + "-" + (occurrence + 1).astype(str))
+
+
+def with_review_ids(df, seen=None):
+    """`df` with review_id as its first column."""
+    return pd.concat([review_ids(df, seen).rename("review_id"), df], axis=1)
+
+
+def require_ids(path=BASE_PATH):
+    if "review_id" not in pd.read_csv(path, nrows=0).columns:
+        raise SystemExit(f"❌ {path} has no review_id column; re-run merge_cleaned.py")
+
+
+def source_paths(base_path=BASE_PATH, columns_dir=COLUMNS_DIR):
+    """The files `load_view()` reads: the base table and every stage's column file that exists."""
+    paths = [base_path, *sorted(glob.glob(os.path.join(columns_dir, "*.csv")))]
+    return [path for path in paths if os.path.exists(path)]
+
+
+# -----------------------------
+# Writing one stage's columns
+# -----------------------------
+def write_sidecar(stage, df):
+    """Write review_id plus the stage's own columns (atomically)."""
+    path = sidecar_path(stage)
+    os.makedirs(COLUMNS_DIR, exist_ok=True)
+    df[["review_id", *SIDECARS[stage]]].to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+# -----------------------------
+# The view
+# -----------------------------
+def _read_sidecar(stage, columns, read_options):
+    path = sidecar_path(stage)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run the {stage} stage first")
+    return pd.read_csv(path, usecols=["review_id", *columns], **read_options).set_index("review_id")
+
+
+def load_view(stages=tuple(SIDECARS), columns=None, base_path=BASE_PATH, **read_options):
+    """
+    The base table joined with the given stages' columns on review_id.
+
+    `columns` limits what is read (review_id is always included); rows a
+    stage has no value for (e.g. reviews topic modeling dropped) are left out.
+    Row order follows the base table.
+    """
+    header = pd.read_csv(base_path, nrows=0).columns
+    wanted = None if columns is None else set(columns) | {"review_id"}
+    base_columns = [c for c in header if wanted is None or c in wanted]
+    view = pd.read_csv(base_path, usecols=base_columns, **read_options)[base_columns]
+    for stage in stages:
+        own = [c for c in SIDECARS[stage] if wanted is None or c in wanted]
+        view = view.join(_read_sidecar(stage, own, read_options), on="review_id", how="inner")
+    return view.reset_index(drop=True)
+
+
+def materialize(path=WIDE_PATH, stages=tuple(SIDECARS), chunksize=None):
+    """Write the wide table; with `chunksize` the base table is streamed. Returns the row count."""
+    if not chunksize:
+        view = load_view(stages, **READ_OPTIONS)
+        view.to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        return len(view)
+
+    sidecars = [_read_sidecar(stage, SIDECARS[stage], READ_OPTIONS) for stage in stages]
+    rows = 0
+    with open(path + ".tmp", "w", encoding="utf-8", newline="") as out:
+        for i, chunk in enumerate(pd.read_csv(BASE_PATH, chunksize=chunksize, **READ_OPTIONS)):
+            for sidecar in sidecars:
+                chunk = chunk.join(sidecar, on="review_id", how="inner")
+            chunk.to_csv(out, index=False, header=i == 0)
+            rows += len(chunk)
+    os.replace(path + ".tmp", path)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Join the per-stage column files into the wide dataset")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the base table in chunks of this many rows")
+    args = parser.parse_args()
+
+    require_ids()
+    rows = materialize(chunksize=args.chunksize)
+
+    print("\n🎉 Wide dataset assembled!")
+    print(f"📁 Saved to: {WIDE_PATH}")
+    print(f"📊 {rows} reviews with {', '.join(SIDECARS)} columns")
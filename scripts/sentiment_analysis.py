@@ -1,12 +1,24 @@
+import argparse
+import os
 import pandas as pd
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-# Load dataset
-df = pd.read_csv("data/final_cleaned_dataset.csv")
+import profiling
+from review_view import require_ids, sidecar_path, write_sidecar
+
+INPUT_PATH = "data/final_cleaned_dataset.csv"
+# Only review_id + the two sentiment columns are written (see review_view.py)
+OUTPUT_PATH = sidecar_path("sentiment")
+INPUT_COLUMNS = ["review_id", "review_text"]
+
+# Input columns pass through untouched (read as text), so the output is the
+# same whether the file is processed whole or in chunks
+READ_OPTIONS = {"dtype": str, "keep_default_na": False}
 
 # Initialize sentiment analyzer
 analyzer = SentimentIntensityAnalyzer()
 
+@profiling.hot
 def get_sentiment(text):
     if pd.isna(text) or text.strip() == "":
         return 0
@@ -20,14 +32,48 @@ def label_sentiment(score):
     else:
         return "Neutral"
 
-# Apply sentiment rules
-df["sentiment_score"] = df["review_text"].apply(get_sentiment)
-df["sentiment_label"] = df["sentiment_score"].apply(label_sentiment)
+def score_reviews(df):
+    # Apply sentiment rules
+    df["sentiment_score"] = df["review_text"].apply(get_sentiment)
+    df["sentiment_label"] = df["sentiment_score"].apply(label_sentiment)
+    return df
+
+def score_streaming(input_path, output_path, chunksize):
+    """Score `chunksize` rows at a time, appending to the output. Returns label counts."""
+    counts = pd.Series(dtype="int64")
+    first = True
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Written under a temporary name, so a failed run never leaves half a file
+    with open(output_path + ".tmp", "w", encoding="utf-8", newline="") as out:
+        for chunk in pd.read_csv(input_path, usecols=INPUT_COLUMNS, chunksize=chunksize, **READ_OPTIONS):
+            chunk = score_reviews(chunk).drop(columns="review_text")
+            chunk.to_csv(out, index=False, header=first)
+            counts = counts.add(chunk["sentiment_label"].value_counts(), fill_value=0)
+            first = False
+    os.replace(output_path + ".tmp", output_path)
+    return counts.astype("int64").sort_values(ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score review sentiment with VADER")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the dataset in chunks of this many rows (bounded memory)")
+    args = parser.parse_args()
+
+    require_ids(INPUT_PATH)
+    if args.chunksize:
+        label_counts = score_streaming(INPUT_PATH, OUTPUT_PATH, args.chunksize)
+    else:
+        # Load only the text to score
+        df = pd.read_csv(INPUT_PATH, usecols=INPUT_COLUMNS, **READ_OPTIONS)
+
+        df = score_reviews(df)
 
-# Save updated dataset
-df.to_csv("data/final_sentiment_dataset.csv", index=False)
+        # Save the sentiment columns
+        write_sidecar("sentiment", df)
+        label_counts = df["sentiment_label"].value_counts()
 
-print("\n🎉 Sentiment Analysis Completed!")
-print("📁 File Saved as: data/final_sentiment_dataset.csv")
-print(f"🧾 Total Records: {len(df)}")
-print(df["sentiment_label"].value_counts())
+    print("\n🎉 Sentiment Analysis Completed!")
+    print(f"📁 File Saved as: {OUTPUT_PATH}")
+    print(f"🧾 Total Records: {label_counts.sum()}")
+    print(label_counts)
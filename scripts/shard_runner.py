@@ -0,0 +1,159 @@
+"""
+Sharded execution of the per-business stages.
+
+Cleaning, date resolution and sentiment scoring only ever look at one
+business at a time, so each business (or group of businesses) goes through
+them in its own worker process and writes a shard to data/shards/. The
+shards are then concatenated, in name order, into the same corpus-wide files
+the serial scripts produce (final_cleaned_dataset.csv/.json and the
+sentiment columns in data/columns/sentiment.csv).
+
+A shard is reused when it is newer than its raw/cleaned input and the stage
+code, so a refresh only reprocesses businesses with new data.
+
+    python scripts/shard_runner.py --workers 8 --max-memory-mb 2048
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from clean_reviews import CLEANED_FOLDER, RAW_FOLDER, clean_reviews
+from date_utils import normalize_review_dates
+from merge_cleaned import OUTPUT_CSV, OUTPUT_JSON, load_cleaned, save_merged
+from review_view import with_review_ids, write_sidecar
+from sentiment_analysis import OUTPUT_PATH as SENTIMENT_PATH, score_reviews
+
+SHARD_DIR = "data/shards"
+
+# A shard is stale when any of these changed after it was written
+CODE_FILES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), f)
+              for f in ["clean_reviews.py", "merge_cleaned.py", "sentiment_analysis.py", "date_utils.py",
+                        "review_view.py"]]
+
+
+def business_names():
+    """Every business with a raw export or (for older data) only a cleaned file."""
+    raw = {os.path.basename(p)[:-len(".json")] for p in glob.glob(f"{RAW_FOLDER}/*.json")}
+    cleaned = {os.path.basename(p)[:-len("_cleaned.csv")] for p in glob.glob(f"{CLEANED_FOLDER}/*_cleaned.csv")}
+    return sorted(raw | cleaned)
+
+
+def shard_path(name):
+    return os.path.join(SHARD_DIR, f"{name}.csv")
+
+
+def _is_current(name):
+    path = shard_path(name)
+    if not os.path.exists(path):
+        return False
+    raw_path = f"{RAW_FOLDER}/{name}.json"
+    source = raw_path if os.path.exists(raw_path) else f"{CLEANED_FOLDER}/{name}_cleaned.csv"
+    return os.path.getmtime(path) >= max(os.path.getmtime(p) for p in [source, *CODE_FILES])
+
+
+def process_business(name, force=False):
+    """Clean, date and score one business into its shard. Returns (name, rows, seconds or None if reused)."""
+    if not force and _is_current(name):
+        return name, None, None
+
+    start = time.perf_counter()
+    if os.path.exists(f"{RAW_FOLDER}/{name}.json"):
+        cleaned_path, _ = clean_reviews(name)
+    else:
+        cleaned_path = f"{CLEANED_FOLDER}/{name}_cleaned.csv"
+
+    df = load_cleaned(cleaned_path)
+    df = normalize_review_dates(df, default_anchor=pd.Timestamp.now(tz="UTC"))
+    # Duplicates always share a source, so per-business ids match the serial merge's
+    df = with_review_ids(df)
+    df = score_reviews(df)
+
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    df.to_csv(shard_path(name), index=False)
+    return name, len(df), time.perf_counter() - start
+
+
+def process_group(names, force=False):
+    return [process_business(name, force) for name in names]
+
+
+def _limit_memory(max_memory_mb):
+    """Pool initializer: cap each worker's address space (Unix only)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def run_shards(names, workers=None, per_task=1, max_memory_mb=None, force=False):
+    """Process every business in a process pool. Returns (results, failures)."""
+    groups = [names[i:i + per_task] for i in range(0, len(names), per_task)]
+    initializer, initargs = (_limit_memory, (max_memory_mb,)) if max_memory_mb else (None, ())
+
+    results, failures = [], {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = {pool.submit(process_group, group, force): group for group in groups}
+        for future in as_completed(futures):
+            try:
+                batch = future.result()
+            except Exception as e:  # one bad business must not sink the refresh
+                for name in futures[future]:
+                    failures[name] = repr(e)
+                    print(f"❌ {name}: {e!r}")
+                continue
+            for name, rows, seconds in batch:
+                results.append((name, rows, seconds))
+                if seconds is None:
+                    print(f"✅ {name}: up to date")
+                else:
+                    print(f"📌 {name}: {rows} reviews in {seconds:.1f}s")
+    return results, failures
+
+
+def merge_shards(names):
+    """Concatenate the shards into the corpus-wide cleaned dataset and sentiment columns."""
+    # round_trip keeps scores bit-identical to the serial pipeline's output
+    frames = [pd.read_csv(shard_path(name), parse_dates=["review_date"], float_precision="round_trip")
+              for name in names]
+    final_df = pd.concat(frames, ignore_index=True)
+
+    save_merged(final_df.drop(columns=["sentiment_score", "sentiment_label"]))
+    write_sidecar("sentiment", final_df)
+    return final_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean and score every business in parallel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--per-task", type=int, default=1,
+                        help="businesses handled per task (raise for many small businesses)")
+    parser.add_argument("--max-memory-mb", type=int, default=None, help="address-space cap per worker")
+    parser.add_argument("--force", action="store_true", help="reprocess shards that are up to date")
+    args = parser.parse_args()
+
+    names = business_names()
+    if not names:
+        print("❌ No raw or cleaned review files found in data/raw or data/cleaned.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results, failures = run_shards(names, args.workers, args.per_task, args.max_memory_mb, args.force)
+    if failures:
+        print(f"\n⚠️ {len(failures)} business(es) failed; corpus files were not rewritten.")
+        sys.exit(1)
+
+    final_df = merge_shards(names)
+
+    print(f"\n🎉 {len(names)} businesses processed in {time.perf_counter() - start:.1f}s "
+          f"({sum(r[2] is not None for r in results)} refreshed)")
+    print(f"📄 CSV: {OUTPUT_CSV}")
+    print(f"📄 JSON: {OUTPUT_JSON}")
+    print(f"📁 Sentiment: {SENTIMENT_PATH}")
+    print(f"📊 Total Reviews: {len(final_df)}")
@@ -0,0 +1,422 @@
+"""
+Streaming sentiment monitor: score reviews as they arrive and alert on drops.
+
+Reviews come from an NDJSON feed (a file, optionally followed like `tail -f`,
+or stdin) or from a watched folder of *.ndjson / *.jsonl files. Each line is
+one review, either SerpAPI-shaped ({"snippet", "rating", "iso_date", ...}) or
+flat ({"source", "review_text", ...}); without a "source" field the file name
+is used. Every review is cleaned and scored with the same rules as the batch
+stages (clean_reviews.clean, sentiment_analysis.get_sentiment/label_sentiment),
+appended to data/stream/scored_reviews.ndjson and added to its source's
+rolling window.
+
+Per source the monitor keeps the last --window reviews with running sums, so
+each review costs O(1) however long the stream runs. The baseline is the
+source's all-time sentiment: the batch cube (data/review_cube.csv) summed once
+at start-up plus every streamed review, so history is never recomputed.
+Alerts fire when a rule is first breached and again when it recovers:
+
+    min_score          rolling mean sentiment below --min-score
+    max_negative       rolling negative share above --max-negative
+    score_drop         rolling mean more than --max-drop below the baseline
+    negative_rise      negative share more than --max-negative-rise above the baseline
+
+Alerts are appended to logs/alerts.jsonl and, with --webhook, POSTed as JSON.
+File offsets, windows and baselines are checkpointed to
+data/stream/monitor_state.json, so a restart carries on where it stopped.
+
+    python scripts/stream_monitor.py --feed data/stream/feed.ndjson --follow
+    python scripts/stream_monitor.py --watch data/stream/inbox --window 50 --max-negative 0.3
+    tail -f reviews.ndjson | python scripts/stream_monitor.py --feed -
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone
+
+from clean_reviews import clean
+from sentiment_analysis import get_sentiment, label_sentiment
+
+STREAM_DIR = "data/stream"
+STATE_PATH = os.path.join(STREAM_DIR, "monitor_state.json")
+SCORED_PATH = os.path.join(STREAM_DIR, "scored_reviews.ndjson")
+ALERT_LOG = "logs/alerts.jsonl"
+CUBE_PATH = "data/review_cube.csv"
+FEED_PATTERNS = ["*.ndjson", "*.jsonl"]
+
+
+# -----------------------------
+# Rolling aggregates
+# -----------------------------
+class SourceStats:
+    """
+    One source's last `size` reviews plus its all-time totals, both kept as
+    running sums: adding a review is O(1) and never rescans older reviews.
+    """
+
+    def __init__(self, size, baseline_count=0, baseline_score=0.0, baseline_negative=0):
+        self.window = deque()
+        self.size = size
+        self.score_sum = 0.0
+        self.negative = 0
+        # All-time totals (batch history + stream) for the baseline
+        self.total_count = baseline_count
+        self.total_score = baseline_score
+        self.total_negative = baseline_negative
+
+    def add(self, score, label):
+        negative = int(label == "Negative")
+        # Baseline as it stood before this review
+        baseline = self.baseline()
+        self.window.append((score, negative))
+        self.score_sum += score
+        self.negative += negative
+        if len(self.window) > self.size:
+            old_score, old_negative = self.window.popleft()
+            self.score_sum -= old_score
+            self.negative -= old_negative
+        self.total_count += 1
+        self.total_score += score
+        self.total_negative += negative
+        return baseline
+
+    @property
+    def count(self):
+        return len(self.window)
+
+    def mean_score(self):
+        return self.score_sum / self.count if self.count else 0.0
+
+    def negative_share(self):
+        return self.negative / self.count if self.count else 0.0
+
+    def baseline(self):
+        """(mean score, negative share) over all reviews so far; None before the first one."""
+        if not self.total_count:
+            return None
+        return self.total_score / self.total_count, self.total_negative / self.total_count
+
+    def to_state(self):
+        return {"size": self.size, "window": list(self.window), "total_count": self.total_count,
+                "total_score": self.total_score, "total_negative": self.total_negative}
+
+    @classmethod
+    def from_state(cls, state, size):
+        stats = cls(size, state["total_count"], state["total_score"], state["total_negative"])
+        for score, negative in state["window"][-size:]:
+            stats.window.append((score, negative))
+            stats.score_sum += score
+            stats.negative += negative
+        return stats
+
+
+def cube_baselines(path=CUBE_PATH):
+    """source -> (review count, score sum, negative count) from the batch cube."""
+    import pandas as pd
+
+    if not os.path.exists(path):
+        return {}
+    cube = pd.read_csv(path, usecols=["source", "sentiment_label", "count", "score_sum"])
+    cube["negative"] = cube["count"].where(cube["sentiment_label"] == "Negative", 0)
+    sums = cube.groupby("source")[["count", "score_sum", "negative"]].sum()
+    return {source: (int(row["count"]), float(row["score_sum"]), int(row["negative"]))
+            for source, row in sums.iterrows()}
+
+
+# -----------------------------
+# Alert rules and sinks
+# -----------------------------
+class AlertRules:
+    """
+    Thresholds; a rule set to None is disabled. A triggered rule only resolves
+    once the value is back past its threshold by `hysteresis`, so a window
+    hovering around a threshold does not flap.
+    """
+
+    def __init__(self, min_score=0.0, max_negative=0.35, max_drop=0.25, max_negative_rise=0.15,
+                 min_reviews=20, hysteresis=0.02):
+        self.min_score = min_score
+        self.max_negative = max_negative
+        self.max_drop = max_drop
+        self.max_negative_rise = max_negative_rise
+        self.min_reviews = min_reviews
+        self.hysteresis = hysteresis
+
+    def breaches(self, stats, baseline, active=()):
+        """rule -> (value, threshold) for every rule the window currently breaks."""
+        if stats.count < self.min_reviews:
+            return {}
+        score, negative = stats.mean_score(), stats.negative_share()
+        limits = {}     # rule -> (value, threshold, True if alerting below the threshold)
+        if self.min_score is not None:
+            limits["min_score"] = (score, self.min_score, True)
+        if self.max_negative is not None:
+            limits["max_negative"] = (negative, self.max_negative, False)
+        if baseline is not None:
+            base_score, base_negative = baseline
+            if self.max_drop is not None:
+                limits["score_drop"] = (score, base_score - self.max_drop, True)
+            if self.max_negative_rise is not None:
+                limits["negative_rise"] = (negative, base_negative + self.max_negative_rise, False)
+
+        found = {}
+        for rule, (value, threshold, below) in limits.items():
+            margin = self.hysteresis if rule in active else 0.0
+            if (value < threshold + margin) if below else (value > threshold - margin):
+                found[rule] = (value, threshold)
+        return found
+
+
+class AlertLog:
+    """Appends alerts as JSON lines."""
+
+    def __init__(self, path=ALERT_LOG):
+        self.path = path
+
+    def send(self, alert):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class Webhook:
+    """POSTs alerts as JSON; delivery failures are reported, never fatal."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        request = urllib.request.Request(self.url, data=json.dumps(alert).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except OSError as e:
+            print(f"⚠️ Webhook delivery failed ({e}); alert kept in the log")
+
+
+# -----------------------------
+# Monitor
+# -----------------------------
+def review_fields(record, default_source):
+    """(source, text, rating, date) from a SerpAPI-shaped or flat review."""
+    text = record.get("review_text", record.get("snippet")) or ""
+    if not isinstance(text, str):
+        text = ""
+    date = record.get("iso_date") or record.get("review_date") or record.get("date")
+    return record.get("source") or default_source, text, record.get("rating"), date
+
+
+class Monitor:
+    def __init__(self, rules, window=50, sinks=(), baselines=None, scored_path=SCORED_PATH,
+                 state_path=STATE_PATH):
+        self.rules = rules
+        self.window = window
+        self.sinks = list(sinks)
+        self.baselines = baselines or {}
+        self.scored_path = scored_path
+        self.state_path = state_path
+        self.sources = {}
+        self.active = {}        # source -> rules currently breached
+        self.offsets = {}       # input file -> bytes consumed
+        self.processed = 0
+        self.alerts = 0
+        self._scored = None
+
+    def stats(self, source):
+        if source not in self.sources:
+            self.sources[source] = SourceStats(self.window, *self.baselines.get(source, (0, 0.0, 0)))
+        return self.sources[source]
+
+    def process(self, record, default_source):
+        """Score one review, update its source's window and check the rules."""
+        source, text, rating, date = review_fields(record, default_source)
+        text = clean(text)
+        score = get_sentiment(text)
+        label = label_sentiment(score)
+
+        if self._scored is None:
+            os.makedirs(os.path.dirname(self.scored_path) or ".", exist_ok=True)
+            self._scored = open(self.scored_path, "a", encoding="utf-8")
+        self._scored.write(json.dumps({"source": source, "review_date": date, "rating": rating,
+                                       "review_text": text, "sentiment_score": score,
+                                       "sentiment_label": label}, ensure_ascii=False) + "\n")
+
+        stats = self.stats(source)
+        baseline = stats.add(score, label)
+        self.processed += 1
+        self._check(source, stats, baseline)
+
+    def _check(self, source, stats, baseline):
+        active = self.active.setdefault(source, set())
+        breaches = self.rules.breaches(stats, baseline, active)
+        for rule in sorted(set(breaches) - active):
+            value, threshold = breaches[rule]
+            self._alert("triggered", source, rule, stats, baseline, value, threshold)
+        for rule in sorted(active - set(breaches)):
+            self._alert("resolved", source, rule, stats, baseline)
+        self.active[source] = set(breaches)
+
+    def _alert(self, status, source, rule, stats, baseline, value=None, threshold=None):
+        alert = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": status,
+            "source": source,
+            "rule": rule,
+            "value": None if value is None else round(value, 4),
+            "threshold": None if threshold is None else round(threshold, 4),
+            "window_reviews": stats.count,
+            "rolling_score": round(stats.mean_score(), 4),
+            "negative_share": round(stats.negative_share(), 4),
+            "baseline_score": None if baseline is None else round(baseline[0], 4),
+            "baseline_negative_share": None if baseline is None else round(baseline[1], 4),
+        }
+        self.alerts += 1
+        icon = "🚨" if status == "triggered" else "✅"
+        print(f"{icon} {source}: {rule} {status} (score {alert['rolling_score']:+.3f}, "
+              f"negative {alert['negative_share']:.0%} over {stats.count} reviews)")
+        for sink in self.sinks:
+            sink.send(alert)
+
+    # ---------- Input ----------
+    def read_new_lines(self, path, default_source):
+        """Process the complete lines appended to `path` since the last call."""
+        offset = self.offsets.get(path, 0)
+        if os.path.getsize(path) < offset:
+            offset = 0      # file was truncated or replaced
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # still being written; picked up on the next poll
+                offset += len(line)
+                self.process_line(line, default_source, f"{path}@{offset}")
+                # Per line, so a checkpoint never holds window state without its offset
+                self.offsets[path] = offset
+        self.offsets[path] = offset
+
+    def process_line(self, line, default_source, where="stdin"):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            print(f"⚠️ Skipping malformed line ({where})")
+            return
+        if not isinstance(record, dict):
+            print(f"⚠️ Skipping line that is not a JSON object ({where})")
+            return
+        self.process(record, default_source)
+
+    # ---------- Checkpoint ----------
+    def save(self):
+        if self._scored is not None:
+            self._scored.flush()
+        state = {"offsets": self.offsets,
+                 "sources": {name: stats.to_state() for name, stats in self.sources.items()},
+                 "active": {name: sorted(rules) for name, rules in self.active.items() if rules}}
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def load(self):
+        """Resume from the checkpoint; returns False when there is none."""
+        if not os.path.exists(self.state_path):
+            return False
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.offsets = state["offsets"]
+        self.sources = {name: SourceStats.from_state(s, self.window) for name, s in state["sources"].items()}
+        self.active = {name: set(rules) for name, rules in state["active"].items()}
+        return True
+
+    def close(self):
+        self.save()
+        if self._scored is not None:
+            self._scored.close()
+            self._scored = None
+
+
+def watch_folder(monitor, folder, interval, once):
+    while True:
+        for path in sorted(p for pattern in FEED_PATTERNS for p in glob.glob(os.path.join(folder, pattern))):
+            monitor.read_new_lines(path, os.path.splitext(os.path.basename(path))[0])
+        monitor.save()
+        if once:
+            return
+        time.sleep(interval)
+
+
+def follow_feed(monitor, path, interval, follow):
+    if path == "-":
+        for n, line in enumerate(sys.stdin, 1):
+            monitor.process_line(line, "stdin", f"stdin:{n}")
+            if n % 100 == 0:
+                monitor.save()
+        return
+    while True:
+        monitor.read_new_lines(path, os.path.splitext(os.path.basename(path))[0])
+        monitor.save()
+        if not follow:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score streamed reviews and alert on sentiment drops")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--feed", help="NDJSON file to read ('-' for stdin)")
+    source.add_argument("--watch", help="folder of *.ndjson / *.jsonl files to poll")
+    parser.add_argument("--follow", action="store_true", help="keep reading lines appended to --feed")
+    parser.add_argument("--once", action="store_true", help="process the --watch folder once and exit")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls")
+    parser.add_argument("--window", type=int, default=50, help="reviews per source in the rolling window")
+    parser.add_argument("--min-reviews", type=int, default=20, help="window size before rules are checked")
+    parser.add_argument("--min-score", type=float, default=0.0, help="alert below this rolling mean score")
+    parser.add_argument("--max-negative", type=float, default=0.35, help="alert above this negative share")
+    parser.add_argument("--max-drop", type=float, default=0.25,
+                        help="alert when the rolling score falls this far below the baseline")
+    parser.add_argument("--max-negative-rise", type=float, default=0.15,
+                        help="alert when the negative share rises this far above the baseline")
+    parser.add_argument("--hysteresis", type=float, default=0.02,
+                        help="how far past its threshold a value must recover before an alert resolves")
+    parser.add_argument("--alert-log", default=ALERT_LOG)
+    parser.add_argument("--webhook", default=None, help="also POST alerts to this URL")
+    parser.add_argument("--state", default=STATE_PATH, help="checkpoint file")
+    parser.add_argument("--reset", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    sinks = [AlertLog(args.alert_log)] + ([Webhook(args.webhook)] if args.webhook else [])
+    rules = AlertRules(args.min_score, args.max_negative, args.max_drop, args.max_negative_rise,
+                       args.min_reviews, args.hysteresis)
+    monitor = Monitor(rules, args.window, sinks, state_path=args.state)
+
+    # Only used for sources the checkpoint does not know yet
+    monitor.baselines = cube_baselines()
+    print(f"📌 Baselines for {len(monitor.baselines)} sources from {CUBE_PATH}")
+    if not args.reset and monitor.load():
+        print(f"📌 Resumed {len(monitor.sources)} sources from {args.state}")
+
+    start = time.perf_counter()
+    try:
+        if args.watch:
+            watch_folder(monitor, args.watch, args.interval, args.once)
+        else:
+            follow_feed(monitor, args.feed, args.interval, args.follow)
+    except KeyboardInterrupt:
+        print("\n⏹️ Stopped")
+    finally:
+        monitor.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n🎉 Scored {monitor.processed} reviews in {elapsed:.1f}s, {monitor.alerts} alerts")
+    print(f"📁 Scored reviews: {SCORED_PATH}")
+    print(f"📁 Alerts: {args.alert_log}")
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# -----------------------------
+# Vocabulary: a few aspects, each with nouns and positive / negative phrasing
+# -----------------------------
+ASPECTS = {
+    "service": ["service", "waiter", "reception", "counter", "checkout"],
+    "staff": ["staff", "manager", "barista", "doctor", "nurse"],
+    "facilities": ["room", "washroom", "parking", "lobby", "seating"],
+    "wait_time": ["wait", "queue", "delay", "appointment", "line"],
+    "value": ["price", "bill", "menu", "value", "charges"],
+}
+POSITIVE = ["friendly", "quick", "excellent", "clean", "helpful", "amazing", "polite", "reasonable", "spacious"]
+NEGATIVE = ["slow", "rude", "dirty", "overpriced", "noisy", "disappointing", "crowded", "careless", "long"]
+POSITIVE_TEMPLATES = ["The {noun} was {adj}.", "Really {adj} {noun}!", "Loved how {adj} the {noun} was.",
+                      "{Adj} {noun} and a great experience overall."]
+NEGATIVE_TEMPLATES = ["The {noun} was {adj}.", "Very {adj} {noun}, not coming back.",
+                      "Honestly the {noun} felt {adj}.", "{Adj} {noun} spoiled the visit."]
+FILLER = ["We visited on a weekend.", "Came here with family.", "Went there for the first time.",
+          "It is close to the station.", "Would recommend to friends."]
+EMOJIS = ["😊", "👍", "🔥", "😡", "👎", "❤️"]
+FIRST_NAMES = ["Asha", "Rahul", "Priya", "Vikram", "Meera", "Arjun", "Divya", "Karan", "Neha", "Sanjay"]
+
+# Rating mix seen in the real exports (mostly 5 stars, a tail of low ratings)
+RATINGS = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+RATING_WEIGHTS = np.array([0.08, 0.04, 0.08, 0.2, 0.6])
+
+
+def relative_date(days):
+    """Google-style relative date for a review `days` old ("3 weeks ago", "a year ago")."""
+    for unit, size in [("year", 365), ("month", 30), ("week", 7), ("day", 1)]:
+        if days >= size:
+            count = days // size
+            return f"a {unit} ago" if count == 1 else f"{count} {unit}s ago"
+    return "a day ago"
+
+
+def review_text(rng, rating, n_words):
+    """A review of roughly `n_words` words whose tone follows the rating."""
+    templates, adjectives = (POSITIVE_TEMPLATES, POSITIVE) if rating >= 4 else (NEGATIVE_TEMPLATES, NEGATIVE)
+    sentences = []
+    words = 0
+    while words < n_words:
+        if rng.random() < 0.25:
+            sentence = FILLER[rng.integers(len(FILLER))]
+        else:
+            aspect = list(ASPECTS)[rng.integers(len(ASPECTS))]
+            noun = ASPECTS[aspect][rng.integers(len(ASPECTS[aspect]))]
+            adj = adjectives[rng.integers(len(adjectives))]
+            template = templates[rng.integers(len(templates))]
+            sentence = template.format(noun=noun, adj=adj, Adj=adj.capitalize())
+        sentences.append(sentence)
+        words += len(sentence.split())
+
+    text = " ".join(sentences)
+    # Noise the cleaning step has to strip
+    if rng.random() < 0.1:
+        text += " " + EMOJIS[rng.integers(len(EMOJIS))]
+    if rng.random() < 0.02:
+        text += " more at https://example.com/r/" + str(rng.integers(10 ** 6))
+    return text
+
+
+def generate_reviews(rng, count, source, fetched_at, mean_words=40, sigma=0.8, max_days=3 * 365):
+    """Yield `count` reviews shaped like SerpAPI google_maps_reviews results."""
+    ratings = rng.choice(RATINGS, size=count, p=RATING_WEIGHTS)
+    # Log-normal length: most reviews are short, a few are very long
+    lengths = np.maximum(1, rng.lognormal(np.log(mean_words) - sigma ** 2 / 2, sigma, size=count)).astype(int)
+    ages = np.minimum(rng.exponential(max_days / 4, size=count), max_days).astype(int)
+
+    for i in range(count):
+        reviewed = fetched_at - timedelta(days=int(ages[i]))
+        name = f"{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {chr(65 + rng.integers(26))}."
+        # ~5% of Google reviews are rating-only
+        snippet = "" if rng.random() < 0.05 else review_text(rng, ratings[i], lengths[i])
+        yield {
+            "link": f"https://www.google.com/maps/reviews/synthetic/{source}/{i}",
+            "rating": float(ratings[i]),
+            "date": relative_date(int(ages[i])),
+            "iso_date": reviewed.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "user": {"name": name, "link": "https://www.google.com/maps/contrib/synthetic",
+                     "reviews": int(rng.integers(1, 200))},
+            "snippet": snippet,
+            "likes": int(rng.poisson(0.3)),
+            "fetched_at": fetched_at.isoformat(),
+        }
+
+
+def write_corpus(raw_dir, n_reviews, n_sources, mean_words=40, sigma=0.8, seed=42):
+    """
+    Write `n_reviews` synthetic reviews split across `n_sources` raw files
+    (<raw_dir>/<source>.json). Files are streamed review by review, so the
+    corpus size is not limited by memory. Returns the source names.
+    """
+    rng = np.random.default_rng(seed)
+    fetched_at = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    os.makedirs(raw_dir, exist_ok=True)
+
+    # Uneven business sizes, like real locations
+    weights = rng.pareto(1.5, size=n_sources) + 1
+    counts = np.floor(weights / weights.sum() * n_reviews).astype(int)
+    counts[: n_reviews - counts.sum()] += 1
+
+    sources = []
+    for i, count in enumerate(counts):
+        source = f"business_{i:04d}"
+        with open(os.path.join(raw_dir, f"{source}.json"), "w", encoding="utf-8") as f:
+            f.write("[")
+            for j, review in enumerate(generate_reviews(rng, int(count), source, fetched_at, mean_words, sigma)):
+                f.write((",\n" if j else "\n") + json.dumps(review, ensure_ascii=False))
+            f.write("\n]")
+        sources.append(source)
+    return sources
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SerpAPI-shaped review corpus")
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--mean-words", type=float, default=40, help="mean review length in words")
+    parser.add_argument("--sigma", type=float, default=0.8, help="spread of the log-normal length distribution")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="data/synthetic/raw", help="folder for the raw JSON files")
+    args = parser.parse_args()
+
+    sources = write_corpus(args.output, args.reviews, args.sources, args.mean_words, args.sigma, args.seed)
+
+    print(f"\n🎉 Generated {args.reviews} reviews across {len(sources)} sources")
+    print(f"📁 Saved to: {args.output}")
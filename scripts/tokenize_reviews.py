@@ -0,0 +1,126 @@
+"""
+Tokenize every review once and keep the result as a sparse document-term matrix.
+
+Reads review_id + review_text from the base table, applies the topic-model
+cleaning rules (lowercase, letters only, NLTK stopwords removed) and writes:
+
+    data/columns/tokens.csv    review_id, cleaned_text   (see review_view.py)
+    data/tokens/dtm.npz        CSR term counts, one row per review
+    data/tokens/review_ids.txt the review_id of each matrix row
+    data/tokens/vocab.txt      the term of each matrix column
+
+Keyword statistics (keyword_index.py), the topic model's vectorizer and its
+c-TF-IDF topic keywords (bertopic_modeling.py) all work from this matrix with
+sparse operations instead of splitting the strings again.
+
+    python scripts/tokenize_reviews.py
+"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+import profiling
+from review_view import load_view, require_ids, write_sidecar
+
+TOKENS_DIR = "data/tokens"
+DTM_PATH = os.path.join(TOKENS_DIR, "dtm.npz")
+IDS_PATH = os.path.join(TOKENS_DIR, "review_ids.txt")
+VOCAB_PATH = os.path.join(TOKENS_DIR, "vocab.txt")
+
+# cleaned_text holds only lowercase letters and spaces; single letters are dropped
+TOKEN_PATTERN = r"(?u)\b[a-z]{2,}\b"
+
+
+def stopword_set():
+    import nltk
+    from nltk.corpus import stopwords
+
+    nltk.download("stopwords", quiet=True)
+    return set(stopwords.words("english"))
+
+
+@profiling.hot
+def clean_text(text, stop_words):
+    if pd.isna(text):
+        return ""
+    text = text.lower()
+    text = re.sub(r"[^a-zA-Z\s]", "", text)  # remove special characters
+    return " ".join([word for word in text.split() if word not in stop_words])
+
+
+def build_dtm(cleaned):
+    """(CSR term counts, vocabulary) for a series of cleaned texts."""
+    vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, lowercase=False, dtype=np.int32)
+    X = vectorizer.fit_transform(cleaned.fillna(""))
+    return X.tocsr(), vectorizer.get_feature_names_out()
+
+
+# -----------------------------
+# Persisted matrix
+# -----------------------------
+def save_tokens(review_ids, vocab, X):
+    os.makedirs(TOKENS_DIR, exist_ok=True)
+    sp.save_npz(DTM_PATH + ".tmp.npz", X)
+    os.replace(DTM_PATH + ".tmp.npz", DTM_PATH)
+    for path, values in [(IDS_PATH, review_ids), (VOCAB_PATH, vocab)]:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(values) + "\n")
+
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return np.array(f.read().splitlines(), dtype=object)
+
+
+def tokens_available():
+    return all(os.path.exists(p) for p in [DTM_PATH, IDS_PATH, VOCAB_PATH])
+
+
+def load_tokens():
+    """(row review_ids, vocabulary, CSR matrix) as saved by this stage."""
+    return _read_lines(IDS_PATH), _read_lines(VOCAB_PATH), sp.load_npz(DTM_PATH).tocsr()
+
+
+def align_rows(row_ids, review_ids):
+    """Matrix row of each review in `review_ids` (all must be present)."""
+    rows = pd.Index(row_ids).get_indexer(pd.Index(review_ids))
+    if (rows < 0).any():
+        raise KeyError(f"{int((rows < 0).sum())} reviews are missing from {DTM_PATH}; re-run tokenize_reviews.py")
+    return rows
+
+
+def class_tfidf(counts):
+    """
+    BERTopic's class-based TF-IDF on per-class term counts: L1-normalized
+    term frequency per class times log(1 + mean class size / term frequency
+    across classes).
+    """
+    counts = sp.csr_matrix(counts, dtype=np.float64)
+    term_totals = np.asarray(counts.sum(axis=0)).ravel()
+    avg_class_size = int(counts.sum(axis=1).mean())
+    idf = np.log(avg_class_size / np.maximum(term_totals, 1) + 1)
+    row_totals = np.asarray(counts.sum(axis=1)).ravel()
+    tf = sp.diags(1 / np.maximum(row_totals, 1)) @ counts
+    return (tf @ sp.diags(idf)).tocsr()
+
+
+if __name__ == "__main__":
+    require_ids()
+    df = load_view(stages=(), columns=["review_id", "review_text"])
+
+    stop_words = stopword_set()
+    with profiling.timed("clean"):
+        df["cleaned_text"] = df["review_text"].apply(clean_text, stop_words=stop_words)
+    with profiling.timed("vectorize"):
+        X, vocab = build_dtm(df["cleaned_text"])
+
+    write_sidecar("tokens", df)
+    save_tokens(df["review_id"], vocab, X)
+
+    print("\n🎉 Tokenization complete!")
+    print(f"📁 Saved: {DTM_PATH}, {VOCAB_PATH}, {IDS_PATH}")
+    print(f"🔤 {X.shape[0]} reviews x {X.shape[1]} terms, {X.nnz} non-zero counts")
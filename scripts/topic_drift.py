@@ -0,0 +1,337 @@
+"""
+Topic drift monitoring between full BERTopic fits.
+
+Every fit (bertopic_modeling.py) saves a snapshot next to the model
+(models/topic_state.npz): each topic's centroid in embedding space, its size,
+the outlier rate and the similarity below which a review counts as an
+outlier (topic -1). Review embeddings are cached per review_id in
+data/embeddings/, so no review is encoded twice.
+
+This script is the pipeline's topics stage. On each run it:
+
+  1. embeds only the reviews it has not seen before,
+  2. keeps the topic of every review that already has one and gives each new
+     review the topic of its nearest centroid (-1 below the outlier similarity),
+  3. measures drift since the last fit: topic-size shift (total variation
+     distance between topic shares), centroid movement (cosine distance from
+     each fit centroid to the centroid of the topic's current reviews,
+     size-weighted) and the rise in outlier rate,
+  4. writes the drift report (data/topic_drift.json) and refits with
+     bertopic_modeling.py only when a measure exceeds its threshold, or when
+     there is no fit yet.
+
+Refits keep topic ids stable: each new topic takes the id of the previous
+topic whose centroid it matches, so reports and dashboard topics line up
+across runs (data/topic_id_map.csv lists model topic -> topic id).
+
+    python scripts/topic_drift.py [--max-size-shift 0.15] [--max-centroid-shift 0.1]
+                                  [--max-outlier-rise 0.1] [--refit]
+"""
+import argparse
+import json
+import os
+import runpy
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from keyword_index import group_term_counts
+from review_view import READ_OPTIONS, load_view, require_ids, sidecar_path, write_sidecar
+from tokenize_reviews import align_rows, class_tfidf, load_tokens
+from topic_map import TOPIC_MAP_PATH, load_topic_map
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDINGS_DIR = "data/embeddings"
+EMBEDDINGS_PATH = os.path.join(EMBEDDINGS_DIR, "embeddings.npy")
+EMBEDDING_IDS_PATH = os.path.join(EMBEDDINGS_DIR, "review_ids.txt")
+
+STATE_PATH = "models/topic_state.npz"
+REPORT_PATH = "data/topic_drift.json"
+ID_MAP_PATH = "data/topic_id_map.csv"
+TOPIC_KEYWORDS_PATH = "data/topic_keywords.csv"
+
+# Refit thresholds
+MAX_SIZE_SHIFT = 0.15
+MAX_CENTROID_SHIFT = 0.10
+MAX_OUTLIER_RISE = 0.10
+
+# A refit topic inherits a previous id only if the centroids are this similar
+MIN_MATCH_SIMILARITY = 0.7
+# Share of a fit's topic members allowed below the outlier similarity
+OUTLIER_QUANTILE = 0.05
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+# -----------------------------
+# Embedding cache
+# -----------------------------
+def embed(review_ids, texts):
+    """
+    Sentence embeddings aligned with `review_ids`. Only reviews missing from
+    the cache are encoded; the cache is then rewritten for exactly these reviews.
+    """
+    review_ids = pd.Index(review_ids)
+    if os.path.exists(EMBEDDINGS_PATH) and os.path.exists(EMBEDDING_IDS_PATH):
+        with open(EMBEDDING_IDS_PATH, "r", encoding="utf-8") as f:
+            cached_ids = pd.Index(f.read().splitlines())
+        cached = np.load(EMBEDDINGS_PATH)
+    else:
+        cached_ids, cached = pd.Index([]), None
+
+    rows = cached_ids.get_indexer(review_ids)
+    missing = rows < 0
+    if cached is not None and not missing.any() and len(cached_ids) == len(review_ids):
+        return cached[rows]
+
+    embeddings = None if cached is None else cached[np.maximum(rows, 0)]
+    if missing.any():
+        from sentence_transformers import SentenceTransformer
+
+        print(f"🧠 Encoding {int(missing.sum())} new reviews ({int((~missing).sum())} cached)")
+        encoded = SentenceTransformer(EMBEDDING_MODEL).encode(
+            pd.Series(texts)[missing].tolist(), show_progress_bar=True).astype(np.float32)
+        if embeddings is None:
+            embeddings = np.empty((len(review_ids), encoded.shape[1]), dtype=np.float32)
+        embeddings[missing] = encoded
+
+    os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
+    with open(EMBEDDINGS_PATH + ".tmp", "wb") as f:
+        np.save(f, embeddings)
+    os.replace(EMBEDDINGS_PATH + ".tmp", EMBEDDINGS_PATH)
+    with open(EMBEDDING_IDS_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join(review_ids) + "\n")
+    return embeddings
+
+
+# -----------------------------
+# Fit snapshot
+# -----------------------------
+def topic_centroids(embeddings, topics):
+    """(topic ids, unit centroids, sizes) of every topic except -1."""
+    topics = np.asarray(topics)
+    keep = topics != -1
+    ids, codes = np.unique(topics[keep], return_inverse=True)
+    G = csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(len(ids), len(codes)))
+    sums = G @ normalize(embeddings[keep])
+    return ids, normalize(sums), np.bincount(codes, minlength=len(ids))
+
+
+def fit_snapshot(embeddings, topics, next_topic=None):
+    """What a fit looked like, as saved by save_state()."""
+    topics = np.asarray(topics)
+    ids, centroids, sizes = topic_centroids(embeddings, topics)
+    members = topics != -1
+    similarity = (normalize(embeddings[members]) * centroids[np.searchsorted(ids, topics[members])]).sum(axis=1)
+    return {
+        "topics": ids,
+        "centroids": centroids,
+        "sizes": sizes,
+        "outlier_rate": float(np.mean(~members)) if len(topics) else 0.0,
+        "min_similarity": float(np.quantile(similarity, OUTLIER_QUANTILE)) if len(similarity) else 0.0,
+        # Ids are never reused once a topic disappears
+        "next_topic": int(max(ids.max() + 1 if len(ids) else 0, next_topic or 0)),
+    }
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, **state)
+    os.replace(path + ".tmp", path)
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        state = {key: saved[key] for key in saved.files}
+    for key in ["outlier_rate", "min_similarity"]:
+        state[key] = float(state[key])
+    state["next_topic"] = int(state["next_topic"])
+    return state
+
+
+def match_topics(previous, current, min_similarity=MIN_MATCH_SIMILARITY):
+    """
+    Stable ids for a refit's topics: one-to-one matching of current to
+    previous centroids by cosine similarity (Hungarian). Matched topics keep
+    the previous id; the rest get fresh ids. Returns model_topic, topic,
+    similarity (to the matched previous topic) per current topic.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    mapping = pd.DataFrame({"model_topic": current["topics"], "topic": -1, "similarity": np.nan})
+    if previous is not None and len(previous["topics"]) and len(current["topics"]):
+        similarity = current["centroids"] @ previous["centroids"].T
+        rows, cols = linear_sum_assignment(-similarity)
+        matched = similarity[rows, cols] >= min_similarity
+        mapping.loc[rows[matched], "topic"] = previous["topics"][cols[matched]]
+        mapping.loc[rows[matched], "similarity"] = similarity[rows[matched], cols[matched]]
+
+    next_topic = previous["next_topic"] if previous is not None else 0
+    fresh = mapping["topic"] == -1
+    mapping.loc[fresh, "topic"] = np.arange(next_topic, next_topic + int(fresh.sum()))
+    return mapping
+
+
+# -----------------------------
+# Incremental assignment and drift
+# -----------------------------
+def assign(embeddings, state):
+    """Nearest fit centroid per review; -1 when below the fit's outlier similarity."""
+    if len(embeddings) == 0 or len(state["topics"]) == 0:
+        return np.full(len(embeddings), -1, dtype=int)
+    similarity = normalize(embeddings) @ state["centroids"].T
+    best = similarity.argmax(axis=1)
+    return np.where(similarity[np.arange(len(best)), best] >= state["min_similarity"], state["topics"][best], -1)
+
+
+def drift_report(state, embeddings, topics):
+    """Size shift, centroid movement and outlier rate of `topics` relative to the fit in `state`."""
+    ids, centroids, sizes = topic_centroids(embeddings, topics)
+    fit = pd.DataFrame({"fit_size": state["sizes"]}, index=pd.Index(state["topics"], name="topic"))
+    now = pd.DataFrame({"size": sizes}, index=pd.Index(ids, name="topic"))
+    table = fit.join(now, how="outer").fillna(0).astype(int)
+
+    fit_share = table["fit_size"] / max(table["fit_size"].sum(), 1)
+    share = table["size"] / max(table["size"].sum(), 1)
+
+    # Centroid movement of topics present in both
+    both = np.intersect1d(state["topics"], ids)
+    shift = 1 - (centroids[np.searchsorted(ids, both)]
+                 * state["centroids"][np.searchsorted(state["topics"], both)]).sum(axis=1)
+    table["centroid_shift"] = pd.Series(shift, index=both)
+    table["share_change"] = share - fit_share
+    weights = table.loc[both, "size"]
+
+    outlier_rate = float(np.mean(np.asarray(topics) == -1)) if len(topics) else 0.0
+    return {
+        "reviews": int(len(topics)),
+        "size_shift": round(float(0.5 * (share - fit_share).abs().sum()), 4),
+        "centroid_shift": round(float(np.average(shift, weights=weights)) if weights.sum() else 0.0, 4),
+        "outlier_rate": round(outlier_rate, 4),
+        "fit_outlier_rate": round(state["outlier_rate"], 4),
+        "outlier_rise": round(outlier_rate - state["outlier_rate"], 4),
+        "topics": [
+            {"topic": int(topic), "fit_size": int(row["fit_size"]), "size": int(row["size"]),
+             "share_change": round(float(row["share_change"]), 4),
+             "centroid_shift": None if pd.isna(row["centroid_shift"]) else round(float(row["centroid_shift"]), 4)}
+            for topic, row in table.iterrows()
+        ],
+    }
+
+
+def exceeded_thresholds(report, max_size_shift, max_centroid_shift, max_outlier_rise):
+    checks = {"size_shift": max_size_shift, "centroid_shift": max_centroid_shift, "outlier_rise": max_outlier_rise}
+    return [name for name, limit in checks.items() if report[name] > limit]
+
+
+# -----------------------------
+# Outputs shared with bertopic_modeling.py
+# -----------------------------
+def topic_keywords(X, vocab, topics, top_n=10):
+    """
+    The c-TF-IDF terms per topic, summed from the shared document-term matrix
+    as BERTopic does internally, so the dashboard never needs the model.
+    """
+    topic_ids, counts = group_term_counts(X, pd.DataFrame({"topic": np.asarray(topics)}))
+    weights = class_tfidf(counts).toarray()
+    top = np.argsort(-weights, axis=1, kind="stable")[:, :top_n]
+    return pd.DataFrame(
+        [
+            {"topic": int(topic), "term": vocab[term], "weight": weights[i, term], "rank": rank}
+            for i, topic in enumerate(topic_ids["topic"])
+            for rank, term in enumerate(top[i], 1)
+            if weights[i, term] > 0
+        ]
+    ).sort_values(["topic", "rank"])
+
+
+def write_report(report, path=REPORT_PATH):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def refit():
+    runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bertopic_modeling.py"),
+                   run_name="__main__")
+
+
+def previous_topics(review_ids):
+    """Topic of each review from the last run (NaN for reviews it did not label)."""
+    path = sidecar_path("topics")
+    if not os.path.exists(path):
+        return pd.Series(np.nan, index=pd.Index(review_ids))
+    topics = pd.read_csv(path, **READ_OPTIONS).set_index("review_id")["topic"]
+    return pd.to_numeric(topics, errors="coerce").reindex(review_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign new reviews to the fitted topics; refit only on drift")
+    parser.add_argument("--max-size-shift", type=float, default=MAX_SIZE_SHIFT,
+                        help="refit above this total variation distance between topic shares")
+    parser.add_argument("--max-centroid-shift", type=float, default=MAX_CENTROID_SHIFT,
+                        help="refit above this size-weighted cosine distance of topic centroids")
+    parser.add_argument("--max-outlier-rise", type=float, default=MAX_OUTLIER_RISE,
+                        help="refit when the outlier (-1) rate rises by more than this")
+    parser.add_argument("--refit", action="store_true", help="refit regardless of drift")
+    args = parser.parse_args()
+
+    state = load_state()
+    if state is None or args.refit:
+        reason = "requested" if args.refit else "no previous fit"
+        print(f"🔁 Full refit ({reason})")
+        refit()
+        write_report({"action": "refit", "reason": reason})
+        raise SystemExit(0)
+
+    require_ids()
+    df = load_view(stages=("tokens",), columns=["review_id", "cleaned_text"])
+    df = df[df["cleaned_text"].fillna("").str.strip() != ""].reset_index(drop=True)
+    print("📌 Loaded dataset with", len(df), "reviews")
+
+    embeddings = embed(df["review_id"], df["cleaned_text"])
+    topics = previous_topics(df["review_id"]).to_numpy(dtype=float, copy=True)
+    new = np.isnan(topics)
+    topics[new] = assign(embeddings[new], state)
+    topics = topics.astype(int)
+
+    report = drift_report(state, embeddings, topics)
+    report["new_reviews"] = int(new.sum())
+    exceeded = exceeded_thresholds(report, args.max_size_shift, args.max_centroid_shift, args.max_outlier_rise)
+    print(f"📈 Drift since last fit: size shift {report['size_shift']:.3f}, "
+          f"centroid shift {report['centroid_shift']:.3f}, outlier rise {report['outlier_rise']:+.3f}")
+
+    if exceeded:
+        print(f"🔁 Full refit ({', '.join(exceeded)} over threshold)")
+        refit()
+        write_report({"action": "refit", "reason": f"drift: {', '.join(exceeded)}", "drift": report})
+        raise SystemExit(0)
+
+    # Below every threshold: keep the fitted model and ids, refresh what depends on the assignment
+    df["topic"] = topics
+    write_sidecar("topics", df)
+
+    row_ids, vocab, X = load_tokens()
+    topic_keywords(X[align_rows(row_ids, df["review_id"])], vocab, topics).to_csv(TOPIC_KEYWORDS_PATH, index=False)
+
+    if os.path.exists(TOPIC_MAP_PATH):
+        topic_map = load_topic_map()
+        sizes = pd.Series(topics).value_counts()
+        topic_map["size"] = topic_map["topic"].map(sizes).fillna(0).astype(int)
+        topic_map.to_csv(TOPIC_MAP_PATH, index=False)
+
+    write_report({"action": "assigned", "drift": report})
+
+    print("\n🎉 Topics assigned without refitting!")
+    print(f"🆕 {report['new_reviews']} new reviews assigned to the {len(state['topics'])} fitted topics")
+    print("📁 Saved:")
+    print(f"  - {sidecar_path('topics')}")
+    print(f"  - {TOPIC_KEYWORDS_PATH}")
+    print(f"  - {REPORT_PATH}")
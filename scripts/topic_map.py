@@ -0,0 +1,66 @@
+"""
+Intertopic distance map data, saved at fit time so charts never load the model.
+
+bertopic_modeling.py calls `build_topic_map(topic_model)` right after fitting
+and writes the result to TOPIC_MAP_PATH: one row per topic with its 2D
+position, size and top words, computed the same way as
+`BERTopic.visualize_topics()`. `topic_map_figure()` draws the interactive
+map from that table with plotly alone.
+"""
+import numpy as np
+import pandas as pd
+
+TOPIC_MAP_PATH = "data/topic_map.csv"
+
+
+def build_topic_map(topic_model, top_n_words=5):
+    """Topic positions for the intertopic distance map (outlier topic -1 excluded)."""
+    from sklearn.preprocessing import MinMaxScaler
+    from umap import UMAP
+
+    topics = sorted(t for t in topic_model.get_topics() if t != -1)
+    all_topics = sorted(topic_model.get_topics())
+    indices = np.array([all_topics.index(t) for t in topics])
+
+    if getattr(topic_model, "topic_embeddings_", None) is not None:
+        embeddings = np.asarray(topic_model.topic_embeddings_)[indices]
+        metric = "cosine"
+    else:
+        embeddings = MinMaxScaler().fit_transform(topic_model.c_tf_idf_.toarray()[indices])
+        metric = "hellinger"
+
+    if len(topics) >= 3:
+        coords = UMAP(n_neighbors=2, n_components=2, metric=metric, random_state=42).fit_transform(embeddings)
+    else:
+        # Too few topics for UMAP; spread them on a line
+        coords = np.column_stack([np.arange(len(topics), dtype=float), np.zeros(len(topics))])
+
+    return pd.DataFrame({
+        "topic": topics,
+        "x": coords[:, 0],
+        "y": coords[:, 1],
+        "size": [topic_model.topic_sizes_[t] for t in topics],
+        "words": [" | ".join(word for word, _ in topic_model.get_topic(t)[:top_n_words]) for t in topics],
+    })
+
+
+def load_topic_map(path=TOPIC_MAP_PATH):
+    return pd.read_csv(path)
+
+
+def topic_map_figure(topic_map, title="Intertopic Distance Map"):
+    """Plotly bubble chart of the topic map (bubble area ~ topic size)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(
+        x=topic_map["x"], y=topic_map["y"], mode="markers+text",
+        text=topic_map["topic"].astype(str), textposition="middle center",
+        customdata=topic_map[["topic", "words", "size"]],
+        hovertemplate="<b>Topic %{customdata[0]}</b><br>%{customdata[1]}<br>Size: %{customdata[2]}<extra></extra>",
+        marker=dict(size=topic_map["size"], sizemode="area",
+                    sizeref=2.0 * topic_map["size"].max() / 60 ** 2, sizemin=4,
+                    color="#B0BEC5", line=dict(width=2, color="DarkSlateGrey")),
+    ))
+    fig.update_layout(title=title, template="simple_white", width=650, height=650,
+                      xaxis=dict(visible=False), yaxis=dict(visible=False))
+    return fig
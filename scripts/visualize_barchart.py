@@ -1,28 +1,37 @@
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 
-# Load dataset created during BERTopic modeling
-df = pd.read_csv("data/final_topic_labeled_dataset.csv")
 
-# Group by topic and count
-topic_counts = df["topic"].value_counts().sort_index()
+def plot_topic_distribution(topic_counts, path, title="Topic Distribution Across Reviews", dpi=300):
+    """Bar chart of reviews per topic, saved to `path`; returns the figure."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(topic_counts.index, topic_counts.values)
+    ax.set_xlabel("Topic Number")
+    ax.set_ylabel("Number of Reviews")
+    ax.set_title(title)
 
-# Plot
-plt.figure(figsize=(12, 6))
-bars = plt.bar(topic_counts.index, topic_counts.values)
-plt.xlabel("Topic Number")
-plt.ylabel("Number of Reviews")
-plt.title("Topic Distribution Across Reviews")
+    # Add value labels on top of bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2, height + 5, str(height),
+                ha='center', fontsize=10)
 
-# Add value labels on top of bars
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, height + 5, str(height), 
-             ha='center', fontsize=10)
+    fig.savefig(path, dpi=dpi)
+    return fig
 
-# Save chart
-plt.savefig("visualizations/topic_distribution_barchart.png", dpi=300)
-plt.show()
 
-print("\n📊 Topic Distribution Bar Chart Created!")
-print("📁 Saved to: visualizations/topic_distribution_barchart.png")
+if __name__ == "__main__":
+    # Load dataset created during BERTopic modeling
+    df = pd.read_csv("data/final_topic_labeled_dataset.csv", usecols=["topic"])
+
+    # Group by topic and count
+    topic_counts = df["topic"].value_counts().sort_index()
+
+    plot_topic_distribution(topic_counts, "visualizations/topic_distribution_barchart.png")
+    # Only show the window when there is a display to show it on
+    if matplotlib.get_backend().lower() != "agg":
+        plt.show()
+
+    print("\n📊 Topic Distribution Bar Chart Created!")
+    print("📁 Saved to: visualizations/topic_distribution_barchart.png")
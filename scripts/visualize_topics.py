@@ -1,14 +1,12 @@
 import pandas as pd
-from bertopic import BERTopic
 import webbrowser
 import os
+import sys
 
-# Load saved BERTopic model
-model_path = "models/bertopic_model"
-topic_model = BERTopic.load(model_path)
+from topic_map import TOPIC_MAP_PATH, load_topic_map, topic_map_figure
 
 # Load dataset with assigned topics
-df = pd.read_csv("data/final_topic_labeled_dataset.csv")
+df = pd.read_csv("data/final_topic_labeled_dataset.csv", usecols=["topic"])
 
 print(f"📌 Loaded {len(df)} reviews.")
 
@@ -18,15 +16,23 @@ os.makedirs(output_path, exist_ok=True)
 
 html_file_path = os.path.join(output_path, "bertopic_visualization.html")
 
-print("📊 Generating Topic Visualization... (This may take 10-30 seconds)")
-fig = topic_model.visualize_topics()
+if os.path.exists(TOPIC_MAP_PATH):
+    # Map data cached at fit time; no need to load the model
+    fig = topic_map_figure(load_topic_map())
+else:
+    from bertopic import BERTopic
+
+    print("📊 Generating Topic Visualization... (This may take 10-30 seconds)")
+    topic_model = BERTopic.load("models/bertopic_model")
+    fig = topic_model.visualize_topics()
 
 # Save HTML file
 fig.write_html(html_file_path)
 print(f"✨ Visualization saved at: {html_file_path}")
 
-# Auto-open the visualization in browser
-abs_path = os.path.abspath(html_file_path)
-webbrowser.open(f"file://{abs_path}")
+# Auto-open the visualization in browser (skipped for unattended pipeline runs)
+if "--no-browser" not in sys.argv:
+    abs_path = os.path.abspath(html_file_path)
+    webbrowser.open(f"file://{abs_path}")
 
-print("\n🚀 Visualization launched in your browser!")
+    print("\n🚀 Visualization launched in your browser!")
@@ -1,70 +1,22 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-import re
+import perf
+from data_access import load_cube, load_keyword_index, load_keyword_sketch, load_reviews, with_text
+from aggregates import overall_metrics
 
 st.set_page_config(
     page_title="Business Reputation & Insights Analyzer",
     page_icon="📊",
     layout="wide"
 )
+perf.start_page("Home")
 
 st.title("📊 Business Reputation & Insights Analyzer")
 st.write("Welcome! Use the left sidebar to navigate between analysis pages.")
 
-def convert_relative_date(text):
-    """
-    Convert relative date strings like '4 weeks ago', '2 months ago' 
-    to actual datetime objects
-    """
-    try:
-        text = str(text).lower().strip()
-        
-        # Handle "a week ago", "a month ago" (no number)
-        if text.startswith("a "):
-            text = "1 " + text[2:]
-        
-        # Extract number from the string
-        match = re.search(r"(\d+)", text)
-        if not match:
-            # If no number found, return today
-            return datetime.today()
-        
-        num = int(match.group(1))
-        
-        # Check what time unit is mentioned
-        if "year" in text:
-            return datetime.today() - timedelta(days=num * 365)
-        elif "month" in text:
-            return datetime.today() - timedelta(days=num * 30)
-        elif "week" in text:
-            return datetime.today() - timedelta(weeks=num)
-        elif "day" in text:
-            return datetime.today() - timedelta(days=num)
-        elif "hour" in text:
-            return datetime.today() - timedelta(hours=num)
-        else:
-            # Default to today if format not recognized
-            return datetime.today()
-            
-    except Exception as e:
-        print(f"Error parsing date '{text}': {e}")
-        return datetime.today()
-
-# Load dataset
-@st.cache_data
-def load_data():
-    """Load and preprocess the dataset"""
-    df = pd.read_csv("../data/final_topic_labeled_dataset.csv")
-    
-    # Convert relative dates to actual datetime objects
-    if 'review_date' in df.columns:
-        df['review_date'] = df['review_date'].apply(convert_relative_date)
-    
-    return df
-
-# Load the data
-df = load_data()
+# Load the shared dataset (text columns are attached only where displayed)
+df = load_reviews()
+perf.lap("load")
 
 # Display dataset overview
 st.subheader("📁 Dataset Overview")
@@ -72,32 +24,53 @@ st.subheader("📁 Dataset Overview")
 # Show key metrics
 col1, col2, col3, col4 = st.columns(4)
 
+# Headline metrics come from the precomputed aggregate cube
+metrics = overall_metrics(load_cube())
+perf.lap("aggregate")
+
 with col1:
-    st.metric("Total Reviews", len(df))
+    st.metric("Total Reviews", metrics["total"])
 
 with col2:
-    if 'sentiment_score' in df.columns:
-        avg_sentiment = df['sentiment_score'].mean()
-        st.metric("Avg Sentiment", f"{avg_sentiment:.2f}")
-    else:
-        st.metric("Avg Sentiment", "N/A")
+    st.metric("Avg Sentiment", f"{metrics['avg_sentiment']:.2f}")
 
 with col3:
-    if 'rating' in df.columns:
-        avg_rating = df['rating'].mean()
-        st.metric("Avg Rating", f"{avg_rating:.1f} ⭐")
-    else:
-        st.metric("Avg Rating", "N/A")
+    st.metric("Avg Rating", f"{metrics['avg_rating']:.1f} ⭐")
 
 with col4:
-    if 'review_date' in df.columns:
-        date_range = (df['review_date'].max() - df['review_date'].min()).days
-        st.metric("Date Range", f"{date_range} days")
-    else:
-        st.metric("Date Range", "N/A")
+    date_range = (metrics["last_review"] - metrics["first_review"]).days
+    st.metric("Date Range", f"{date_range} days")
 
 # Show sample data
-st.dataframe(df.head(10), use_container_width=True)
+st.dataframe(with_text(df.head(10), ["reviewer_name", "review_text"]), use_container_width=True)
+perf.lap("render")
+
+# Top keywords: merged per source x month sketches when built, else the keyword index
+st.subheader("🔑 Top Keywords")
+sketch = load_keyword_sketch()
+if sketch is not None and sketch.months:
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        sources = st.multiselect("Sources", sketch.sources, placeholder="All sources")
+    with col2:
+        start, end = st.select_slider("Period", options=sketch.months, value=(sketch.months[0], sketch.months[-1]))
+    with col3:
+        kind = st.radio("Show", ["keyword", "bigram"], format_func=lambda k: k.title() + "s", horizontal=True)
+    selection = dict(kind=kind, sources=sources or None, start=start, end=end)
+    top_keywords = sketch.top(**selection, top_n=15).rename(columns={"estimate": "count"})
+    bounds = sketch.error_bounds(sketch.select(**selection))
+else:
+    index = load_keyword_index()
+    top_keywords = index[index["level"] == "all"].nsmallest(15, "rank")
+    bounds = None
+perf.lap("aggregate")
+if len(top_keywords):
+    st.info(", ".join(f"**{term}** ({count})" for term, count in zip(top_keywords["term"], top_keywords["count"])))
+    if bounds and bounds["space_saving"]:
+        st.caption(f"Approximate counts: each is at most {bounds['space_saving']:,} over the true count "
+                   f"({bounds['occurrences']:,} occurrences in this selection).")
+else:
+    st.caption("No keywords yet.")
 
 # Navigation guide
 st.markdown("""
@@ -105,6 +78,7 @@ st.markdown("""
 - **Sentiment Trends:** Visualize customer sentiment over time  
 - **Topic Analysis:** Explore positive & negative recurring themes  
 - **AI Recommendations:** LLM-generated summary and business improvement tips  
+- **Review Explorer:** Filter, search and page through individual reviews  
 """)
 
 # Optional: Dataset statistics
@@ -120,4 +94,6 @@ with st.expander("📊 View Dataset Statistics"):
 
 # Footer
 st.markdown("---")
-st.caption("💡 Tip: Use the sidebar to navigate to different analysis pages")
\ No newline at end of file
+st.caption("💡 Tip: Use the sidebar to navigate to different analysis pages")
+
+perf.finish_page()
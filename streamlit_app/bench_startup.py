@@ -0,0 +1,62 @@
+"""
+Repeatable time-to-first-render measurement for every dashboard page.
+
+    cd streamlit_app && python bench_startup.py [--runs 3] [--output startup.json]
+
+Each cold run starts a fresh Python process (nothing imported or cached);
+the warm run re-renders the page in the same process, as a returning
+visitor would see it.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PAGES = ["app.py", "pages/sentiment_trends.py", "pages/topic_analysis.py",
+         "pages/LLM_summary.py", "pages/review_explorer.py"]
+
+# Runs inside the child process; prints "<cold seconds> <warm seconds>"
+CHILD = """
+import sys, time, logging
+logging.disable(logging.WARNING)
+sys.path.insert(0, ".")
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout=120).run()
+cold = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+start = time.perf_counter()
+AppTest.from_file({page!r}, default_timeout=120).run()
+print(cold, time.perf_counter() - start)
+"""
+
+
+def measure(page, runs):
+    cold, warm = [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", CHILD.format(page=page)],
+                                capture_output=True, text=True, check=True)
+        c, w = map(float, result.stdout.split()[-2:])
+        cold.append(c)
+        warm.append(w)
+    return {"cold_ms": round(statistics.median(cold) * 1000), "warm_ms": round(statistics.median(warm) * 1000)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure time-to-first-render per page")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per page (median is reported)")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'Page':<30} {'Cold (ms)':>10} {'Warm (ms)':>10}")
+    for page in PAGES:
+        results[page] = measure(page, args.runs)
+        print(f"{page:<30} {results[page]['cold_ms']:>10} {results[page]['warm_ms']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"📁 Results saved to {args.output}")
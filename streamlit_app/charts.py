@@ -0,0 +1,22 @@
+"""
+Lazy Plotly modules.
+
+`from charts import px, go` costs nothing at page load; Plotly is imported
+the first time a chart is actually built, so text and metrics render first.
+"""
+import importlib
+
+
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+px = _LazyModule("plotly.express")
+go = _LazyModule("plotly.graph_objects")
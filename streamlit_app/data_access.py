@@ -0,0 +1,213 @@
+"""
+Shared data access for every Streamlit page.
+
+The dataset is loaded once per server process with `st.cache_resource`, so
+all pages and sessions share one compact copy instead of each page holding
+(and deep-copying) its own. Heavy text columns are loaded separately and
+only when a page actually needs them. When the pipeline has built the
+parquet store (scripts/dataset_store.py) it is read instead of the CSV.
+
+Frames returned from here are shared: treat them as read-only and call
+`.copy()` before mutating.
+"""
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+import perf
+
+# Shared pipeline helpers live in scripts/ (the app runs from streamlit_app/)
+sys.path.append("../scripts")
+import aggregates
+import dataset_store
+import keyword_index
+import keyword_sketch
+import review_view
+from date_utils import file_timestamp, normalize_review_dates
+
+DATA_PATH = "../data/final_topic_labeled_dataset.csv"
+BASE_PATH = "../data/final_cleaned_dataset.csv"
+COLUMNS_DIR = "../data/columns"
+STORE_PATH = "../data/dashboard_store.parquet"
+CUBE_PATH = "../data/review_cube.csv"
+KEYWORD_INDEX_PATH = "../data/keyword_index.csv"
+TOPIC_KEYWORDS_PATH = "../data/topic_keywords.csv"
+SKETCH_COUNTERS_PATH = "../data/keyword_sketch.csv"
+SKETCH_TABLES_PATH = "../data/keyword_sketch.npz"
+
+# Small columns every page uses
+CORE_COLUMNS = ["review_date", "rating", "source", "sentiment_score", "sentiment_label", "topic", "fetched_at"]
+
+# Heavy columns, only loaded on demand
+TEXT_COLUMNS = ["reviewer_name", "review_text", "cleaned_text"]
+
+# With pandas < 3 this keeps slices of the shared frame from writing back into it
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+
+def _available_columns(path, wanted):
+    header = pd.read_csv(path, nrows=0).columns
+    return [c for c in wanted if c in header]
+
+
+@perf.cached(st.cache_resource(max_entries=1, show_spinner="Loading reviews..."))
+def _load_core(path, mtime):
+    if path.endswith(".parquet"):
+        # Dates and dtypes were finalized when the store was built
+        return dataset_store.read_store(path, [c for c in CORE_COLUMNS if c != "fetched_at"])
+
+    df = pd.read_csv(path, usecols=_available_columns(path, CORE_COLUMNS))
+    # Dates are resolved once by the pipeline; older datasets that still hold
+    # relative strings are resolved against the file's timestamp instead
+    df = normalize_review_dates(df, default_anchor=file_timestamp(path))
+    if "fetched_at" in df.columns:
+        df = df.drop(columns="fetched_at")
+    return dataset_store.compact_dtypes(df)
+
+
+@perf.cached(st.cache_resource(max_entries=len(TEXT_COLUMNS)))
+def _load_text(path, mtime, column):
+    if path.endswith(".parquet"):
+        return dataset_store.read_store(path, [column])[column]
+    return pd.read_csv(path, usecols=[column])[column]
+
+
+def _mtime(path):
+    # Part of the cache key, so a rebuilt dataset is picked up automatically
+    return os.path.getmtime(path)
+
+
+def data_version():
+    """Changes whenever the dataset is rebuilt; use it as an st.cache_data key."""
+    return _mtime(DATA_PATH)
+
+
+def _dataset_path():
+    """The parquet store when it is up to date and readable, else the CSV."""
+    if _is_fresh(STORE_PATH) and dataset_store.parquet_available():
+        return STORE_PATH
+    return DATA_PATH
+
+
+def load_reviews(columns=None):
+    """Return the shared review frame (optionally projected to `columns`)."""
+    path = _dataset_path()
+    df = _load_core(path, _mtime(path))
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def load_text(column="review_text"):
+    """Return one heavy text column, aligned with `load_reviews()` by index."""
+    path = _dataset_path()
+    return _load_text(path, _mtime(path), column)
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _text_columns(path, mtime):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+    else:
+        names = pd.read_csv(path, nrows=0).columns
+    return [c for c in TEXT_COLUMNS if c in names]
+
+
+def text_columns():
+    """The heavy text columns the current dataset actually has."""
+    path = _dataset_path()
+    return _text_columns(path, _mtime(path))
+
+
+def with_text(df, columns=("review_text",)):
+    """Attach text columns to a (small) slice of the review frame."""
+    return df.assign(**{c: load_text(c).loc[df.index] for c in columns})
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _load_cube(path, mtime):
+    return aggregates.load_cube(path)
+
+
+def load_cube():
+    """
+    Return the precomputed aggregate cube (see scripts/aggregates.py).
+
+    Falls back to aggregating the shared review frame when the cube has not
+    been built yet or is older than the files it is built from.
+    """
+    if _is_fresh(CUBE_PATH):
+        return _load_cube(CUBE_PATH, _mtime(CUBE_PATH))
+    return _build_cube(_mtime(DATA_PATH))
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _build_cube(mtime):
+    return aggregates.build_cube(load_reviews())
+
+
+def _is_fresh(path):
+    # Cube, keyword index and store are built from the base table and column files,
+    # alongside the wide table, so compare against those (the wide table for older datasets)
+    sources = review_view.source_paths(BASE_PATH, COLUMNS_DIR) or [DATA_PATH]
+    return os.path.exists(path) and _mtime(path) >= max(_mtime(source) for source in sources)
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _load_keyword_index(path, mtime):
+    return pd.read_csv(path, dtype={"source": "category", "sentiment_label": "category"})
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _build_keyword_index(mtime):
+    core = load_reviews(["topic", "source", "sentiment_label"])
+    return keyword_index.build_keyword_index(core.assign(cleaned_text=load_text("cleaned_text")))
+
+
+def load_keyword_index():
+    """
+    Return the per-topic keyword index (see scripts/keyword_index.py),
+    building it from the dataset when the pipeline has not produced it yet.
+    """
+    if _is_fresh(KEYWORD_INDEX_PATH):
+        return _load_keyword_index(KEYWORD_INDEX_PATH, _mtime(KEYWORD_INDEX_PATH))
+    return _build_keyword_index(_mtime(DATA_PATH))
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _load_topic_keywords(path, mtime):
+    return pd.read_csv(path)
+
+
+def load_topic_keywords():
+    """BERTopic c-TF-IDF terms per topic, or None if the model output is missing."""
+    if not os.path.exists(TOPIC_KEYWORDS_PATH):
+        return None
+    return _load_topic_keywords(TOPIC_KEYWORDS_PATH, _mtime(TOPIC_KEYWORDS_PATH))
+
+
+@perf.cached(st.cache_resource(max_entries=1))
+def _load_keyword_sketch(counters_path, tables_path, mtime):
+    return keyword_sketch.KeywordSketch.load(counters_path, tables_path)
+
+
+def load_keyword_sketch():
+    """Per source x month keyword sketches (see scripts/keyword_sketch.py), or None if not built."""
+    if not keyword_sketch.sketch_available(SKETCH_COUNTERS_PATH, SKETCH_TABLES_PATH):
+        return None
+    mtime = max(_mtime(SKETCH_COUNTERS_PATH), _mtime(SKETCH_TABLES_PATH))
+    return _load_keyword_sketch(SKETCH_COUNTERS_PATH, SKETCH_TABLES_PATH, mtime)
+
+
+def warm_caches():
+    """Load everything the pages need up front (see serve.py)."""
+    load_reviews()
+    load_text("review_text")
+    load_cube()
+    load_keyword_index()
+    load_keyword_sketch()
+    import plotly.express  # noqa: F401  (first chart otherwise pays for the import)
@@ -1,66 +1,27 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-import re
-import os
+import perf
+from datetime import datetime
+from charts import px
+from data_access import data_version, load_cube, load_reviews
+from reports import merged_report, render_report
+from trends import resample_sentiment
+from aggregates import overall_metrics, peer_gaps, source_metrics, topic_counts, topic_mix
+
+perf.start_page("AI Recommendations")
 
 st.title("🤖 AI-Powered Business Recommendations")
 st.write("LLM-generated insights and actionable recommendations based on customer reviews.")
 
-def convert_relative_date(text):
-    """Convert relative date strings to datetime objects"""
-    try:
-        text = str(text).lower().strip()
-        
-        if text.startswith("a "):
-            text = "1 " + text[2:]
-        
-        match = re.search(r"(\d+)", text)
-        if not match:
-            return datetime.today()
-        
-        num = int(match.group(1))
-        
-        if "year" in text:
-            return datetime.today() - timedelta(days=num * 365)
-        elif "month" in text:
-            return datetime.today() - timedelta(days=num * 30)
-        elif "week" in text:
-            return datetime.today() - timedelta(weeks=num)
-        elif "day" in text:
-            return datetime.today() - timedelta(days=num)
-        elif "hour" in text:
-            return datetime.today() - timedelta(hours=num)
-        else:
-            return datetime.today()
-            
-    except Exception as e:
-        print(f"Error parsing date '{text}': {e}")
-        return datetime.today()
-
-@st.cache_data
-def load_data():
-    """Load the dataset"""
-    df = pd.read_csv("../data/final_topic_labeled_dataset.csv")
-    
-    if 'review_date' in df.columns:
-        df['review_date'] = df['review_date'].apply(convert_relative_date)
-    
-    return df
-
-def load_report(filename):
-    """Load text report from reports folder"""
-    try:
-        filepath = os.path.join("../reports", filename)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        return f"⚠️ Report file '{filename}' not found in reports folder."
-    except Exception as e:
-        return f"⚠️ Error loading report: {str(e)}"
-
-# Load data for overview metrics
-df = load_data()
+@perf.cached(st.cache_data(show_spinner=False))
+def weekly_trend(version):
+    return resample_sentiment(df, freq="W", window=4, by=None)
+
+# Overview metrics come from the precomputed aggregate cube
+cube = load_cube()
+metrics = overall_metrics(cube)
+df = load_reviews(["review_date", "sentiment_score"])
+perf.lap("load")
 
 # ------- Overview Metrics -------
 st.subheader("📊 Business Performance Overview")
@@ -68,41 +29,28 @@ st.subheader("📊 Business Performance Overview")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_reviews = len(df)
+    total_reviews = metrics["total"]
     st.metric("Total Reviews Analyzed", total_reviews)
 
 with col2:
-    if 'sentiment_score' in df.columns:
-        avg_sentiment = df['sentiment_score'].mean()
-        st.metric("Average Sentiment", f"{avg_sentiment:.2f}")
-    else:
-        st.metric("Average Sentiment", "N/A")
+    st.metric("Average Sentiment", f"{metrics['avg_sentiment']:.2f}")
 
 with col3:
-    if 'rating' in df.columns:
-        avg_rating = df['rating'].mean()
-        st.metric("Average Rating", f"{avg_rating:.1f} ⭐")
-    else:
-        st.metric("Average Rating", "N/A")
+    st.metric("Average Rating", f"{metrics['avg_rating']:.1f} ⭐")
 
 with col4:
-    positive_pct = len(df[df['sentiment_label'] == 'Positive']) / len(df) * 100
+    positive_pct = metrics["positive"] / total_reviews * 100
     st.metric("Positive Reviews", f"{positive_pct:.1f}%")
 
 st.divider()
+perf.lap("render")
 
 # ------- Executive Summary -------
 st.subheader("📋 Executive Summary")
 st.write("High-level overview of customer feedback and business performance.")
 
-executive_summary = load_report("executive_summary.txt")
-
-with st.container():
-    st.markdown(f"""
-    <div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; border-left: 5px solid #1f77b4; color: #000000;">
-        <pre style="white-space: pre-wrap; font-family: inherit; color: #000000; margin: 0;">{executive_summary}</pre>
-    </div>
-    """, unsafe_allow_html=True)
+# Sections are read (and cached) only for the page being shown
+render_report("executive")
 
 st.divider()
 
@@ -110,14 +58,8 @@ st.divider()
 st.subheader("🔍 Topic Insights & Analysis")
 st.write("Detailed breakdown of recurring themes in customer reviews.")
 
-topic_insights = load_report("topic_insights.txt")
-
-with st.container():
-    st.markdown(f"""
-    <div style="background-color: #e8f4f8; padding: 20px; border-radius: 10px; border-left: 5px solid #2ca02c; color: #000000;">
-        <pre style="white-space: pre-wrap; font-family: inherit; color: #000000; margin: 0;">{topic_insights}</pre>
-    </div>
-    """, unsafe_allow_html=True)
+# Sections are read (and cached) only for the page being shown
+render_report("topics")
 
 st.divider()
 
@@ -125,14 +67,9 @@ st.divider()
 st.subheader("💡 Actionable Business Recommendations")
 st.write("AI-generated suggestions for operational improvements and strategic decisions.")
 
-recommendations = load_report("recommendations.txt")
-
-with st.container():
-    st.markdown(f"""
-    <div style="background-color: #fff4e6; padding: 20px; border-radius: 10px; border-left: 5px solid #ff7f0e; color: #000000;">
-        <pre style="white-space: pre-wrap; font-family: inherit; color: #000000; margin: 0;">{recommendations}</pre>
-    </div>
-    """, unsafe_allow_html=True)
+# Sections are read (and cached) only for the page being shown
+render_report("recommendations")
+perf.lap("reports")
 
 st.divider()
 
@@ -143,9 +80,8 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### ✅ Strengths")
-    positive = df[df["sentiment_label"] == "Positive"]
-    if 'topic' in df.columns and len(positive) > 0:
-        top_positive_topics = positive["topic"].value_counts().head(3)
+    if metrics["positive"] > 0:
+        top_positive_topics = topic_counts(cube, "Positive").head(3)
         for idx, (topic, count) in enumerate(top_positive_topics.items(), 1):
             st.write(f"{idx}. **Topic {topic}** - {count} positive mentions")
     else:
@@ -153,9 +89,8 @@ with col1:
 
 with col2:
     st.markdown("### ⚠️ Areas for Improvement")
-    negative = df[df["sentiment_label"] == "Negative"]
-    if 'topic' in df.columns and len(negative) > 0:
-        top_negative_topics = negative["topic"].value_counts().head(3)
+    if metrics["negative"] > 0:
+        top_negative_topics = topic_counts(cube, "Negative").head(3)
         for idx, (topic, count) in enumerate(top_negative_topics.items(), 1):
             st.write(f"{idx}. **Topic {topic}** - {count} negative mentions")
     else:
@@ -167,17 +102,17 @@ st.divider()
 st.subheader("📈 Sentiment Trend Over Time")
 
 if 'review_date' in df.columns and 'sentiment_score' in df.columns:
-    import plotly.express as px
-    
-    # Group by date and calculate average sentiment
-    df_sorted = df.sort_values('review_date')
+    # Weekly average sentiment, binned server-side (one point per week)
+    perf.lap("render")
+    weekly = weekly_trend(data_version())
+    perf.lap("aggregate")
     
     fig = px.line(
-        df_sorted,
+        weekly,
         x='review_date',
-        y='sentiment_score',
-        title='Customer Sentiment Trend',
-        labels={'review_date': 'Date', 'sentiment_score': 'Sentiment Score'}
+        y='rolling_mean',
+        title='Customer Sentiment Trend (weekly, 4-week rolling mean)',
+        labels={'review_date': 'Date', 'rolling_mean': 'Sentiment Score'}
     )
     
     fig.add_hline(
@@ -186,8 +121,10 @@ if 'review_date' in df.columns and 'sentiment_score' in df.columns:
         line_color="gray",
         annotation_text="Neutral"
     )
+    perf.lap("figure")
     
     st.plotly_chart(fig, use_container_width=True)
+    perf.lap("render")
 else:
     st.info("Sentiment trend data not available.")
 
@@ -196,71 +133,88 @@ st.divider()
 # ------- Competitor Comparison (Project Requirement) -------
 st.subheader("🏆 Competitive Benchmarking")
 
-st.info("""
-**Note on Competitor Analysis:**
-
-The project specifications require competitor comparison analysis. This feature requires collecting 
-review data from multiple competing businesses in the same area.
-
-**Implementation Approach:**
-1. **Data Collection:** Fetch reviews from 3-5 competitor businesses using Google Maps API
-2. **Comparative Metrics:** Compare average ratings, sentiment scores, and review volumes
-3. **Gap Analysis:** Identify areas where competitors outperform or underperform
-4. **Strategic Insights:** Generate recommendations based on competitive positioning
-
-**Current Scope:**
-This implementation focuses on **deep-dive single-business analysis**, providing detailed insights 
-for immediate operational improvements. The infrastructure is designed to easily scale to multi-business 
-comparison when competitor data becomes available.
-
-**Future Enhancement:**
-Adding competitor data would enable features like:
-- Side-by-side sentiment comparison charts
-- Competitive strength/weakness matrix
-- Market positioning analysis
-- Benchmarking against industry standards
-""")
+st.write("Compare each business against a peer set, computed from the aggregate cube in one grouped pass.")
 
-# Mock example to demonstrate understanding
-with st.expander("📊 View Example: How Competitor Comparison Would Look"):
-    st.write("**Example Competitive Analysis Dashboard:**")
-    
-    # Create mock competitor data
-    competitor_data = {
-        'Business': ['Your Business', 'Competitor A', 'Competitor B', 'Competitor C'],
-        'Avg Rating': [4.2, 3.8, 4.5, 4.0],
-        'Avg Sentiment': [0.65, 0.45, 0.75, 0.58],
-        'Total Reviews': [250, 180, 320, 200],
-        'Positive %': [75, 60, 82, 68]
-    }
-    
-    import plotly.express as px
-    comp_df = pd.DataFrame(competitor_data)
+benchmark = source_metrics(cube)
+mix = topic_mix(cube)
+all_sources = benchmark.index.tolist()
+perf.lap("aggregate")
+
+if len(all_sources) < 2:
+    st.info("Competitive benchmarking needs reviews from at least two businesses (sources).")
+else:
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        business = st.selectbox("Your business", all_sources)
+    with col2:
+        others = [s for s in all_sources if s != business]
+        peers = st.multiselect("Peer set", others, default=others)
     
-    # Sentiment comparison chart
-    fig_comp = px.bar(
-        comp_df,
-        x='Business',
-        y='Avg Sentiment',
-        title='Competitive Sentiment Comparison (Example)',
-        color='Avg Sentiment',
-        color_continuous_scale='RdYlGn',
-        text='Avg Sentiment'
-    )
-    fig_comp.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    st.plotly_chart(fig_comp, use_container_width=True)
+    if not peers:
+        st.warning("Select at least one peer to compare against.")
+    else:
+        gaps = peer_gaps(benchmark, business, peers)
+        mine = benchmark.loc[business]
+        
+        # Headline gaps vs the peer average
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Avg Rating", f"{mine['avg_rating']:.2f} ⭐", f"{gaps['avg_rating']:+.2f} vs peers")
+        with col2:
+            st.metric("Avg Sentiment", f"{mine['avg_sentiment']:.2f}", f"{gaps['avg_sentiment']:+.2f} vs peers")
+        with col3:
+            st.metric("Positive Reviews", f"{mine['positive_pct']:.1f}%", f"{gaps['positive_pct']:+.1f} pts vs peers")
+        with col4:
+            st.metric("Review Volume", f"{int(mine['reviews']):,}", f"{gaps['reviews']:+,.0f} vs peers")
+        
+        # Sentiment comparison chart (capped so it stays readable with hundreds of peers)
+        compared = benchmark.loc[[business] + peers].sort_values("avg_sentiment", ascending=False)
+        shown = compared.head(40)
+        if business not in shown.index:
+            shown = pd.concat([shown, compared.loc[[business]]])
+        shown = shown.reset_index().assign(role=lambda d: d["source"].map(lambda s: "You" if s == business else "Peer"))
+        
+        fig_comp = px.bar(
+            shown,
+            x='source',
+            y='avg_sentiment',
+            title='Competitive Sentiment Comparison',
+            color='role',
+            color_discrete_map={'You': '#1f77b4', 'Peer': '#c7c7c7'},
+            text='avg_sentiment',
+            labels={'source': 'Business', 'avg_sentiment': 'Avg Sentiment'}
+        )
+        fig_comp.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+        st.plotly_chart(fig_comp, use_container_width=True)
+        if len(compared) > len(shown):
+            st.caption(f"Showing the top 40 of {len(compared)} businesses by sentiment.")
+        
+        # Topic mix gap: where this business gets more / fewer reviews than its peers
+        mix_gap = peer_gaps(mix, business, peers).mul(100)
+        top_gaps = mix_gap.reindex(mix_gap.abs().sort_values(ascending=False).index).head(10)
+        fig_mix = px.bar(
+            x=[f"Topic {t}" for t in top_gaps.index],
+            y=top_gaps.values,
+            title='Topic Mix Gap vs Peers (percentage points of reviews)',
+            labels={'x': 'Topic', 'y': 'Gap (pts)'},
+            color=top_gaps.values,
+            color_continuous_scale='RdBu'
+        )
+        st.plotly_chart(fig_mix, use_container_width=True)
+        
+        rank = int(compared["avg_sentiment"].rank(ascending=False, method="min")[business])
+        leader = compared.index[0]
+        st.markdown(f"""
+        - 🥇 **Sentiment Leader:** {leader} ({compared.loc[leader, 'avg_sentiment']:.2f} sentiment, {compared.loc[leader, 'positive_pct']:.0f}% positive)
+        - 🎯 **Your Position:** Ranked {rank} of {len(compared)} on average sentiment
+        - 📊 **Gap to Leader:** {compared.loc[leader, 'avg_sentiment'] - mine['avg_sentiment']:.2f} sentiment
+        """)
     
-    st.write("**Sample Competitive Insights:**")
-    st.markdown("""
-    - 🥇 **Market Leader:** Competitor B leads with 82% positive reviews and highest sentiment (0.75)
-    - 🎯 **Your Position:** Ranked 2nd with strong performance (0.65 sentiment, 75% positive)
-    - 📊 **Gap Analysis:** 10% sentiment gap with market leader
-    - 💡 **Strategic Recommendation:** 
-        - Your food quality scores are competitive, but service speed needs improvement
-        - Focus on staff training and peak-hour management to close the gap
-        - Competitor B's advantage comes from faster service and ambiance
-    - 🚀 **Opportunity:** With focused improvements in service, you can match or exceed the market leader
-    """)
+    with st.expander("📊 View All Business Metrics"):
+        st.dataframe(
+            benchmark.sort_values("avg_sentiment", ascending=False).round(2),
+            use_container_width=True
+        )
 
 st.divider()
 
@@ -269,41 +223,20 @@ st.subheader("📥 Download Reports")
 
 col1, col2, col3 = st.columns(3)
 
-with col1:
-    try:
-        with open("../reports/executive_summary.txt", 'r', encoding='utf-8') as f:
-            st.download_button(
-                label="📄 Executive Summary",
-                data=f.read(),
-                file_name="executive_summary.txt",
-                mime="text/plain"
-            )
-    except:
-        st.button("📄 Executive Summary", disabled=True)
-
-with col2:
-    try:
-        with open("../reports/topic_insights.txt", 'r', encoding='utf-8') as f:
-            st.download_button(
-                label="🔍 Topic Insights",
-                data=f.read(),
-                file_name="topic_insights.txt",
-                mime="text/plain"
-            )
-    except:
-        st.button("🔍 Topic Insights", disabled=True)
-
-with col3:
-    try:
-        with open("../reports/recommendations.txt", 'r', encoding='utf-8') as f:
-            st.download_button(
-                label="💡 Recommendations",
-                data=f.read(),
-                file_name="recommendations.txt",
-                mime="text/plain"
-            )
-    except:
-        st.button("💡 Recommendations", disabled=True)
+# Downloads are served from the cached report bytes (no re-read per rerun)
+downloads = [
+    (col1, "executive", "📄 Executive Summary", "executive_summary.txt"),
+    (col2, "topics", "🔍 Topic Insights", "topic_insights.txt"),
+    (col3, "recommendations", "💡 Recommendations", "recommendations.txt"),
+]
+
+for col, kind, label, file_name in downloads:
+    with col:
+        data = merged_report(kind)
+        if data is None:
+            st.button(label, disabled=True)
+        else:
+            st.download_button(label=label, data=data, file_name=file_name, mime="text/plain")
 
 # ------- Footer -------
 st.divider()
@@ -319,7 +252,9 @@ This AI-powered dashboard demonstrates:
 - ✅ **LLM Summarization:** Groq API-powered insights generation
 - ✅ **Trend Analysis:** Time-series visualization of customer sentiment
 - ✅ **Actionable Recommendations:** Data-driven operational improvement suggestions
-- ✅ **Competitive Framework:** Scalable architecture for multi-business comparison
+- ✅ **Competitive Benchmarking:** Per-business metrics and gap analysis against a peer set
 
 **Technology Stack:** Python, Streamlit, Pandas, Plotly, BERTopic, Groq API, Langflow
-""")
\ No newline at end of file
+""")
+
+perf.finish_page()
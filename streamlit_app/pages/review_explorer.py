@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+import perf
+from data_access import data_version, load_reviews, load_text, with_text
+from review_index import ReviewIndex, search_page
+
+perf.start_page("Review Explorer")
+
+st.title("🔎 Review Explorer")
+st.write("Filter, search and page through every review behind the dashboard.")
+
+df = load_reviews(["review_date", "rating", "source", "sentiment_label", "topic", "sentiment_score"])
+
+@perf.cached(st.cache_resource(max_entries=1, show_spinner="Indexing reviews..."))
+def get_index(version):
+    return ReviewIndex(df)
+
+@perf.cached(st.cache_resource(max_entries=1))
+def get_texts(version):
+    # Plain object array, so each search block is a cheap fancy-index
+    return load_text().to_numpy(dtype=object)
+
+index = get_index(data_version())
+perf.lap("load")
+
+# ------- Filters -------
+with st.expander("🎛️ Filters", expanded=True):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sources = st.multiselect("Source", index.values("source"))
+    with col2:
+        topics = st.multiselect("Topic", index.values("topic"))
+    with col3:
+        sentiments = st.multiselect("Sentiment", index.values("sentiment_label"))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        ratings = index.values("rating")
+        full_range = rating_range = (float(ratings[0]), float(ratings[-1])) if ratings else None
+        if ratings and full_range[0] < full_range[1]:
+            rating_range = st.slider("Rating", *full_range, full_range, step=1.0)
+    with col2:
+        first_day = pd.Timestamp(index.sorted_dates[0]).date()
+        last_day = pd.Timestamp(index.sorted_dates[-1]).date()
+        date_range = st.date_input("Date range", (first_day, last_day),
+                                   min_value=first_day, max_value=last_day)
+    with col3:
+        keyword = st.text_input("Keyword search").strip()
+
+# ------- Query the index -------
+filters = {
+    "source": sources,
+    "topic": topics,
+    "sentiment_label": sentiments,
+}
+# Only a narrowed range filters, so reviews without a rating show up by default
+if rating_range != full_range:
+    filters["rating"] = [r for r in ratings if rating_range[0] <= r <= rating_range[1]]
+start = end = None
+if len(date_range) == 2:
+    start = pd.Timestamp(date_range[0])
+    end = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)
+
+perf.lap("render")
+ranks = index.query(filters, start, end)
+perf.lap("query")
+
+# ------- Pagination -------
+col1, col2 = st.columns([1, 3])
+with col1:
+    page_size = st.selectbox("Rows per page", [10, 25, 50, 100], index=1)
+with col2:
+    page = st.number_input("Page", min_value=1, value=1, step=1) - 1
+
+perf.lap("render")
+page_ranks, found, exhaustive = search_page(index, ranks, get_texts(data_version()), keyword, page, page_size)
+perf.lap("query")
+
+if found == 0:
+    st.info("No reviews match these filters.")
+elif len(page_ranks) == 0:
+    st.warning("This page is past the last matching review.")
+else:
+    total = f"{found:,}" if exhaustive else f"{found:,}+"
+    first = page * page_size + 1
+    st.caption(f"Showing {first:,}–{first + len(page_ranks) - 1:,} of {total} matching reviews (newest first)")
+
+    # Only the visible page is materialized, with its text attached
+    rows = with_text(df.iloc[index.positions(page_ranks)], ["reviewer_name", "review_text"])
+    st.dataframe(
+        rows[["review_date", "source", "topic", "rating", "sentiment_label", "sentiment_score",
+              "reviewer_name", "review_text"]],
+        use_container_width=True,
+        hide_index=True
+    )
+
+perf.finish_page()
@@ -1,89 +1,93 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from datetime import datetime, timedelta
-import re
+import perf
+from charts import px, go
+from data_access import data_version, load_reviews
+from trends import FREQUENCIES, MAX_POINTS, downsample, resample_sentiment
+
+perf.start_page("Sentiment Trends")
 
 st.title("📈 Sentiment Trend Analysis")
 
-def convert_relative_date(text):
-    """
-    Convert relative date strings like '4 weeks ago', '2 months ago' 
-    to actual datetime objects
-    """
-    try:
-        text = str(text).lower().strip()
-        
-        # Handle "a week ago", "a month ago" (no number)
-        if text.startswith("a "):
-            text = "1 " + text[2:]
-        
-        # Extract number from the string
-        match = re.search(r"(\d+)", text)
-        if not match:
-            # If no number found, return today
-            return datetime.today()
-        
-        num = int(match.group(1))
-        
-        # Check what time unit is mentioned
-        if "year" in text:
-            return datetime.today() - timedelta(days=num * 365)
-        elif "month" in text:
-            return datetime.today() - timedelta(days=num * 30)
-        elif "week" in text:
-            return datetime.today() - timedelta(weeks=num)
-        elif "day" in text:
-            return datetime.today() - timedelta(days=num)
-        elif "hour" in text:
-            return datetime.today() - timedelta(hours=num)
-        else:
-            # Default to today if format not recognized
-            return datetime.today()
-            
-    except Exception as e:
-        print(f"Error parsing date '{text}': {e}")
-        return datetime.today()
-
-@st.cache_data
-def load_data():
-    """Load the CSV file with reviews"""
-    df = pd.read_csv("../data/final_topic_labeled_dataset.csv")
-    return df
-
-# Load the data
-df = load_data()
-
-# Convert all relative dates to actual datetime objects
-# DO NOT USE pd.to_datetime() - it cannot parse "4 weeks ago"
-df["review_date"] = df["review_date"].apply(convert_relative_date)
-
-# Sort by date for better visualization
-df = df.sort_values("review_date")
-
-# Create the line chart
-fig = px.line(
-    df,
-    x="review_date",
-    y="sentiment_score",
-    title="Sentiment Score Over Time",
-    markers=True,
-    labels={
-        "review_date": "Review Date",
-        "sentiment_score": "Sentiment Score"
-    }
-)
+# Load the shared dataset
+df = load_reviews(["review_date", "source", "sentiment_score"])
+perf.lap("load")
+
+# Trends are binned / downsampled server-side and cached, so the browser
+# only receives one point per bin instead of one per review
+@perf.cached(st.cache_data(show_spinner=False))
+def trend_series(freq, window, version):
+    return resample_sentiment(df, freq=freq, window=window)
+
+@perf.cached(st.cache_data(show_spinner=False))
+def raw_series(max_points, version):
+    return downsample(df, max_points=max_points)
+
+# ------- Chart Controls -------
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    granularity = st.selectbox("Granularity", list(FREQUENCIES) + ["Raw reviews"], index=1)
+
+with col2:
+    window = st.slider("Rolling window (bins)", 1, 12, 4, disabled=granularity == "Raw reviews")
+
+with col3:
+    max_points = st.number_input("Max points (raw view)", 100, 50000, MAX_POINTS, step=100,
+                                 disabled=granularity != "Raw reviews")
+
+perf.lap("render")
+colors = px.colors.qualitative.Plotly
+
+if granularity == "Raw reviews":
+    # Largest-Triangle-Three-Buckets keeps the shape with at most `max_points` points
+    raw = raw_series(int(max_points), data_version())
+    perf.lap("aggregate")
+    fig = px.line(
+        raw,
+        x="review_date",
+        y="sentiment_score",
+        color="source",
+        title="Sentiment Score Over Time",
+        markers=True,
+        labels={
+            "review_date": "Review Date",
+            "sentiment_score": "Sentiment Score"
+        }
+    )
+    st.caption(f"Showing {len(raw):,} of {len(df):,} reviews (LTTB downsampled)")
+else:
+    trend = trend_series(FREQUENCIES[granularity], window, data_version())
+    perf.lap("aggregate")
+    fig = go.Figure()
+    for i, (source, series) in enumerate(trend.groupby("source", observed=True)):
+        color = colors[i % len(colors)]
+        # 95% confidence band around the rolling mean
+        fig.add_trace(go.Scatter(
+            x=pd.concat([series["review_date"], series["review_date"][::-1]]),
+            y=pd.concat([series["upper"], series["lower"][::-1]]),
+            fill="toself", fillcolor=color, opacity=0.15, line=dict(width=0),
+            hoverinfo="skip", showlegend=False, legendgroup=source
+        ))
+        fig.add_trace(go.Scatter(
+            x=series["review_date"], y=series["rolling_mean"], mode="lines+markers",
+            name=source, line=dict(color=color), legendgroup=source,
+            customdata=series[["count"]], hovertemplate="%{y:.2f} (%{customdata[0]} reviews)"
+        ))
+    fig.update_layout(title=f"{granularity} Sentiment Score ({window}-bin rolling mean, 95% CI)")
 
 # Customize the layout
 fig.update_layout(
     xaxis_title="Date",
     yaxis_title="Sentiment Score",
     hovermode="x unified",
-    showlegend=False
+    showlegend=True
 )
+perf.lap("figure")
 
 # Display the chart
 st.plotly_chart(fig, use_container_width=True)
+perf.lap("render")
 
 # Show summary statistics
 st.subheader("📊 Summary Statistics")
@@ -101,6 +105,8 @@ with col3:
 with col4:
     st.metric("Lowest Sentiment", f"{df['sentiment_score'].min():.2f}")
 
+perf.lap("render")
+
 # Optional: Show sentiment distribution
 st.subheader("📉 Sentiment Distribution")
 fig2 = px.histogram(
@@ -110,6 +116,7 @@ fig2 = px.histogram(
     title="Distribution of Sentiment Scores",
     labels={"sentiment_score": "Sentiment Score", "count": "Number of Reviews"}
 )
+perf.lap("figure")
 st.plotly_chart(fig2, use_container_width=True)
 
 # Optional: Show raw data
@@ -117,4 +124,6 @@ with st.expander("📋 View Raw Data"):
     st.dataframe(
         df[["review_date", "sentiment_score"]].head(50),
         use_container_width=True
-    )
\ No newline at end of file
+    )
+
+perf.finish_page()
@@ -1,60 +1,29 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from datetime import datetime, timedelta
-import re
+import perf
+from charts import px
+from data_access import load_cube, load_keyword_index, load_reviews, load_topic_keywords, text_columns, with_text
+from keyword_index import level_name
+from aggregates import overall_metrics, topic_counts as cube_topic_counts, topic_sentiment_counts
+
+perf.start_page("Topic Analysis")
 
 st.title("🧠 Topic Analysis")
 st.write("Explore the top recurring themes extracted using BERTopic.")
 
-def convert_relative_date(text):
-    """Convert relative date strings to datetime objects"""
-    try:
-        text = str(text).lower().strip()
-        
-        if text.startswith("a "):
-            text = "1 " + text[2:]
-        
-        match = re.search(r"(\d+)", text)
-        if not match:
-            return datetime.today()
-        
-        num = int(match.group(1))
-        
-        if "year" in text:
-            return datetime.today() - timedelta(days=num * 365)
-        elif "month" in text:
-            return datetime.today() - timedelta(days=num * 30)
-        elif "week" in text:
-            return datetime.today() - timedelta(weeks=num)
-        elif "day" in text:
-            return datetime.today() - timedelta(days=num)
-        elif "hour" in text:
-            return datetime.today() - timedelta(hours=num)
-        else:
-            return datetime.today()
-            
-    except Exception as e:
-        print(f"Error parsing date '{text}': {e}")
-        return datetime.today()
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv("../data/final_topic_labeled_dataset.csv")
-    
-    # Convert dates if review_date column exists
-    if 'review_date' in df.columns:
-        df['review_date'] = df['review_date'].apply(convert_relative_date)
-    
-    return df
+df = load_reviews(["topic", "source", "sentiment_label"])
 
-df = load_data()
+# Counts and percentages come from the precomputed aggregate cube
+cube = load_cube()
+metrics = overall_metrics(cube)
+perf.lap("load")
 
 # ------- Topic Distribution -------
 st.subheader("📊 Topic Distribution")
 
-topic_counts = df["topic"].value_counts().reset_index()
+topic_counts = cube_topic_counts(cube).reset_index()
 topic_counts.columns = ["Topic", "Count"]
+perf.lap("aggregate")
 
 fig = px.bar(
     topic_counts.head(10),
@@ -67,15 +36,17 @@ fig = px.bar(
 )
 fig.update_traces(textposition='outside')
 fig.update_layout(xaxis_tickangle=-45)
+perf.lap("figure")
 st.plotly_chart(fig, use_container_width=True)
+perf.lap("render")
 
 # ------- Sentiment Overview -------
 st.subheader("🎭 Sentiment Distribution")
 col1, col2, col3 = st.columns(3)
 
-total_reviews = len(df)
-positive_count = len(df[df["sentiment_label"] == "Positive"])
-negative_count = len(df[df["sentiment_label"] == "Negative"])
+total_reviews = metrics["total"]
+positive_count = metrics["positive"]
+negative_count = metrics["negative"]
 neutral_count = total_reviews - positive_count - negative_count
 
 with col1:
@@ -90,10 +61,8 @@ with col3:
 # ------- Top Positive Topics -------
 st.subheader("💚 Top 5 Positive Topics")
 
-positive = df[df["sentiment_label"] == "Positive"]
-
-if len(positive) > 0:
-    positive_topics = positive["topic"].value_counts().head(5).reset_index()
+if positive_count > 0:
+    positive_topics = cube_topic_counts(cube, "Positive").head(5).reset_index()
     positive_topics.columns = ["Topic", "Count"]
     
     fig_pos = px.bar(
@@ -118,10 +87,8 @@ else:
 # ------- Top Negative Topics -------
 st.subheader("❤️‍🩹 Top 5 Negative Topics")
 
-negative = df[df["sentiment_label"] == "Negative"]
-
-if len(negative) > 0:
-    negative_topics = negative["topic"].value_counts().head(5).reset_index()
+if negative_count > 0:
+    negative_topics = cube_topic_counts(cube, "Negative").head(5).reset_index()
     negative_topics.columns = ["Topic", "Count"]
     
     fig_neg = px.bar(
@@ -146,12 +113,12 @@ else:
 # ------- Topic-Sentiment Heatmap -------
 st.subheader("🔥 Topic-Sentiment Distribution")
 
-sentiment_topic = df.groupby(["topic", "sentiment_label"]).size().reset_index(name='Count')
-sentiment_topic_pivot = sentiment_topic.pivot(index="topic", columns="sentiment_label", values='Count').fillna(0)
+sentiment_topic_pivot = topic_sentiment_counts(cube)
 
 # Get top 15 topics by total count
-top_topics = df["topic"].value_counts().head(15).index
+top_topics = topic_counts["Topic"].head(15)
 sentiment_topic_pivot_top = sentiment_topic_pivot.loc[sentiment_topic_pivot.index.isin(top_topics)]
+perf.lap("aggregate")
 
 fig_heatmap = px.imshow(
     sentiment_topic_pivot_top,
@@ -161,22 +128,20 @@ fig_heatmap = px.imshow(
     aspect="auto",
     text_auto=True
 )
+perf.lap("figure")
 st.plotly_chart(fig_heatmap, use_container_width=True)
+perf.lap("render")
 
 # ------- Sample Reviews by Topic -------
 st.subheader("📝 Sample Reviews by Topic")
 
-# Find the review text column
-text_col = None
-for col in ['review_text', 'text', 'review', 'Review', 'Review_Text']:
-    if col in df.columns:
-        text_col = col
-        break
+# Review text is not part of the shared core frame; it is loaded on demand below
+text_col = next((col for col in ["review_text", "cleaned_text"] if col in text_columns()), None)
 
 if text_col:
     # Create a better display for topic selection
-    topic_counts_map = df["topic"].value_counts().to_dict()
-    topic_options = sorted(df["topic"].unique())
+    topic_counts_map = topic_counts.set_index("Topic")["Count"].to_dict()
+    topic_options = sorted(topic_counts_map)
     
     # Format the display as "Topic X (Y reviews)"
     topic_display = [f"Topic {topic} ({topic_counts_map[topic]} reviews)" for topic in topic_options]
@@ -188,33 +153,50 @@ if text_col:
     topic_df = df[df["topic"] == selected_topic]
     
     # Show statistics for this topic
+    topic_total = topic_counts_map[selected_topic]
+    topic_labels = sentiment_topic_pivot.loc[selected_topic]
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Reviews", len(topic_df))
+        st.metric("Total Reviews", topic_total)
     with col2:
-        pos_pct = len(topic_df[topic_df["sentiment_label"] == "Positive"]) / len(topic_df) * 100
+        pos_pct = topic_labels.get("Positive", 0) / topic_total * 100
         st.metric("Positive %", f"{pos_pct:.1f}%")
     with col3:
-        neg_pct = len(topic_df[topic_df["sentiment_label"] == "Negative"]) / len(topic_df) * 100
+        neg_pct = topic_labels.get("Negative", 0) / topic_total * 100
         st.metric("Negative %", f"{neg_pct:.1f}%")
     
-    # Try to show common keywords for this topic
+    # Keywords are looked up in the precomputed keyword index
     st.write(f"**Topic {selected_topic} - Most Common Words:**")
-    # Get all reviews for this topic and find most common words
-    all_text = " ".join(topic_df[text_col].astype(str).tolist()).lower()
-    words = all_text.split()
-    # Remove common stop words
-    stop_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'is', 'was', 'are', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her', 'its', 'our', 'their']
-    filtered_words = [w for w in words if w not in stop_words and len(w) > 3]
-    from collections import Counter
-    word_counts = Counter(filtered_words).most_common(10)
-    
+    kw_col1, kw_col2 = st.columns(2)
+    with kw_col1:
+        kw_source = st.selectbox("Source", ["All"] + sorted(df["source"].cat.categories), key="kw_source")
+    with kw_col2:
+        kw_sentiment = st.selectbox("Sentiment", ["All"] + sorted(df["sentiment_label"].cat.categories), key="kw_sentiment")
+
+    filters = {"topic": selected_topic, "source": kw_source, "sentiment_label": kw_sentiment}
+    keys = [k for k, v in filters.items() if v != "All"]
+    index = load_keyword_index()
+    terms = index[index["level"] == level_name(keys)]
+    for key in keys:
+        terms = terms[terms[key] == filters[key]]
+    word_counts = terms.nsmallest(10, "rank")[["term", "count"]].itertuples(index=False)
+    perf.lap("aggregate")
+
     keywords = ", ".join([f"**{word}** ({count})" for word, count in word_counts])
-    st.info(f"🔑 {keywords}")
+    st.info(f"🔑 {keywords}" if keywords else "No keywords for this selection.")
+
+    # BERTopic's own c-TF-IDF terms, when the topic model has been run
+    topic_keywords = load_topic_keywords()
+    if topic_keywords is not None:
+        ctfidf = topic_keywords[topic_keywords["topic"] == selected_topic].nsmallest(10, "rank")
+        st.caption("c-TF-IDF terms: " + ", ".join(f"{t} ({w:.3f})" for t, w in zip(ctfidf["term"], ctfidf["weight"])))
     
     # Show sample reviews
     st.write("**Sample Reviews:**")
-    sample_reviews = topic_df.head(5)
+    st.caption("Use the Review Explorer page to page through every review in this topic.")
+    perf.lap("render")
+    sample_reviews = with_text(topic_df.head(5), [text_col])
+    perf.lap("load")
     
     for i, (idx, row) in enumerate(sample_reviews.iterrows(), 1):
         sentiment = row["sentiment_label"]
@@ -229,11 +211,11 @@ else:
 
 # ------- Dataset Statistics -------
 with st.expander("📊 View Full Dataset Statistics"):
-    st.write(f"**Total Reviews:** {len(df)}")
-    st.write(f"**Total Unique Topics:** {df['topic'].nunique()}")
-    st.write(f"**Date Range:** {df['review_date'].min().strftime('%Y-%m-%d')} to {df['review_date'].max().strftime('%Y-%m-%d')}" if 'review_date' in df.columns else "Date information not available")
+    st.write(f"**Total Reviews:** {metrics['total']}")
+    st.write(f"**Total Unique Topics:** {len(topic_counts)}")
+    st.write(f"**Date Range:** {metrics['first_review'].strftime('%Y-%m-%d')} to {metrics['last_review'].strftime('%Y-%m-%d')}")
     
     st.write("\n**All Topics Distribution:**")
-    all_topics = df["topic"].value_counts().reset_index()
-    all_topics.columns = ["Topic", "Count"]
-    st.dataframe(all_topics, use_container_width=True, height=400)
\ No newline at end of file
+    st.dataframe(topic_counts, use_container_width=True, height=400)
+
+perf.finish_page()
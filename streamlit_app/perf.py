@@ -0,0 +1,207 @@
+"""
+Opt-in render timing and cache instrumentation for the dashboard.
+
+Enable it with DASHBOARD_PERF=1 or by opening any page with `?perf=1`.
+Pages call `start_page()` first, mark the end of each section with
+`lap("load")`, `lap("aggregate")`, `lap("render")`, ... (the time since the
+previous mark is added to that section) and call `finish_page()` last.
+Cached functions wrapped with `cached()` count calls and misses, a miss being
+a call whose body actually ran. `finish_page()` shows the run in a sidebar
+panel and appends it as one JSON line to the metrics log.
+
+When disabled every hook returns immediately.
+
+    python perf.py [--log PATH] [--budget-ms 1500]   # summarize the log
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+LOG_PATH = os.environ.get("DASHBOARD_PERF_LOG", "../logs/dashboard_metrics.jsonl")
+
+# Runs kept per session for the sidebar's session totals
+HISTORY = 20
+
+
+def enabled():
+    if os.environ.get("DASHBOARD_PERF") == "1":
+        return True
+    return st.query_params.get("perf") == "1"
+
+
+def _current_run():
+    # Cached bodies can also run outside a page (e.g. serve.py's warm-up)
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    return st.session_state.get("_perf_run")
+
+
+def start_page(page):
+    """Begin timing a page run (no-op unless instrumentation is enabled)."""
+    if not enabled():
+        st.session_state.pop("_perf_run", None)
+        return
+    now = time.perf_counter()
+    st.session_state["_perf_run"] = {
+        "page": page,
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sections": {},
+        "cache": {},
+        "_start": now,
+        "_last": now,
+    }
+
+
+def lap(section):
+    """Add the time since the previous mark to `section` (in ms)."""
+    run = _current_run()
+    if run is None:
+        return
+    now = time.perf_counter()
+    run["sections"][section] = run["sections"].get(section, 0.0) + (now - run["_last"]) * 1000
+    run["_last"] = now
+
+
+def _count(name, field):
+    run = _current_run()
+    if run is not None:
+        stats = run["cache"].setdefault(name, {"calls": 0, "misses": 0})
+        stats[field] += 1
+
+
+def cached(cache_decorator):
+    """
+    Apply a Streamlit cache decorator and count its calls and misses:
+
+        @perf.cached(st.cache_resource(max_entries=1))
+        def _load_cube(path, mtime): ...
+    """
+    def wrap(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _count(func.__name__, "misses")
+            return func(*args, **kwargs)
+
+        cached_func = cache_decorator(compute)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            _count(func.__name__, "calls")
+            return cached_func(*args, **kwargs)
+
+        call.clear = cached_func.clear
+        return call
+    return wrap
+
+
+def _memory_mb():
+    """(current RSS, peak RSS) of the server process in MB; None if unknown."""
+    try:
+        import psutil
+        rss = psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        rss = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB on Linux, bytes on macOS
+        peak = peak / 1e6 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        peak = None
+    return rss, peak
+
+
+def _write_log(record):
+    folder = os.path.dirname(LOG_PATH)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def finish_page():
+    """Record the run, show the debug panel and append it to the metrics log."""
+    run = _current_run()
+    if run is None:
+        return
+    lap("render")
+    rss, peak = _memory_mb()
+    record = {key: value for key, value in run.items() if not key.startswith("_")}
+    record["sections"] = {name: round(ms, 1) for name, ms in record["sections"].items()}
+    record["total_ms"] = round((time.perf_counter() - run["_start"]) * 1000, 1)
+    record["rss_mb"] = None if rss is None else round(rss, 1)
+    record["peak_rss_mb"] = None if peak is None else round(peak, 1)
+
+    history = st.session_state.setdefault("_perf_history", [])
+    history.append(record)
+    del history[:-HISTORY]
+
+    _render_panel(record, history)
+    _write_log(record)
+    del st.session_state["_perf_run"]
+
+
+def _render_panel(record, history):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.metric("Page render", f"{record['total_ms']:.0f} ms")
+
+        sections = pd.Series(record["sections"], name="ms").rename_axis("section").reset_index()
+        sections["share"] = (sections["ms"] / record["total_ms"]).map("{:.0%}".format)
+        st.dataframe(sections, hide_index=True, use_container_width=True)
+
+        if record["cache"]:
+            cache = pd.DataFrame.from_dict(record["cache"], orient="index").rename_axis("function")
+            cache["hits"] = cache["calls"] - cache["misses"]
+            st.dataframe(cache[["calls", "hits", "misses"]], use_container_width=True)
+
+        if record["rss_mb"] is not None:
+            st.caption(f"Memory: {record['rss_mb']:.0f} MB RSS (peak {record['peak_rss_mb']:.0f} MB)")
+        elif record["peak_rss_mb"] is not None:
+            st.caption(f"Memory: peak {record['peak_rss_mb']:.0f} MB RSS")
+
+        calls = sum(c["calls"] for r in history for c in r["cache"].values())
+        misses = sum(c["misses"] for r in history for c in r["cache"].values())
+        totals = pd.Series([r["total_ms"] for r in history])
+        hit_rate = f", cache hit rate {1 - misses / calls:.0%}" if calls else ""
+        st.caption(f"Session: {len(history)} runs, median {totals.median():.0f} ms{hit_rate}")
+
+
+def summarize(path):
+    """Per-page render time percentiles and median section times from the log."""
+    runs = pd.read_json(path, lines=True)
+    totals = runs.groupby("page")["total_ms"].describe(percentiles=[0.5, 0.95])
+    totals = totals[["count", "50%", "95%", "max"]].rename(columns={"50%": "p50_ms", "95%": "p95_ms", "max": "max_ms"})
+    sections = pd.json_normalize(runs["sections"]).assign(page=runs["page"]).groupby("page").median()
+    return totals, sections
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the dashboard metrics log")
+    parser.add_argument("--log", default=LOG_PATH, help="metrics log to read")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="exit with status 1 if any page's p95 render time exceeds this")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.log):
+        raise SystemExit(f"❌ No metrics log at {args.log} (run the app with DASHBOARD_PERF=1)")
+
+    totals, sections = summarize(args.log)
+    print("📊 Render time per page (ms)")
+    print(totals.round(1).to_string())
+    print("\n⏱️ Median section time per page (ms)")
+    print(sections.round(1).to_string())
+
+    if args.budget_ms is not None:
+        over = totals[totals["p95_ms"] > args.budget_ms]
+        if len(over):
+            print(f"\n❌ Over the {args.budget_ms:.0f} ms budget: {', '.join(over.index)}")
+            sys.exit(1)
+        print(f"\n✅ All pages within the {args.budget_ms:.0f} ms budget")
@@ -0,0 +1,96 @@
+"""
+Cached access to the LLM reports in reports/.
+
+File contents are cached per (path, mtime), so a regenerated report is
+picked up automatically and downloads reuse the same bytes. Reports are
+shown as per-chunk / per-topic sections, read only for the visible page.
+"""
+import glob
+import os
+import re
+
+import streamlit as st
+
+import perf
+
+REPORTS_DIR = "../reports"
+
+# kind -> (merged file, chunk file pattern, section title)
+REPORTS = {
+    "executive": ("executive_summary.txt", "executive_chunk_*.txt", "Summary part {}"),
+    "topics": ("topic_insights.txt", "topic_*_*.txt", "Topic {}"),
+    "recommendations": ("recommendations.txt", "reco_chunk_*.txt", "Recommendations part {}"),
+}
+
+
+@perf.cached(st.cache_resource(max_entries=512))
+def _read_bytes(path, mtime):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_bytes(path):
+    """File contents as bytes, or None if the file is missing."""
+    try:
+        return _read_bytes(path, os.path.getmtime(path))
+    except FileNotFoundError:
+        return None
+
+
+def read_text(path):
+    data = read_bytes(path)
+    return None if data is None else data.decode("utf-8")
+
+
+def merged_report(kind):
+    """Bytes of the merged report file (used for downloads)."""
+    return read_bytes(os.path.join(REPORTS_DIR, REPORTS[kind][0]))
+
+
+def _natural_key(path):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+@perf.cached(st.cache_data(max_entries=len(REPORTS)))
+def _sections(kind, dir_mtime):
+    _, pattern, title = REPORTS[kind]
+    paths = sorted(glob.glob(os.path.join(REPORTS_DIR, pattern)), key=_natural_key)
+    sections = []
+    for i, path in enumerate(paths, 1):
+        if kind == "topics":
+            # topic_{n}_{topic id}.txt
+            label = os.path.basename(path)[:-len(".txt")].split("_", 2)[-1]
+        else:
+            label = i
+        sections.append((title.format(label), path))
+    return sections
+
+
+def list_sections(kind):
+    """[(title, path)] for each chunk of a report, falling back to the merged file."""
+    if not os.path.isdir(REPORTS_DIR):
+        return []
+    sections = _sections(kind, os.path.getmtime(REPORTS_DIR))
+    if not sections:
+        merged = os.path.join(REPORTS_DIR, REPORTS[kind][0])
+        if os.path.exists(merged):
+            sections = [(REPORTS[kind][0], merged)]
+    return sections
+
+
+def render_report(kind, page_size=10):
+    """Render one page of collapsible report sections."""
+    sections = list_sections(kind)
+    if not sections:
+        st.warning(f"⚠️ Report file '{REPORTS[kind][0]}' not found in reports folder.")
+        return
+
+    pages = (len(sections) - 1) // page_size + 1
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                               step=1, key=f"{kind}_page")
+
+    for i, (title, path) in enumerate(sections[(page - 1) * page_size:page * page_size]):
+        with st.expander(title, expanded=(page == 1 and i == 0)):
+            st.markdown(read_text(path) or "_Empty section._")
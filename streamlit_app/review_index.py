@@ -0,0 +1,95 @@
+"""
+Row-id indexes for the review explorer.
+
+Rows are numbered by date order ("ranks"), so a date range is one
+contiguous rank interval and every posting list (rows per topic, source,
+sentiment or rating) is a sorted rank array. Filters intersect those arrays;
+only the rows of the visible page are ever materialized.
+"""
+import numpy as np
+import pandas as pd
+
+INDEXED_COLUMNS = ["topic", "source", "sentiment_label", "rating"]
+
+# Keyword search scans candidate rows in blocks of this size
+SEARCH_BLOCK = 5000
+
+
+class ReviewIndex:
+    def __init__(self, df):
+        dates = df["review_date"].to_numpy()
+        self.by_date = np.argsort(dates, kind="stable")     # rank -> row position
+        self.sorted_dates = dates[self.by_date]
+        self.size = len(df)
+
+        rank = np.empty(self.size, dtype=np.int64)
+        rank[self.by_date] = np.arange(self.size)
+        self.postings = {}
+        for col in INDEXED_COLUMNS:
+            if col in df.columns:
+                groups = pd.Series(rank).groupby(df[col].to_numpy(), observed=True).indices
+                self.postings[col] = {key: np.sort(rank[rows]) for key, rows in groups.items()}
+
+    def values(self, column):
+        return sorted(self.postings.get(column, {}))
+
+    def _union(self, column, keys):
+        lists = [self.postings[column][k] for k in keys if k in self.postings[column]]
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+    def query(self, filters=None, start=None, end=None):
+        """
+        Return matching ranks (ascending date order).
+
+        `filters` maps an indexed column to the accepted values; `start` and
+        `end` bound review_date (inclusive start, exclusive end).
+        """
+        lo = 0 if start is None else np.searchsorted(self.sorted_dates, np.datetime64(start), "left")
+        hi = self.size if end is None else np.searchsorted(self.sorted_dates, np.datetime64(end), "left")
+
+        candidates = [self._union(col, keys) for col, keys in (filters or {}).items() if keys]
+        if not candidates:
+            return np.arange(lo, hi)
+
+        # Intersect the smallest lists first, clipped to the date interval
+        candidates.sort(key=len)
+        result = candidates[0]
+        result = result[np.searchsorted(result, lo):np.searchsorted(result, hi)]
+        for other in candidates[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def positions(self, ranks):
+        """Row positions (for .iloc) of the given ranks."""
+        return self.by_date[ranks]
+
+
+def search_page(index, ranks, texts, keyword, page, page_size):
+    """
+    Newest-first page of `ranks` whose text contains `keyword`.
+
+    Candidates are scanned block by block and scanning stops once the
+    requested page is full, so the cost does not grow with the corpus.
+    Returns (page ranks, matches found, whether the scan was exhaustive).
+    """
+    needed = (page + 1) * page_size
+    newest_first = ranks[::-1]
+    if not keyword:
+        return newest_first[page * page_size:needed], len(ranks), True
+
+    matches = []
+    found = 0
+    scanned = 0
+    while scanned < len(newest_first) and found <= needed:
+        block = newest_first[scanned:scanned + SEARCH_BLOCK]
+        hit = pd.Series(texts[index.positions(block)]).str.contains(keyword, case=False, regex=False, na=False)
+        matches.append(block[hit.to_numpy()])
+        found += int(hit.sum())
+        scanned += len(block)
+
+    matched = np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+    return matched[page * page_size:needed], found, scanned >= len(newest_first)
@@ -0,0 +1,22 @@
+"""
+Container entry point: warm the shared caches, then start Streamlit.
+
+    cd streamlit_app && python serve.py [streamlit options]
+
+Caches live in the server process, so warming them here (before the first
+request) means no user pays for data loading or the Plotly import.
+"""
+import sys
+import time
+
+from streamlit.web import cli as stcli
+
+import data_access
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    data_access.warm_caches()
+    print(f"🔥 Caches warmed in {time.perf_counter() - start:.2f}s")
+
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(stcli.main())
@@ -0,0 +1,134 @@
+"""
+Server-side trend engine for the sentiment charts.
+
+Reviews are binned and smoothed here so Plotly only receives one point per
+bin (or at most `max_points` for raw views) instead of one per review.
+"""
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = {"Daily": "D", "Weekly": "W", "Monthly": "MS"}
+
+# Default cap on points sent to the browser for raw (per-review) views
+MAX_POINTS = 2000
+
+# z-score for the confidence band
+Z_95 = 1.96
+
+
+def _fill_empty_bins(binned, by, date, freq):
+    """
+    Add count-0 rows for the empty bins inside each group's date range, so
+    a rolling window of N rows always spans N calendar bins.
+    """
+    if binned.empty:
+        return binned
+    groups = binned.groupby(by, observed=True, sort=True) if by else [(None, binned)]
+    parts = []
+    for key, group in groups:
+        bins = pd.date_range(group[date].min(), group[date].max(), freq=freq, name=date)
+        full = group.set_index(date)[["count", "_sum", "_sumsq"]].reindex(bins, fill_value=0).reset_index()
+        if by:
+            full.insert(0, by, key)
+        parts.append(full)
+    filled = pd.concat(parts, ignore_index=True)
+    return filled.astype({by: binned[by].dtype}) if by else filled
+
+
+def resample_sentiment(df, freq="W", window=4, by="source", value="sentiment_score", date="review_date"):
+    """
+    Bin reviews by `freq` (per `by` group) and smooth with a rolling window.
+
+    The window spans `window` calendar bins: empty bins count towards it
+    but are not returned. The rolling statistics pool the raw sums of each
+    bin, so the mean and the 95% confidence band are weighted by review
+    volume, not by bin. Returns one row per group and non-empty bin with
+    count, mean, rolling_mean, lower and upper; reviews without a score are
+    left out of all of them.
+    """
+    keys = [by] if by else []
+    values = df[value].astype("float64")
+    binned = (
+        df.assign(_sum=values, _sumsq=values ** 2)
+        .groupby(keys + [pd.Grouper(key=date, freq=freq)], observed=True)
+        .agg(count=(value, "count"), _sum=("_sum", "sum"), _sumsq=("_sumsq", "sum"))
+        .reset_index()
+    )
+    # Without `by` the Grouper already emits empty bins; with it they are dropped. Same grid either way.
+    binned = _fill_empty_bins(binned[binned["count"] > 0], by, date, freq).sort_values(keys + [date])
+
+    stats = binned[["count", "_sum", "_sumsq"]]
+    if by:
+        rolled = stats.groupby(binned[by], observed=True).rolling(window, min_periods=1).sum()
+        rolled = rolled.reset_index(level=0, drop=True)
+    else:
+        rolled = stats.rolling(window, min_periods=1).sum()
+    rolled = rolled.loc[binned.index]
+
+    n = rolled["count"]
+    mean = rolled["_sum"] / n
+    variance = ((rolled["_sumsq"] - rolled["_sum"] ** 2 / n) / (n - 1)).clip(lower=0)
+    margin = Z_95 * np.sqrt(variance / n)
+
+    binned["mean"] = binned["_sum"] / binned["count"]
+    binned["rolling_mean"] = mean
+    binned["lower"] = mean - margin.fillna(0)
+    binned["upper"] = mean + margin.fillna(0)
+    return binned[binned["count"] > 0].drop(columns=["_sum", "_sumsq"]).reset_index(drop=True)
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most `threshold` points that preserve the
+    visual shape of the (x, y) series. `x` must be sorted ascending.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = end if end < next_end else n - 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+
+def downsample(df, max_points=MAX_POINTS, by="source", value="sentiment_score", date="review_date"):
+    """Sort by date and keep at most `max_points` rows (split across `by` groups) with LTTB."""
+    df = df.sort_values(date)
+    if len(df) <= max_points:
+        return df
+
+    if not by:
+        x = df[date].to_numpy().astype("int64")
+        return df.iloc[lttb(x, df[value].to_numpy(), max_points)]
+
+    parts = []
+    groups = df.groupby(by, observed=True)
+    per_group = max(max_points // max(groups.ngroups, 1), 3)
+    for _, group in groups:
+        x = group[date].to_numpy().astype("int64")
+        parts.append(group.iloc[lttb(x, group[value].to_numpy(), per_group)])
+    return pd.concat(parts)